@@ -1,15 +1,76 @@
+import os
 import sys
+import json
+import random
 import pprint
-from typing import List, Tuple
+from typing import Dict, Iterator, List, Tuple, Union
 import argparse
 import logging
 
+from src.constants import Constants as Const
 from src.artefact import Artefact, Snake, Ladder
 from src.player import Player
-from src.die import Die
+from src.die import Die, SeededDie, AliasDie, parse_distribution
 from src.snake_ladder_simulation import Game
+from src.rules import RuleSet
+from src.fast_engine import FastGame
+from src.codegen_engine import CODEGEN_STATISTICS, CodegenGame
+from src.engines import ENGINES
+from src.engine_selection import (
+    AUTO_ENGINE,
+    ANALYTIC_ENGINE,
+    STATISTICS,
+    STATISTICS_ALL,
+    STATISTICS_ROLLS,
+    RollsToWin,
+    choose_engine,
+)
+from src.equivalence import (
+    EQUIVALENCE_FUZZ_BOARDS,
+    EQUIVALENCE_STATISTICAL_GAMES,
+    fuzz,
+    compare_statistically,
+)
+from src.threaded import gil_enabled, run_threaded
+from src.metrics import MetricsExporter, RunMetrics, run_simulations
+from src.pipelined import PIPELINED_STAGES, run_pipelined
+from src.control_variates import (
+    ControlVariateEstimate,
+    ControlVariateMoments,
+    control_variate_estimates,
+    known_rolls_to_win,
+)
+from src.bootstrap import (
+    BootstrapInterval,
+    Histogram,
+    bootstrap_histograms,
+    bootstrap_intervals,
+)
+from src.trajectories import run_player_counts
+from src.pipeline import run_pipeline
+from src.board_generator import generate_boards
+from src.board import CompiledBoard
+from src.board_file import open_board_file, write_board_file
+from src.memory_budget import (
+    MemoryMonitor,
+    MemoryPlan,
+    SpillingGameStats,
+    format_memory_size,
+    parse_memory_size,
+)
+from src.roll_tape import RollTape, RollTapeWriter, RecordingDie, TapeDie
+from src.heatmap import HitCounters, print_hit_frequencies
+from src.analytic import analyse_game, print_analysis
+from src.preflight import preflight
 from src.simulation_stats import SimulationStats
-from src.game_exceptions import EXCEPTION_SNAKE_LADDER_SIMULATOR
+from src.shard import Shard, run_shard, write_partial_result, merge_partial_results
+from src.simulator import SimulationConfig
+from src.game_exceptions import (
+    ERROR_MESSAGE_CONTROL_VARIATES,
+    ERROR_MESSAGE_TAPE_DICE,
+    EXCEPTION_SNAKE_LADDER_SIMULATOR,
+    EXCEPTION_SIMULATION_CONFIG,
+)
 
 
 def print_simultation_statistics(sim_stats: SimulationStats, number_of_players):
@@ -17,6 +78,15 @@ def print_simultation_statistics(sim_stats: SimulationStats, number_of_players):
     print(
         f"STATISTICS FOR {number_of_players} PLAYERS OVER {sim_stats.number_of_simulations} SIMULATION RUN(S)"
     )
+    if sim_stats.number_of_truncated_games:
+        print(
+            f"Games cut short at the roll cap = {sim_stats.number_of_truncated_games} "
+            "(not counted below)"
+        )
+    if not sim_stats.number_of_games_won:
+        print("No game was won: statistics of the games n/a")
+        print()
+        return
 
     print("Winning rolls:")
     print(f"Minimum = {sim_stats.min_number_of_win_rolls}")
@@ -56,79 +126,407 @@ def print_simultation_statistics(sim_stats: SimulationStats, number_of_players):
     return
 
 
-def read_conf_file() -> Tuple[bool, int, int, List[List[int]], List[List[int]]]:
-    def str_to_int(s):
-        try:
-            return int(s)
-        except ValueError:
-            return -1
-
-    CONFIG_FILENAME = "game.conf"
-    isSuccess: bool = False
-    number_of_simulations: int = 0
-    number_of_players: int = 0
-    snakes_conf: List[List[int]] = []
-    ladders_conf: List[List[int]] = []
+def print_rolls_to_win(rolls_to_win: RollsToWin, number_of_players):
+    print()
+    if rolls_to_win.exact:
+        print(f"EXACT WINNING ROLLS FOR {number_of_players} PLAYERS")
+    else:
+        number_of_simulations = (
+            rolls_to_win.number_of_games + rolls_to_win.number_of_truncated_games
+        )
+        print(
+            f"WINNING ROLLS FOR {number_of_players} PLAYERS OVER {number_of_simulations} SIMULATION RUN(S)"
+        )
+        if rolls_to_win.number_of_truncated_games:
+            print(
+                "Games cut short at the roll cap = "
+                f"{rolls_to_win.number_of_truncated_games} (not counted below)"
+            )
+
+    print("Winning rolls:")
+    print(f"Minimum = {rolls_to_win.minimum}")
+    print(f"Average = {round(rolls_to_win.average, 2)}")
+    for label, rolls in rolls_to_win.quantiles().items():
+        print(f"{label} of games by = {rolls}")
+    if not rolls_to_win.exact:
+        print(f"Maximum = {rolls_to_win.maximum}")
+    print()
+    return
+
+
+def print_control_variates(estimates: List[ControlVariateEstimate]):
+    print("ADJUSTED WITH THE EXACT AVERAGE OF THE WINNING ROLLS")
+    for estimate in estimates:
+        reduction = estimate.variance_reduction
+        saved = f"variance {reduction:.1f}x lower"
+        if reduction == float("inf"):
+            saved = "exact"
+        print(
+            f"{estimate.statistic} = {estimate.adjusted:.3f} "
+            f"± {estimate.adjusted_standard_error:.3f} "
+            f"(simulated {estimate.average:.3f} ± {estimate.standard_error:.3f}, "
+            f"{saved})"
+        )
+    print()
+    return
+
+
+def print_bootstrap_intervals(intervals: List[BootstrapInterval], replicates: int):
+    if not intervals:
+        return
+    print(
+        f"{intervals[0].confidence:.0%} BOOTSTRAP CONFIDENCE INTERVALS "
+        f"({replicates} replicates)"
+    )
+
+    def value(number) -> str:
+        # Averages are floats; minimums and maximums are values of a game
+        return f"{number:.3f}" if isinstance(number, float) else str(number)
+
+    for interval in intervals:
+        statistic = interval.statistic
+        if statistic == "max_streak":
+            statistic = "max_streak (sum)"
+        print(
+            f"{statistic} = {value(interval.estimate)} "
+            f"[{value(interval.low)}, {value(interval.high)}]"
+        )
+    print()
+    return
+
+
+def bootstrap(args: argparse.Namespace, histograms: Dict[str, Histogram]) -> None:
+    # The intervals of every statistic the histograms give, where asked for
+    if args.bootstrap is None:
+        return
+    intervals = bootstrap_intervals(
+        histograms, args.bootstrap, args.confidence, args.seed, args.workers
+    )
+    print_bootstrap_intervals(intervals, args.bootstrap)
+
+
+def start_metrics_exporter(
+    args: argparse.Namespace, metrics: Union[RunMetrics, None]
+) -> Union[MetricsExporter, None]:
+    # None where no metrics are asked for, or they can not be served
+    if metrics is None:
+        return None
     try:
-        with open(CONFIG_FILENAME) as conf_file:
-            raw_config_lines = conf_file.readlines()
-    except FileNotFoundError:
-        print(f"Please supply a config file by name {CONFIG_FILENAME}")
-        return (
-            isSuccess,
-            number_of_simulations,
-            number_of_players,
-            snakes_conf,
-            ladders_conf,
-        )
-
-    for line in raw_config_lines:
-        line = line.strip().split("#")[0]  # Strip away the comments
-        if not line:
-            continue
-        config = line.split("=")
-        if len(config) < 2:
-            break
-        key, value = config[0].strip().upper(), config[1].strip()
-        if key == "NUMBER_OF_SIMULATIONS":
-            number_of_simulations = str_to_int(value)
-            if number_of_simulations < 0:
-                break
-            continue
-        if key == "NUMBER_OF_PLAYERS":
-            number_of_players = str_to_int(value)
-            if number_of_players < 0:
-                break
-            continue
-        if key == "SNAKE" or key == "LADDER":
-            positions_conf = value.split(",")
-            if len(positions_conf) != 2:
-                break
-            positions = list(map(lambda x: str_to_int(x.strip()), positions_conf))
-            if positions.count(-1) != 0:
-                break
-            if key == "SNAKE":
-                snakes_conf.append(positions)
-            else:
-                ladders_conf.append(positions)
-    else:  # For-else
-        isSuccess = True
+        exporter = MetricsExporter(
+            metrics, args.metrics_file, args.metrics_port, args.metrics_interval
+        ).start()
+    except OSError as error:
+        print(f"Error: metrics: {error}")
+        return None
+    if args.metrics_file is not None:
+        print(
+            f"Metrics written to {args.metrics_file} "
+            f"every {args.metrics_interval:g}s"
+        )
+    if exporter.port is not None:
+        print(f"Metrics served at http://127.0.0.1:{exporter.port}/metrics")
+    print()
+    return exporter
 
-    if not isSuccess:
-        print(f"Invalid configuration line: {line}")
 
+def read_conf_file() -> Tuple[
+    bool,
+    int,
+    int,
+    List[List[int]],
+    List[List[int]],
+    List[str],
+    Dict[int, str],
+    Union[str, None],
+]:
+    # game.conf of the working directory; see SimulationConfig for the API
+    try:
+        config = SimulationConfig.from_file("game.conf")
+    except EXCEPTION_SIMULATION_CONFIG as error:
+        print(error.message)
+        return (False, 0, 0, [], [], [], {}, None)
     return (
-        isSuccess,
-        number_of_simulations,
-        number_of_players,
-        snakes_conf,
-        ladders_conf,
+        True,
+        config.number_of_simulations,
+        config.number_of_players,
+        config.snakes,
+        config.ladders,
+        config.rules,
+        config.dice,
+        config.board_file,
     )
 
 
+def parse_shard(spec: str) -> Shard:
+    try:
+        return Shard.parse(spec)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected I/N with 1 <= I <= N, got {spec}")
+
+
+def parse_player_counts(spec: str) -> List[int]:
+    # A range (2-10) or a list (2,4,6) of numbers of players
+    try:
+        if "-" in spec:
+            low, high = (int(n) for n in spec.split("-"))
+            player_counts = list(range(low, high + 1))
+        else:
+            player_counts = [int(n) for n in spec.split(",")]
+    except ValueError:
+        player_counts = []
+    if not player_counts or min(player_counts) < 1:
+        raise argparse.ArgumentTypeError(
+            f"expected a range (e.g. 2-10) or a list (e.g. 2,4,6) of player counts, got {spec}"
+        )
+    return player_counts
+
+
+def parse_roll_cap(spec: str) -> int:
+    try:
+        roll_cap = int(spec)
+    except ValueError:
+        roll_cap = -1
+    if roll_cap < 0:
+        raise argparse.ArgumentTypeError(
+            f"expected a number of rolls (0 for no cap), got {spec}"
+        )
+    return roll_cap
+
+
+def parse_metrics_interval(spec: str) -> float:
+    try:
+        interval = float(spec)
+    except ValueError:
+        interval = 0
+    if interval <= 0:
+        raise argparse.ArgumentTypeError(f"invalid interval {spec!r}")
+    return interval
+
+
+def parse_replicates(spec: str) -> int:
+    try:
+        replicates = int(spec)
+    except ValueError:
+        replicates = 0
+    if replicates < 1:
+        raise argparse.ArgumentTypeError(f"expected a number of replicates, got {spec}")
+    return replicates
+
+
+def parse_confidence(spec: str) -> float:
+    try:
+        confidence = float(spec)
+    except ValueError:
+        confidence = 0
+    if not 0 < confidence < 1:
+        raise argparse.ArgumentTypeError(
+            f"expected a confidence between 0 and 1 (e.g. 0.95), got {spec}"
+        )
+    return confidence
+
+
+def parse_max_memory(spec: str) -> int:
+    try:
+        return parse_memory_size(spec)
+    except ValueError as error:
+        raise argparse.ArgumentTypeError(str(error))
+
+
 def setup_argument_parser() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Snake & Ladder Simulator")
     parser.add_argument("--verbose", "-v", action="count", default=0)
+    parser.add_argument(
+        "command",
+        nargs="?",
+        choices=[
+            "run",
+            "merge",
+            "analyse",
+            "verify",
+            "pipeline",
+            "generate",
+            "compile",
+        ],
+        default="run",
+        help="run the simulations (default), merge partial results of shards, "
+        "work out the winning chances and game lengths exactly, "
+        "verify that every engine plays exactly as the reference engine, "
+        "run every board config of a JSON Lines stream, "
+        "generate a JSON Lines stream of random valid boards, "
+        "or compile the board of game.conf to a board file",
+    )
+    parser.add_argument(
+        "partial_results",
+        nargs="*",
+        metavar="FILE",
+        help="partial result files to merge, or JSON Lines files of board configs "
+        "for the pipeline (default: standard input)",
+    )
+    parser.add_argument(
+        "--engine",
+        choices=list(ENGINES) + [AUTO_ENGINE],
+        default=AUTO_ENGINE,
+        help="engine that plays the games; all engines produce the same statistics "
+        "(default: auto, the cheapest for the board, players, simulations and "
+        "--statistics, reporting which it picked and why)",
+    )
+    parser.add_argument(
+        "--statistics",
+        choices=STATISTICS,
+        default=STATISTICS_ALL,
+        help="report every statistic (default), or only the rolls to win: these "
+        "the auto engine may work out exactly instead of playing the games",
+    )
+    parser.add_argument(
+        "--heatmap",
+        action="store_true",
+        help="also report how often each cell, snake, ladder and lucky position is hit",
+    )
+    parser.add_argument(
+        "--threads",
+        type=int,
+        default=1,
+        help="play the simulations on this many threads within one process; only "
+        "faster on a free-threaded build: under the GIL it is slower than one thread",
+    )
+    parser.add_argument(
+        "--pipelined",
+        action="store_true",
+        help="draw the die rolls, play the games and fold in their statistics in "
+        "three overlapping stages (threads), and report how busy each stage was",
+    )
+    parser.add_argument(
+        "--control-variates",
+        action="store_true",
+        help="also adjust the averages with the winning rolls, whose average the "
+        "analysis gives exactly, for tighter estimates off the same games",
+    )
+    parser.add_argument(
+        "--bootstrap",
+        type=parse_replicates,
+        nargs="?",
+        const=Const.BOOTSTRAP_REPLICATES,
+        metavar="REPLICATES",
+        help="also report bootstrap confidence intervals of every statistic, off "
+        f"this many replicates (default {Const.BOOTSTRAP_REPLICATES}) drawn by "
+        "--workers processes",
+    )
+    parser.add_argument(
+        "--confidence",
+        type=parse_confidence,
+        default=Const.BOOTSTRAP_CONFIDENCE,
+        help="confidence of the bootstrap intervals "
+        f"(default {Const.BOOTSTRAP_CONFIDENCE})",
+    )
+    parser.add_argument(
+        "--metrics-file",
+        metavar="PATH",
+        help="while the games are played, write their progress (games and moves "
+        "per second, worker utilization, estimates) to this OpenMetrics textfile, "
+        "e.g. for a Prometheus node_exporter textfile collector",
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        metavar="PORT",
+        help="also serve those metrics at http://127.0.0.1:PORT/metrics",
+    )
+    parser.add_argument(
+        "--metrics-interval",
+        type=parse_metrics_interval,
+        default=Const.METRICS_INTERVAL,
+        metavar="SECONDS",
+        help="rewrite the metrics file this often, in seconds "
+        f"(default {Const.METRICS_INTERVAL:g})",
+    )
+    parser.add_argument(
+        "--player-counts",
+        type=parse_player_counts,
+        help="instead of NUMBER_OF_PLAYERS, report each of these numbers of players "
+        "(e.g. 2-10), all composed from one pool of single-player games",
+    )
+    parser.add_argument(
+        "--roll-cap",
+        type=parse_roll_cap,
+        default=Const.GAME_ROLL_CAP,
+        metavar="ROLLS",
+        help="cut a game short once its players have rolled this many times in all "
+        f"(default {Const.GAME_ROLL_CAP}, 0 for no cap); such games are only counted",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="worker processes of the pipeline, generate and --bootstrap "
+        "(0: work in this process)",
+    )
+    parser.add_argument(
+        "--boards",
+        type=int,
+        default=1000,
+        help="number of random boards to generate (default 1000)",
+    )
+    parser.add_argument(
+        "--snakes",
+        type=int,
+        help="snakes on every generated board (default: as many as in game.conf)",
+    )
+    parser.add_argument(
+        "--ladders",
+        type=int,
+        help="ladders on every generated board (default: as many as in game.conf)",
+    )
+    parser.add_argument(
+        "--unordered",
+        action="store_true",
+        help="write the pipeline's results as soon as they are ready, not in input order",
+    )
+    parser.add_argument(
+        "--max-memory",
+        type=parse_max_memory,
+        metavar="SIZE",
+        help="plan the run to fit this much memory (e.g. 512M or 2G), spilling "
+        "per-game records to disk as needed, and report the peak memory per phase",
+    )
+    parser.add_argument(
+        "--spill-dir",
+        help="directory of the records spilled to fit --max-memory (default: temp)",
+    )
+    parser.add_argument(
+        "--record-tape",
+        metavar="TAPE",
+        help="record every die roll of the run to this roll tape file",
+    )
+    parser.add_argument(
+        "--replay-tape",
+        metavar="TAPE",
+        help="replay the games of this roll tape file (recorded with the same "
+        "configuration) instead of rolling the die",
+    )
+    parser.add_argument(
+        "--shard",
+        type=parse_shard,
+        help="run only shard I of N (e.g. 2/8) and write its partial result",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=None,
+        help="seed the die, so that runs are reproducible (shards default to 0)",
+    )
+    parser.add_argument(
+        "--output",
+        "-o",
+        help="partial result file of the shard (default: shard-I-of-N.json), "
+        "the pipeline's results or generated boards (default: standard output), "
+        "or the compiled board file (default: game.board)",
+    )
+    parser.add_argument(
+        "--board-file",
+        metavar="PATH",
+        help="play the board compiled to this file (see compile), with its house "
+        "rules, instead of the snakes, ladders and rules of game.conf",
+    )
     args = parser.parse_args(sys.argv[1:])
     return args
 
@@ -142,6 +540,139 @@ def setup_logger(args: argparse.Namespace):
     logging.basicConfig(format="%(message)s", level=level_to_set)
 
 
+def merge_shards(paths: List[str]) -> bool:
+    isSuccess, err_message, run, accumulator = merge_partial_results(paths)
+    if not isSuccess:
+        print(f"Error: {err_message}")
+        return False
+
+    print_simultation_statistics(
+        accumulator.to_simulation_stats(), run["number_of_players"]
+    )
+    return True
+
+
+def verify_engines(game: Game, seed: int) -> bool:
+    def make_game(die: Die) -> Game:
+        return game.clone(die, EQUIVALENCE_STATISTICAL_GAMES)
+
+    print(f"Engines: {', '.join(ENGINES)}")
+    mismatches = fuzz(EQUIVALENCE_FUZZ_BOARDS, seed)
+    print(f"Game for game on {EQUIVALENCE_FUZZ_BOARDS} random boards: ", end="")
+    print("MISMATCH" if mismatches else "match")
+    for mismatch in mismatches:
+        print(mismatch)
+
+    statistical_mismatches = compare_statistically(make_game, seed)
+    print(
+        f"Statistically over {EQUIVALENCE_STATISTICAL_GAMES} games on the configured board: ",
+        end="",
+    )
+    print("MISMATCH" if statistical_mismatches else "match")
+    for mismatch in statistical_mismatches:
+        print(mismatch)
+
+    return not (mismatches or statistical_mismatches)
+
+
+def run_board_pipeline(args: argparse.Namespace) -> bool:
+    # Board configs from the given files (or stdin), results to --output (or stdout)
+    def lines() -> Iterator[str]:
+        if not args.partial_results:
+            yield from sys.stdin
+        for path in args.partial_results:
+            with open(path) as input_file:
+                yield from input_file
+
+    output = open(args.output, "w") if args.output else sys.stdout
+
+    def write(result: str) -> None:
+        output.write(result + "\n")
+        output.flush()
+
+    try:
+        run_pipeline(lines(), write, args.workers, not args.unordered, args.engine)
+    except OSError as error:
+        print(f"Error: {error}", file=sys.stderr)
+        return False
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    return True
+
+
+def generate_board_configs(args: argparse.Namespace) -> bool:
+    # game.conf with random boards, as board configs to --output (or stdout)
+    try:
+        base = SimulationConfig.from_file("game.conf")
+    except EXCEPTION_SIMULATION_CONFIG as error:
+        print(f"Error: {error.message}", file=sys.stderr)
+        return False
+    number_of_snakes = len(base.snakes) if args.snakes is None else args.snakes
+    number_of_ladders = len(base.ladders) if args.ladders is None else args.ladders
+    if min(args.boards, number_of_snakes, number_of_ladders) < 0:
+        print(
+            "Error: the numbers of boards, snakes and ladders must not be negative",
+            file=sys.stderr,
+        )
+        return False
+    seed = args.seed if args.seed is not None else random.randrange(2**32)
+
+    output = open(args.output, "w") if args.output else sys.stdout
+    try:
+        for number, (snakes, ladders) in enumerate(
+            generate_boards(
+                args.boards, number_of_snakes, number_of_ladders, seed, args.workers
+            ),
+            1,
+        ):
+            config = dict(base.to_dict(), snakes=snakes, ladders=ladders)
+            output.write(json.dumps(dict(id=f"board-{number}", **config)) + "\n")
+    except (OSError, ValueError) as error:
+        print(f"Error: {error}", file=sys.stderr)
+        return False
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    return True
+
+
+def compile_board_file(args: argparse.Namespace) -> bool:
+    # The board of game.conf, checked and compiled for its dice, to a file
+    if args.partial_results:
+        print(
+            "Error: compile takes no FILE arguments; give the board file as --output",
+            file=sys.stderr,
+        )
+        return False
+    try:
+        config = SimulationConfig.from_file("game.conf")
+        game = config.make_game()
+    except EXCEPTION_SIMULATION_CONFIG as error:
+        print(f"Error: {error.message}", file=sys.stderr)
+        return False
+    output = args.output or "game.board"
+    board = CompiledBoard.from_game(game)
+    try:
+        size = write_board_file(output, board)
+    except OSError as error:
+        print(f"Error: {error}", file=sys.stderr)
+        return False
+    print(
+        f"Board of {len(game.snakes)} snakes and {len(game.ladders)} ladders "
+        f"compiled to {output} ({size} bytes, rolls up to {board.max_roll}, "
+        f"house rules: {', '.join(board.rules.names) or 'none'})"
+    )
+    return True
+
+
+def print_memory_report(plan: MemoryPlan, monitor: MemoryMonitor) -> None:
+    print(f"MEMORY (budget {format_memory_size(plan.max_memory)}):")
+    for line in monitor.report():
+        print(line)
+    print()
+
+
 def main() -> bool:
     players: List[Player] = []
     snakes: List[Artefact] = []
@@ -150,6 +681,21 @@ def main() -> bool:
     args = setup_argument_parser()
     setup_logger(args)
 
+    if args.command == "merge":
+        return merge_shards(args.partial_results)
+
+    if args.command == "pipeline":
+        return run_board_pipeline(args)
+
+    if args.command == "generate":
+        return generate_board_configs(args)
+
+    if args.command == "compile":
+        return compile_board_file(args)
+
+    monitor = MemoryMonitor()
+    monitor.start_phase("setup")
+
     # Read game configurations
     (
         isSuccess,
@@ -157,11 +703,29 @@ def main() -> bool:
         number_of_players,
         snakes_conf,
         ladders_conf,
+        rules_conf,
+        dice_conf,
+        board_file_conf,
     ) = read_conf_file()
     if not isSuccess:
         print("Error reading config file. Quitting")
         return False
 
+    # A board compiled ahead stands in for the snakes, ladders and rules
+    board_file = args.board_file or board_file_conf
+    compiled_board: Union[CompiledBoard, None] = None
+    if board_file is not None:
+        try:
+            compiled_board = open_board_file(board_file).board
+        except (OSError, ValueError) as error:
+            print(f"Error: {error}")
+            return False
+        artefacts = list(compiled_board.activation_points_map.values())
+        snakes = [artefact for artefact in artefacts if isinstance(artefact, Snake)]
+        ladders = [artefact for artefact in artefacts if isinstance(artefact, Ladder)]
+        snakes_conf, ladders_conf = [], []
+        rules_conf = list(compiled_board.rules.names)
+
     if number_of_players == 0:
         print("There are no players. Quitting")
         return False
@@ -194,27 +758,348 @@ def main() -> bool:
 
     print("CONFIGURATION:")
     print(f"Number of simulations: {number_of_simulations}")
-    print(f"Number of players: {number_of_players}")
+    if args.player_counts:
+        print(f"Numbers of players: {', '.join(map(str, args.player_counts))}")
+    else:
+        print(f"Number of players: {number_of_players}")
+    if compiled_board is not None:
+        print(f"Board file: {board_file}")
     print(f"Number of snakes: {len(snakes)}")
     print(f"Number of ladders: {len(ladders)}")
+    print(f"House rules: {', '.join(rules_conf) or 'none'}")
+    print(f"Roll cap: {args.roll_cap or 'none'}")
+    for player_number, spec in sorted(dice_conf.items()):
+        print(f"Die of {f'Player_{player_number}' if player_number else 'every player'}: {spec}")
     logging.debug(pprint.pformat(snakes))
     logging.debug(pprint.pformat(ladders))
     print()
 
+    tape: Union[RollTape, None] = None
+    if args.record_tape or args.replay_tape:
+        if (
+            args.threads > 1
+            or args.shard is not None
+            or args.player_counts
+            or args.pipelined
+        ):
+            print(
+                "Error: --record-tape and --replay-tape are not supported with "
+                "--threads, --shard, --player-counts or --pipelined"
+            )
+            return False
+    if args.control_variates and (
+        args.threads > 1
+        or args.shard is not None
+        or args.player_counts
+        or args.pipelined
+    ):
+        print(
+            "Error: --control-variates is not supported with "
+            "--threads, --shard, --player-counts or --pipelined"
+        )
+        return False
+    if args.bootstrap is not None and (args.shard is not None or args.player_counts):
+        print("Error: --bootstrap is not supported with --shard or --player-counts")
+        return False
+    monitored = args.metrics_file is not None or args.metrics_port is not None
+    if monitored and (args.shard is not None or args.player_counts or args.pipelined):
+        print(
+            "Error: --metrics-file and --metrics-port are not supported with "
+            "--shard, --player-counts or --pipelined"
+        )
+        return False
+    if args.pipelined and (args.shard is not None or args.player_counts):
+        print("Error: --shard and --player-counts are not supported with --pipelined")
+        return False
+    if args.replay_tape:
+        try:
+            tape = RollTape(args.replay_tape)
+        except (OSError, ValueError) as error:
+            print(f"Error: {error}")
+            return False
+        number_of_simulations = len(tape)
+        print(f"Replaying {number_of_simulations} game(s) off {args.replay_tape}")
+        print()
+
+    plan: Union[MemoryPlan, None] = None
+    if args.max_memory is not None:
+        if args.player_counts:
+            print("Error: --max-memory is not supported with --player-counts")
+            return False
+        try:
+            plan = MemoryPlan(args.max_memory, number_of_simulations, args.threads)
+        except ValueError as error:
+            print(f"Error: {error}")
+            return False
+        if plan.number_of_threads < args.threads:
+            print(f"Running on {plan.number_of_threads} threads to fit the memory budget")
+            args.threads = plan.number_of_threads
+        print(f"Memory budget of {format_memory_size(plan.max_memory)}: {plan.describe()}")
+        print()
+
     # Set up the game
-    game = Game(Die(), number_of_simulations)
+    die: Die = Die()
+    if args.seed is not None or args.shard is not None:
+        die = SeededDie(args.seed or 0)
+    if tape is not None:
+        # The tape holds the rolls of every seat, whatever their dice
+        die = TapeDie(tape)
+    game = Game(
+        die,
+        number_of_simulations,
+        retain_game_stats=args.shard is None
+        and args.threads == 1
+        and not args.player_counts
+        and not (plan is not None and plan.spill),
+        rules=RuleSet(rules_conf),
+        roll_cap=args.roll_cap,
+    )
+    if plan is not None and plan.spill:
+        game.game_stats = SpillingGameStats(
+            plan.chunk_size, game.game_stats.repeat_roll, args.spill_dir
+        )
     game.add_players(players)
-    isSuccess, err_message = game.add_artefacts(snakes + ladders)
-    if not isSuccess:
-        print(f"Error: {err_message}")
+    for seat in range(max([number_of_players] + (args.player_counts or []))):
+        spec = dice_conf.get(seat + 1, dice_conf.get(0))
+        if spec is not None and tape is None:
+            game.set_seat_die(
+                seat,
+                AliasDie(parse_distribution(spec), getattr(die, "seed", None), seat + 1),
+            )
+    if compiled_board is not None:
+        game.set_compiled_board(compiled_board)
+    else:
+        isSuccess, err_message = game.add_artefacts(snakes + ladders)
+        if not isSuccess:
+            print(f"Error: {err_message}")
+            print("Please fix the configuration and re-rerun")
+            return False
+
+    if args.record_tape and game.max_roll() > Const.DIE_ROLL_MAX:
+        print(f"Error: {ERROR_MESSAGE_TAPE_DICE.format(max_roll=game.max_roll())}")
+        return False
+
+    if args.command == "analyse":
+        print_analysis(analyse_game(game))
+        return True
+
+    if args.command == "verify":
+        return verify_engines(game, args.seed or 0)
+
+    # Flag boards whose games never end, or run extremely long, before any
+    # game is played
+    report = preflight(game, max(args.player_counts or [number_of_players]))
+    for problem in report.problems:
+        print(f"Pre-flight: {problem}")
+    if not report.can_finish:
         print("Please fix the configuration and re-rerun")
         return False
+    if report.problems:
+        print()
+
+    if args.player_counts:
+        if args.heatmap or args.threads > 1 or args.shard is not None:
+            print("Error: --heatmap, --threads and --shard are not supported with --player-counts")
+            return False
+        seed = args.seed if args.seed is not None else random.randrange(2**32)
+        accumulators = run_player_counts(game, args.player_counts, seed=seed)
+        for count, accumulator in accumulators.items():
+            if args.statistics == STATISTICS_ROLLS:
+                print_rolls_to_win(RollsToWin.from_accumulator(accumulator), count)
+            else:
+                print_simultation_statistics(accumulator.to_simulation_stats(), count)
+        return True
+
+    if args.engine == AUTO_ENGINE:
+        # Options that only the games played can serve rule out the analysis
+        needs_games = [
+            option
+            for option, value in (
+                ("--heatmap", args.heatmap),
+                ("--shard", args.shard),
+                ("--record-tape", args.record_tape),
+                ("--replay-tape", args.replay_tape),
+                ("--control-variates", args.control_variates),
+                ("--bootstrap", args.bootstrap is not None),
+                ("--metrics-file", args.metrics_file),
+                ("--metrics-port", args.metrics_port is not None),
+            )
+            if value
+        ]
+        choice = choose_engine(
+            game,
+            number_of_simulations,
+            args.statistics,
+            report,
+            needs_games[0] if needs_games else None,
+        )
+        print(f"Engine: {choice.name} (picked automatically: {choice.reason})")
+        args.engine = choice.name
+
+    if args.engine == ANALYTIC_ENGINE:
+        analysis = analyse_game(game)
+        print_rolls_to_win(RollsToWin.from_analysis(analysis), number_of_players)
+        return True
+
+    writer: Union[RollTapeWriter, None] = None
+    if args.record_tape:
+        writer = RollTapeWriter(args.record_tape)
+        game.die = RecordingDie(game.die, writer)
+        for seat, seat_die in list(game.seat_dice.items()):
+            game.set_seat_die(seat, RecordingDie(seat_die, writer))
+
+    engine = None
+    if args.engine == "fast":
+        engine = FastGame.from_game(game, count_moves=args.heatmap or monitored)
+    elif args.engine == "codegen":
+        # Only what is reported is worked out: the moves for the heatmap or
+        # the metrics, the rolls to win alone where nothing else is asked for
+        statistics = CODEGEN_STATISTICS
+        if args.statistics == STATISTICS_ROLLS and not (
+            args.control_variates or args.bootstrap is not None
+        ):
+            statistics = ()
+        engine = CodegenGame.from_game(
+            game, statistics=statistics, count_moves=args.heatmap or monitored
+        )
+
+    if args.shard is not None:
+        output = args.output or f"shard-{args.shard.index}-of-{args.shard.count}.json"
+        write_partial_result(output, run_shard(game, args.shard, engine))
+        print(f"Shard {args.shard} partial result written to {output}")
+        return True
+
+    if args.pipelined:
+        if args.heatmap or args.threads > 1:
+            print("Error: --heatmap and --threads are not supported with --pipelined")
+            return False
+        seed = args.seed if args.seed is not None else random.randrange(2**32)
+        print(
+            f"Running in {len(PIPELINED_STAGES)} pipelined stages "
+            f"({'with' if gil_enabled() else 'without'} the GIL)"
+        )
+        monitor.start_phase("simulation")
+        accumulator, busy = run_pipelined(game, seed, args.engine)
+        monitor.start_phase("statistics")
+        if args.statistics == STATISTICS_ROLLS:
+            rolls_to_win = RollsToWin.from_accumulator(accumulator)
+            print_rolls_to_win(rolls_to_win, number_of_players)
+        else:
+            print_simultation_statistics(
+                accumulator.to_simulation_stats(), number_of_players
+            )
+        bootstrap(args, bootstrap_histograms(accumulator))
+        print(f"Stages busy in {round(busy['wall'], 2)}s of running:")
+        for stage in PIPELINED_STAGES:
+            print(f"{stage} = {round(busy[stage], 2)}s")
+        print()
+        if plan is not None:
+            print_memory_report(plan, monitor)
+        return True
+
+    if args.threads > 1:
+        if args.heatmap:
+            print("Error: --heatmap is not supported with --threads")
+            return False
+        seed = args.seed if args.seed is not None else random.randrange(2**32)
+        print(
+            f"Running on {args.threads} threads "
+            f"({'with' if gil_enabled() else 'without'} the GIL)"
+        )
+        metrics = RunMetrics(number_of_simulations, args.threads) if monitored else None
+        exporter = start_metrics_exporter(args, metrics)
+        if monitored and exporter is None:
+            return False
+        monitor.start_phase("simulation")
+        try:
+            accumulator = run_threaded(game, seed, args.threads, args.engine, metrics)
+        finally:
+            if exporter is not None:
+                exporter.stop()
+        monitor.start_phase("statistics")
+        if args.statistics == STATISTICS_ROLLS:
+            rolls_to_win = RollsToWin.from_accumulator(accumulator)
+            print_rolls_to_win(rolls_to_win, number_of_players)
+        else:
+            print_simultation_statistics(
+                accumulator.to_simulation_stats(), number_of_players
+            )
+        bootstrap(args, bootstrap_histograms(accumulator))
+        if plan is not None:
+            print_memory_report(plan, monitor)
+        return True
 
     # Run the simulations
-    game.run_simulations(print_progress=True)
+    metrics = RunMetrics(number_of_simulations) if monitored else None
+    exporter = start_metrics_exporter(args, metrics)
+    if monitored and exporter is None:
+        return False
+    monitor.start_phase("simulation")
+    if args.heatmap:
+        game.hit_counters = HitCounters()
+    try:
+        if metrics is not None:
+            run_simulations(engine or game, game.game_stats, metrics)
+        elif engine is not None:
+            engine.run_simulations(game.game_stats)
+        else:
+            game.run_simulations(print_progress=True)
+        if engine is not None and args.heatmap:
+            game.hit_counters = engine.hit_counters()
+    except ValueError as error:
+        if writer is not None:
+            writer.discard()
+        # A tape of another configuration runs out of rolls
+        if tape is None:
+            raise
+        print(f"Error: {error}")
+        return False
+    except BaseException:
+        if writer is not None:
+            writer.discard()
+        raise
+    finally:
+        if exporter is not None:
+            exporter.stop()
+    if writer is not None:
+        writer.close()
+        print(f"Rolls of {number_of_simulations} game(s) recorded to {args.record_tape}")
 
+    monitor.start_phase("statistics")
     game.calculate_simultation_statistics()
-    print_simultation_statistics(game.sim_stats, number_of_players)
+    if args.statistics == STATISTICS_ROLLS:
+        print_rolls_to_win(
+            RollsToWin.from_accumulator(game.game_stats.to_accumulator()),
+            number_of_players,
+        )
+    else:
+        print_simultation_statistics(game.sim_stats, number_of_players)
+    if args.control_variates:
+        known_mean = known_rolls_to_win(game, report)
+        if known_mean is None:
+            print(ERROR_MESSAGE_CONTROL_VARIATES)
+            print()
+        else:
+            moments = ControlVariateMoments()
+            moments.add_games(game.game_stats)
+            print_control_variates(control_variate_estimates(moments, known_mean))
+    if args.bootstrap is not None:
+        # The games are kept: their longest streaks too
+        bootstrap(
+            args,
+            bootstrap_histograms(game.game_stats.to_accumulator(), game.game_stats),
+        )
+    if args.heatmap:
+        print_hit_frequencies(
+            game.hit_counters,
+            game.activation_points_map,
+            game.lucky_positions,
+            game.sim_stats.number_of_simulations,
+        )
+    if plan is not None:
+        print_memory_report(plan, monitor)
+        if plan.spill:
+            game.game_stats.close()
 
     return True
 
@@ -0,0 +1,414 @@
+from operator import add
+from typing import Dict, List, Tuple, Union
+
+from .constants import Constants as Const
+from .board import CompiledBoard, MoveTables
+from .die import uniform_distribution
+
+# Probability mass below this is dropped (and accounted as residual)
+ANALYTIC_EPSILON = 1e-15
+# Stop once the mass of unfinished games falls below this
+ANALYTIC_TOLERANCE = 1e-12
+ANALYTIC_MAX_TURNS = 10000
+
+
+class _Window:
+    """
+    Probabilities over a window of consecutive counts [first, first + len)
+    """
+
+    __slots__ = ("first", "values")
+
+    def __init__(self, first: int, values: List[float]):
+        self.first: int = first
+        self.values: List[float] = values
+
+    @classmethod
+    def empty(cls) -> "_Window":
+        return cls(0, [])
+
+    def add(self, other: "_Window", scale: float, shift: int) -> None:
+        scaled = other.values
+        if scale != 1.0:
+            scaled = [p * scale for p in scaled]
+        first = other.first + shift
+        if not self.values:
+            self.first, self.values = first, scaled
+            return
+        if first < self.first:
+            self.values[:0] = [0.0] * (self.first - first)
+            self.first = first
+        offset = first - self.first
+        end = offset + len(scaled)
+        if end > len(self.values):
+            self.values.extend([0.0] * (end - len(self.values)))
+        self.values[offset:end] = map(add, self.values[offset:end], scaled)
+
+    def trim(self, scale: float = 1.0) -> float:
+        # Drop negligible mass from both ends, after scaling every value;
+        # returns the mass dropped
+        values = self.values
+        if scale != 1.0:
+            values = [p * scale for p in values]
+        begin, end = 0, len(values)
+        while begin < end and values[begin] < ANALYTIC_EPSILON:
+            begin += 1
+        while end > begin and values[end - 1] < ANALYTIC_EPSILON:
+            end -= 1
+        dropped = sum(values[:begin]) + sum(values[end:])
+        self.first += begin
+        self.values = values[begin:end]
+        return dropped
+
+
+def _trimmed(windows: Dict[int, _Window], scale: float = 1.0) -> Dict[int, _Window]:
+    trimmed = {}
+    for key, window in windows.items():
+        window.trim(scale)
+        if window.values:
+            trimmed[key] = window
+    return trimmed
+
+
+def _add_to(
+    windows: Dict[int, _Window], key: int, window: _Window, scale: float, shift: int
+) -> None:
+    target = windows.get(key)
+    if target is None:
+        values = window.values
+        if scale != 1.0:
+            values = [p * scale for p in values]
+        else:
+            values = list(values)
+        windows[key] = _Window(window.first + shift, values)
+    else:
+        target.add(window, scale, shift)
+
+
+class FirstPassage:
+    """
+    Exact distribution of when a single player, alone on the board, first
+    reaches the winning position: by turn (a turn is one streak of rolls),
+    by number of rolls and, on demand, jointly by turn and rolls.
+    """
+
+    def __init__(
+        self,
+        board: CompiledBoard,
+        face_probabilities: Union[Dict[int, float], None] = None,
+        tolerance: float = ANALYTIC_TOLERANCE,
+        max_turns: int = ANALYTIC_MAX_TURNS,
+    ):
+        self.board: CompiledBoard = board
+        self.face_probabilities: Dict[int, float] = (
+            face_probabilities or uniform_distribution()
+        )
+        self.faces: List[Tuple[int, float]] = [
+            (face, probability)
+            for face, probability in sorted(self.face_probabilities.items())
+            if probability > 0
+        ]
+        self.tolerance: float = tolerance
+        self.max_turns: int = max_turns
+        # Mass dropped for being negligible, or left unfinished at the horizon
+        self.residual: float = 0.0
+
+        # by_turn[t] = P(finish in turn t); turn 0 never finishes
+        self.by_turn: List[float] = self._by_turn()
+        # by_rolls[r] = P(finish with roll r); roll 0 never finishes
+        self.by_rolls: List[float] = self._by_rolls()
+        # by_turn_and_rolls[t][r] = P(finish in turn t with roll r), computed
+        # up to the turns asked for (see joint())
+        self.by_turn_and_rolls: List[Dict[int, float]] = [{}]
+
+    def _move_tables(self, repeats: int) -> MoveTables:
+        # The moves of a roll after so many repeat rolls in the turn
+        rules = self.board.rules
+        if rules.repeats_to_forfeit and repeats == rules.repeats_to_forfeit - 1:
+            return self.board.forfeit_tables
+        return self.board.tables
+
+    def _by_turn(self) -> List[float]:
+        stride = self.board.stride
+        repeat_roll = self.board.rules.repeat_roll
+        GOAL = Const.BOARD_POSITION_MAX
+
+        by_turn = [0.0]
+        turn_start: Dict[int, float] = {Const.PLAYER_START_POSITION: 1.0}
+        unfinished = 1.0
+        while unfinished > self.tolerance and len(by_turn) <= self.max_turns:
+            finished = 0.0
+            next_turn_start: Dict[int, float] = {}
+            streak = turn_start
+            repeats = 0
+            # (A die that only rolls repeat rolls never ends a turn)
+            while streak and repeats <= self.max_turns:
+                tables = self._move_tables(repeats)
+                next_position = tables.next_position
+                repeating: Dict[int, float] = {}
+                for position, p in streak.items():
+                    base = position * stride
+                    for face, probability in self.faces:
+                        q = p * probability
+                        destination = next_position[base + face]
+                        if destination == GOAL:
+                            finished += q
+                        elif face == repeat_roll and tables is self.board.tables:
+                            repeating[destination] = repeating.get(destination, 0.0) + q
+                        else:
+                            next_turn_start[destination] = (
+                                next_turn_start.get(destination, 0.0) + q
+                            )
+                streak = self._prune(repeating)
+                repeats += 1
+            self.residual += sum(streak.values())
+            by_turn.append(finished)
+            turn_start = self._prune(next_turn_start)
+            unfinished = sum(turn_start.values())
+        self.residual += unfinished
+        return by_turn
+
+    def _by_rolls(self) -> List[float]:
+        stride = self.board.stride
+        rules = self.board.rules
+        GOAL = Const.BOARD_POSITION_MAX
+
+        # (position, repeat rolls so far in the turn) -> p; the repeats only
+        # matter when they can forfeit the turn
+        by_rolls = [0.0]
+        state: Dict[Tuple[int, int], float] = {(Const.PLAYER_START_POSITION, 0): 1.0}
+        unfinished = 1.0
+        while unfinished > self.tolerance and len(state):
+            finished = 0.0
+            next_state: Dict[Tuple[int, int], float] = {}
+            for (position, repeats), p in state.items():
+                tables = self._move_tables(repeats)
+                next_position = tables.next_position
+                base = position * stride
+                for face, probability in self.faces:
+                    q = p * probability
+                    destination = next_position[base + face]
+                    if destination == GOAL:
+                        finished += q
+                        continue
+                    key = (destination, 0)
+                    if (
+                        rules.repeats_to_forfeit
+                        and face == rules.repeat_roll
+                        and tables is self.board.tables
+                    ):
+                        key = (destination, repeats + 1)
+                    next_state[key] = next_state.get(key, 0.0) + q
+            by_rolls.append(finished)
+            state = {key: p for key, p in next_state.items() if p >= ANALYTIC_EPSILON}
+            unfinished = sum(state.values())
+            if len(by_rolls) > self.max_turns * 2:
+                break
+        return by_rolls
+
+    def _prune(self, distribution: Dict[int, float]) -> Dict[int, float]:
+        pruned = {}
+        for position, p in distribution.items():
+            if p >= ANALYTIC_EPSILON:
+                pruned[position] = p
+            else:
+                self.residual += p
+        return pruned
+
+    def joint(self, turns: int) -> List[Dict[int, float]]:
+        """
+        P(finish in turn t with roll r) for the turns up to the given one.
+        This is the costly part: the state is the position along with the
+        number of extra (repeat) rolls so far.
+        """
+        turns = min(turns, len(self.by_turn) - 1)
+        if len(self.by_turn_and_rolls) > turns:
+            return self.by_turn_and_rolls
+
+        stride = self.board.stride
+        repeat_roll = self.board.rules.repeat_roll
+        GOAL = Const.BOARD_POSITION_MAX
+
+        # Unfinished players at the start of a turn, by position. Each holds
+        # the probabilities by the number of extra (repeat) rolls e so far,
+        # as a window [e0, e0 + len): a player in turn t, before a roll, has
+        # rolled t - 1 + e times.
+        # With a fair die every face is as likely: the windows add up as they
+        # are and are scaled once, by destination
+        faces = self.faces
+        scale = 1.0
+        if len({probability for _, probability in faces}) == 1:
+            scale = faces[0][1]
+            faces = [(face, 1.0) for face, _ in faces]
+
+        by_turn_and_rolls: List[Dict[int, float]] = [{}]
+        turn_start: Dict[int, _Window] = {
+            Const.PLAYER_START_POSITION: _Window(0, [1.0])
+        }
+        for turn in range(1, turns + 1):
+            finished = _Window.empty()
+            next_turn_start: Dict[int, _Window] = {}
+            streak = turn_start
+            repeats = 0
+            while streak and repeats <= self.max_turns:
+                tables = self._move_tables(repeats)
+                next_position = tables.next_position
+                repeating: Dict[int, _Window] = {}
+                for position, window in streak.items():
+                    base = position * stride
+                    for face, probability in faces:
+                        destination = next_position[base + face]
+                        if destination == GOAL:
+                            finished.add(window, probability, 0)
+                        elif face == repeat_roll and tables is self.board.tables:
+                            _add_to(repeating, destination, window, probability, 1)
+                        else:
+                            _add_to(next_turn_start, destination, window, probability, 0)
+                streak = _trimmed(repeating, scale)
+                repeats += 1
+
+            by_turn_and_rolls.append(
+                {
+                    turn + e: p * scale
+                    for e, p in enumerate(finished.values, finished.first)
+                    if p
+                }
+            )
+            turn_start = _trimmed(next_turn_start, scale)
+
+        self.by_turn_and_rolls = by_turn_and_rolls
+        return by_turn_and_rolls
+
+    def expected_rolls(self) -> float:
+        return sum(rolls * p for rolls, p in enumerate(self.by_rolls))
+
+    def expected_turns(self) -> float:
+        return sum(turn * p for turn, p in enumerate(self.by_turn))
+
+
+class MultiPlayerAnalysis:
+    """
+    Players never interact: each seat follows its own first passage, and
+    the winner is the first seat, in turn order, to finish. Seat k wins in
+    turn t if it finishes in turn t, every seat before it is still playing
+    after its own turn t and every seat after it after its turn t - 1.
+    Given the first passages the win probabilities take O(P x horizon);
+    the rolls to win need the joint (turn, rolls) first passages, but only
+    up to the turn by which all P seats have (but for the tolerance)
+    finished, which shrinks fast as P grows.
+    """
+
+    def __init__(self, seats: List[FirstPassage]):
+        self.number_of_players: int = len(seats)
+        horizon = max(len(seat.by_turn) for seat in seats)
+
+        # still_playing[k][t] = P(seat k has not finished by the end of turn t)
+        still_playing: List[List[float]] = []
+        for seat in seats:
+            survival = [1.0] * horizon
+            for turn in range(1, horizon):
+                finished = seat.by_turn[turn] if turn < len(seat.by_turn) else 0.0
+                survival[turn] = survival[turn - 1] - finished
+            still_playing.append(survival)
+
+        # Past this turn every game has (but for the tolerance) been won; the
+        # rolls to win only need the costly joint first passages up to it
+        rolls_horizon = horizon - 1
+        for turn in range(1, horizon):
+            all_playing = 1.0
+            for survival in still_playing:
+                all_playing *= survival[turn]
+            if all_playing <= min(seat.tolerance for seat in seats):
+                rolls_horizon = turn
+                break
+        joint_seats = None
+        if self.number_of_players > 1:
+            joint_seats = [seat.joint(rolls_horizon) for seat in seats]
+
+        # win_by_seat_and_turn[k][t]: P(seat k wins in its turn t)
+        self.win_by_seat_and_turn: List[List[float]] = [
+            [0.0] * horizon for _ in seats
+        ]
+        # rolls_to_win[r]: P(the winner wins with its roll r)
+        self.rolls_to_win: Dict[int, float] = {}
+        for turn in range(1, horizon):
+            # Seats after k must survive turn t - 1; seats before k, turn t
+            after = 1.0
+            others_after = [1.0] * self.number_of_players
+            for k in reversed(range(self.number_of_players)):
+                others_after[k] = after
+                after *= still_playing[k][turn - 1]
+            before = 1.0
+            for k, seat in enumerate(seats):
+                if turn < len(seat.by_turn) and seat.by_turn[turn]:
+                    others = before * others_after[k]
+                    self.win_by_seat_and_turn[k][turn] = seat.by_turn[turn] * others
+                    if joint_seats and turn < len(joint_seats[k]):
+                        for rolls, p in joint_seats[k][turn].items():
+                            self.rolls_to_win[rolls] = (
+                                self.rolls_to_win.get(rolls, 0.0) + p * others
+                            )
+                before *= still_playing[k][turn]
+        if joint_seats is None:
+            # A lone player always wins: straight from the roll-level passage
+            self.rolls_to_win = {
+                rolls: p for rolls, p in enumerate(seats[0].by_rolls) if p
+            }
+
+        self.win_by_seat: List[float] = [
+            sum(by_turn) for by_turn in self.win_by_seat_and_turn
+        ]
+
+    def first_mover_advantage(self) -> float:
+        # How much more often the first seat wins than a fair share
+        return self.win_by_seat[0] - 1 / self.number_of_players
+
+    def expected_rolls_to_win(self) -> float:
+        total = sum(self.rolls_to_win.values())
+        return sum(rolls * p for rolls, p in self.rolls_to_win.items()) / total
+
+    def rolls_to_win_quantile(self, q: float) -> int:
+        total = sum(self.rolls_to_win.values())
+        cumulative = 0.0
+        for rolls in sorted(self.rolls_to_win):
+            cumulative += self.rolls_to_win[rolls] / total
+            if cumulative >= q:
+                return rolls
+        return max(self.rolls_to_win)
+
+
+def analyse_game(game, number_of_players: Union[int, None] = None) -> MultiPlayerAnalysis:
+    board = CompiledBoard.from_game(game)
+    if number_of_players is None:
+        number_of_players = len(game.players)
+
+    # Seats rolling alike dice share one first passage
+    first_passages: Dict[Tuple[Tuple[int, float], ...], FirstPassage] = {}
+    seats = []
+    for seat in range(number_of_players):
+        distribution = game.distribution_for_seat(seat)
+        key = tuple(sorted(distribution.items()))
+        if key not in first_passages:
+            first_passages[key] = FirstPassage(board, distribution)
+        seats.append(first_passages[key])
+    return MultiPlayerAnalysis(seats)
+
+
+def print_analysis(analysis: MultiPlayerAnalysis):
+    print()
+    print(f"EXACT RESULTS FOR {analysis.number_of_players} PLAYERS")
+
+    print("Winning chances by seat:")
+    for seat, p in enumerate(analysis.win_by_seat, 1):
+        print(f"Player_{seat} = {round(p * 100, 2)}%")
+    print(
+        f"First-mover advantage = {round(analysis.first_mover_advantage() * 100, 2)}%"
+    )
+
+    print()
+    print("Winning rolls:")
+    print(f"Minimum = {min(analysis.rolls_to_win)}")
+    print(f"Average = {round(analysis.expected_rolls_to_win(), 2)}")
+    for q in (0.5, 0.9, 0.99):
+        print(f"{round(q * 100)}% of games by = {analysis.rolls_to_win_quantile(q)}")
+    print()
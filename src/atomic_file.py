@@ -0,0 +1,38 @@
+import os
+from typing import IO
+
+
+class AtomicFile:
+    """
+    A file written aside, next to its path, and only moved into place once
+    committed: a reader never sees it half written, and a write that fails
+    (or is discarded) leaves nothing behind. As a context manager, it gives
+    the file to write and commits it unless an exception is raised.
+    """
+
+    def __init__(self, path: str, mode: str = "w"):
+        self.path: str = path
+        self.temporary: str = f"{path}.{os.getpid()}.tmp"
+        self.file: IO = open(self.temporary, mode)
+
+    def commit(self) -> None:
+        try:
+            self.file.close()
+            os.replace(self.temporary, self.path)
+        except BaseException:
+            self.discard()
+            raise
+
+    def discard(self) -> None:
+        self.file.close()
+        if os.path.exists(self.temporary):
+            os.remove(self.temporary)
+
+    def __enter__(self) -> IO:
+        return self.file
+
+    def __exit__(self, exc_type, *exc_info) -> None:
+        if exc_type is None:
+            self.commit()
+        else:
+            self.discard()
@@ -0,0 +1,217 @@
+from itertools import repeat
+from operator import add, itemgetter, mul
+from typing import Dict, List, Sequence, Tuple, Union
+
+from .constants import Constants as Const
+from .analytic import ANALYTIC_MAX_TURNS, ANALYTIC_TOLERANCE
+from .board import CompiledBoard
+from .die import uniform_distribution
+
+# The rolls to win by which so many games are over, for every board
+BATCH_QUANTILES = (0.5, 0.9, 0.99)
+# The finished boards are taken out of the stacked tables once they are this
+# share of the boards still iterated
+BATCH_COMPACT_SHARE = 0.25
+
+
+class BoardEvaluation:
+    """
+    The exact rolls a lone player takes to win on a board: their expectation
+    and their quantiles (the least number of rolls by which at least that
+    share of the games are won; None where the horizon came first).
+    """
+
+    def __init__(
+        self,
+        expected_rolls: float,
+        quantiles: Dict[float, Union[int, None]],
+        rolls: int,
+        residual: float,
+    ):
+        self.expected_rolls: float = expected_rolls
+        self.quantiles: Dict[float, Union[int, None]] = quantiles
+        # Rolls iterated before the board was done with
+        self.rolls: int = rolls
+        # Share of the games left unfinished at the horizon
+        self.residual: float = residual
+
+    def to_dict(self) -> dict:
+        return {
+            "expected_rolls": self.expected_rolls,
+            "quantiles": {str(q): rolls for q, rolls in self.quantiles.items()},
+            "rolls": self.rolls,
+            "residual": self.residual,
+        }
+
+
+def _local_moves(
+    board: CompiledBoard, faces: List[Tuple[int, float]]
+) -> Tuple[int, List[List[int]]]:
+    # The state a board moves to, for every state it can reach and die face,
+    # numbered within the board from the start, the winning position last
+    # (it only moves to itself). A state is a position and, where they can
+    # forfeit the turn, the repeat rolls so far in it; the heads of snakes
+    # and bottoms of ladders are never reached. Off the tables add_artefacts
+    # compiled, as FirstPassage plays them.
+    rules = board.rules
+    stride = board.stride
+    GOAL = Const.BOARD_POSITION_MAX
+
+    def moves_from(position: int, repeats: int) -> List[Tuple[int, int]]:
+        tables = board.tables
+        if rules.repeats_to_forfeit and repeats == rules.repeats_to_forfeit - 1:
+            tables = board.forfeit_tables
+        base = position * stride
+        moves = []
+        for face, _ in faces:
+            destination = tables.next_position[base + face]
+            if destination == GOAL:
+                moves.append((GOAL, 0))
+            elif (
+                rules.repeats_to_forfeit
+                and face == rules.repeat_roll
+                and tables is board.tables
+            ):
+                moves.append((destination, repeats + 1))
+            else:
+                moves.append((destination, 0))
+        return moves
+
+    numbers: Dict[Tuple[int, int], int] = {(Const.PLAYER_START_POSITION, 0): 0}
+    reached = [(Const.PLAYER_START_POSITION, 0)]
+    by_state = []
+    for position, repeats in reached:
+        state_moves = moves_from(position, repeats)
+        for state in state_moves:
+            if state not in numbers and state[0] != GOAL:
+                numbers[state] = len(reached)
+                reached.append(state)
+        by_state.append(state_moves)
+    goal = numbers[GOAL, 0] = len(reached)
+    moves: List[List[int]] = [
+        [numbers[state_moves[face]] for state_moves in by_state] + [goal]
+        for face in range(len(faces))
+    ]
+    return goal + 1, moves
+
+
+def evaluate_boards(
+    boards: Sequence[CompiledBoard],
+    face_probabilities: Union[Dict[int, float], None] = None,
+    quantiles: Sequence[float] = BATCH_QUANTILES,
+    tolerance: float = ANALYTIC_TOLERANCE,
+    max_rolls: int = 2 * ANALYTIC_MAX_TURNS,
+) -> List[BoardEvaluation]:
+    """
+    Evaluate many boards at once, one BoardEvaluation each (in order), for
+    a lone player rolling the given die (default: a fair one). The boards
+    are stacked into one flat survival vector, S_r(s) = P(no win within r
+    rolls from state s), and every roll advances all of them together:
+    S_r+1 = sum over the faces of p x S_r gathered through the face's moves,
+    C-level gathers and sums over the whole stack rather than a loop per
+    board and position. From the start, S_r gives the quantiles and sums
+    up to the expected rolls. A board is done once its unfinished games
+    fall below the tolerance or, past its last quantile, once S_r decays
+    at so steady a rate that its geometric tail is within the tolerance;
+    the boards done are dropped from the stack as it goes.
+    """
+    faces = [
+        (face, probability)
+        for face, probability in sorted(
+            (face_probabilities or uniform_distribution()).items()
+        )
+        if probability > 0
+    ]
+    probabilities = {probability for _, probability in faces}
+    # A fair die sums the gathers, and scales them once
+    scale = probabilities.pop() if len(probabilities) == 1 else None
+    quantiles = sorted(quantiles)
+
+    # Per board: its number of states and moves by face, the survival of its
+    # states (the start first), and that of the start and its rate of decay
+    # as of the last roll
+    local = [_local_moves(board, faces) for board in boards]
+    survival: List[List[float]] = [[1.0] * (size - 1) + [0.0] for size, _ in local]
+    expected = [1.0] * len(boards)
+    last = [1.0] * len(boards)
+    found: List[Dict[float, Union[int, None]]] = [{} for _ in boards]
+    rates = [0.0] * len(boards)
+    results: List[Union[BoardEvaluation, None]] = [None] * len(boards)
+
+    active = list(range(len(boards)))
+    rolls = 0
+    while active:
+        # Stack the boards still iterated: their states one after the other
+        bases = []
+        state = []
+        for number in active:
+            bases.append(len(state))
+            state.extend(survival[number])
+        gathers = [
+            itemgetter(
+                *[
+                    destination
+                    for number, base in zip(active, bases)
+                    for destination in map(add, local[number][1][face], repeat(base))
+                ]
+            )
+            for face in range(len(faces))
+        ]
+        done = 0
+        while done <= BATCH_COMPACT_SHARE * len(active):
+            gathered = [gather(state) for gather in gathers]
+            if scale is not None:
+                total = gathered[0]
+                for face_states in gathered[1:]:
+                    total = map(add, total, face_states)
+                state = list(map(mul, total, repeat(scale)))
+            else:
+                total = map(mul, gathered[0], repeat(faces[0][1]))
+                for face_states, (_, probability) in zip(gathered[1:], faces[1:]):
+                    total = map(add, total, map(mul, face_states, repeat(probability)))
+                state = list(total)
+            rolls += 1
+
+            for number, base in zip(active, bases):
+                if results[number] is not None:
+                    continue
+                unfinished = state[base]
+                expected[number] += unfinished
+                board_quantiles = found[number]
+                for q in quantiles[len(board_quantiles) :]:
+                    if 1.0 - unfinished < q:
+                        break
+                    board_quantiles[q] = rolls
+                rate = unfinished / last[number] if last[number] else 0.0
+                tail = None
+                if unfinished <= tolerance:
+                    tail = 0.0
+                elif len(board_quantiles) == len(quantiles) and rate < 1.0:
+                    # The tail left, were the decay as steady from here on,
+                    # and how far off it would be with the rate off by as
+                    # much as it moved over the last roll
+                    error = unfinished * abs(rate - rates[number]) / (1.0 - rate) ** 2
+                    if error <= tolerance:
+                        tail = unfinished * rate / (1.0 - rate)
+                last[number] = unfinished
+                rates[number] = rate
+                if tail is None and rolls < max_rolls:
+                    continue
+                residual = 0.0
+                if tail is None:
+                    tail, residual = 0.0, unfinished
+                for q in quantiles:
+                    board_quantiles.setdefault(q, None)
+                results[number] = BoardEvaluation(
+                    expected[number] + tail, board_quantiles, rolls, residual
+                )
+                done += 1
+            if done == len(active):
+                break
+
+        # Carry the survival of the boards still iterated over
+        for number, base in zip(active, bases):
+            size = local[number][0]
+            survival[number] = state[base : base + size]
+        active = [number for number in active if results[number] is None]
+    return results  # type: ignore[return-value]
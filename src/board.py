@@ -0,0 +1,205 @@
+from typing import Dict, Iterable, List, Set, Union
+
+from .constants import Constants as Const
+from .artefact import Artefact, Snake, Ladder
+from .rules import RuleSet
+
+# Landing cell of a void move (the token does not move); no token ever
+# lands on the start position
+LANDING_NONE = Const.PLAYER_START_POSITION
+
+
+class MoveTables:
+    """
+    Outcome of every (position, die roll) move, indexed by
+    position * stride + die roll
+    """
+
+    def __init__(self, size: int):
+        self.next_position: List[int] = [0] * size
+        self.landing: List[int] = [LANDING_NONE] * size
+        self.lucky: List[int] = [0] * size
+        self.climbed: List[int] = [0] * size
+        self.slid: List[int] = [0] * size
+
+    def copy(self) -> "MoveTables":
+        tables = MoveTables(0)
+        tables.next_position = list(self.next_position)
+        tables.landing = list(self.landing)
+        tables.lucky = list(self.lucky)
+        tables.climbed = list(self.climbed)
+        tables.slid = list(self.slid)
+        return tables
+
+    def void_move(self, move: int, position: int) -> None:
+        self.next_position[move] = position
+        self.landing[move] = LANDING_NONE
+        self.lucky[move] = 0
+        self.climbed[move] = 0
+        self.slid[move] = 0
+
+
+class CompiledBoard:
+    """
+    The board and its rules folded into flat transition tables, one entry
+    per (position, die roll) move. Every entry holds the outcome of that
+    move exactly as Game.move_token plays it: bounce back (or not), lucky
+    rolls and the snake or ladder taken.
+    """
+
+    def __init__(
+        self,
+        activation_points_map: Dict[int, Artefact],
+        lucky_positions: Set[int],
+        max_roll: int = Const.DIE_ROLL_MAX,
+        rules: Union[RuleSet, None] = None,
+    ):
+        self.activation_points_map: Dict[int, Artefact] = dict(activation_points_map)
+        self.lucky_positions: Set[int] = set(lucky_positions)
+        self.max_roll: int = max_roll
+        self.rules: RuleSet = rules or RuleSet()
+        self.stride: int = max_roll + 1
+
+        self.tables = MoveTables(Const.BOARD_POSITION_MAX * self.stride)
+        # The token never starts a move from the winning position
+        for position in range(Const.PLAYER_START_POSITION, Const.BOARD_POSITION_MAX):
+            for die_roll in range(Const.DIE_ROLL_MIN, max_roll + 1):
+                self._compile_move(position, die_roll)
+
+        # The same moves, except that the repeat roll is void; played when
+        # the next repeat roll would forfeit the turn
+        self.forfeit_tables: Union[MoveTables, None] = None
+        if self.rules.repeats_to_forfeit:
+            self.forfeit_tables = self.tables.copy()
+            for position in range(
+                Const.PLAYER_START_POSITION, Const.BOARD_POSITION_MAX
+            ):
+                self.forfeit_tables.void_move(
+                    position * self.stride + self.rules.repeat_roll, position
+                )
+
+        self._set_shorthands()
+
+    def _set_shorthands(self) -> None:
+        # Shorthands for the default tables
+        self.next_position = self.tables.next_position
+        self.landing = self.tables.landing
+        self.lucky = self.tables.lucky
+        self.climbed = self.tables.climbed
+        self.slid = self.tables.slid
+
+    @classmethod
+    def from_game(cls, game, max_roll: Union[int, None] = None) -> "CompiledBoard":
+        # By default, every roll of the game's dice; the game's board compiled
+        # ahead (e.g. read from a board file) where it is for those rolls
+        max_roll = max_roll or game.max_roll()
+        compiled_board = getattr(game, "compiled_board", None)
+        if compiled_board is not None and compiled_board.max_roll == max_roll:
+            return compiled_board
+        return cls(
+            game.activation_points_map,
+            game.lucky_positions,
+            max_roll,
+            game.rules,
+        )
+
+    @classmethod
+    def from_tables(
+        cls,
+        activation_points_map: Dict[int, Artefact],
+        lucky_positions: Set[int],
+        max_roll: int,
+        rules: RuleSet,
+        tables: MoveTables,
+        forfeit_tables: Union[MoveTables, None] = None,
+    ) -> "CompiledBoard":
+        # A board compiled ahead, its tables taken as they are (any sequences
+        # of ints, e.g. views of a board file)
+        board = cls.__new__(cls)
+        board.activation_points_map = dict(activation_points_map)
+        board.lucky_positions = set(lucky_positions)
+        board.max_roll = max_roll
+        board.rules = rules
+        board.stride = max_roll + 1
+        board.tables = tables
+        board.forfeit_tables = forfeit_tables
+        board._set_shorthands()
+        return board
+
+    def _compile_move(self, position: int, die_roll: int) -> None:
+        move = position * self.stride + die_roll
+        lucky = 0
+        bounced = False
+
+        # Last lucky roll from the lucky zone
+        if (
+            position >= Const.BOARD_LAST_LUCKY_ZONE_BEGIN
+            and position + die_roll == Const.BOARD_POSITION_MAX
+        ):
+            lucky += 1
+
+        if position + die_roll > Const.BOARD_POSITION_MAX:
+            if self.rules.exact_roll_to_win:
+                self.tables.void_move(move, position)
+                return
+            landing = (
+                Const.BOARD_POSITION_MAX
+                - die_roll
+                + (Const.BOARD_POSITION_MAX - position)
+            )
+            bounced = True
+        else:
+            landing = position + die_roll
+
+        # Missed a snake by 1 or 2 positions
+        if landing in self.lucky_positions:
+            lucky += 1
+
+        destination = landing
+        artefact = self.activation_points_map.get(landing)
+        if isinstance(artefact, Snake):
+            destination = artefact.termination_point
+            self.tables.slid[move] = artefact.distance
+        elif isinstance(artefact, Ladder) and (
+            self.rules.ladders_on_bounce_back or not bounced
+        ):
+            destination = artefact.termination_point
+            self.tables.climbed[move] = artefact.distance
+            lucky += 1
+
+        self.tables.next_position[move] = destination
+        self.tables.landing[move] = landing
+        self.tables.lucky[move] = lucky
+
+
+def board_can_finish(
+    board: CompiledBoard, faces: Union[Iterable[int], None] = None
+) -> bool:
+    # Every position a token can reach, rolling the die of these faces (by
+    # default every roll the board is compiled for), must still be able to
+    # reach the winning position; otherwise some games never end
+    faces = list(faces or range(Const.DIE_ROLL_MIN, board.max_roll + 1))
+    moves = {
+        position: {
+            board.next_position[position * board.stride + die_roll]
+            for die_roll in faces
+        }
+        for position in range(Const.PLAYER_START_POSITION, Const.BOARD_POSITION_MAX)
+    }
+    reachable = {Const.PLAYER_START_POSITION}
+    pending = [Const.PLAYER_START_POSITION]
+    while pending:
+        for position in moves.get(pending.pop(), ()):
+            if position not in reachable:
+                reachable.add(position)
+                pending.append(position)
+
+    finishing = {Const.BOARD_POSITION_MAX}
+    changed = True
+    while changed:
+        changed = False
+        for position, destinations in moves.items():
+            if position not in finishing and destinations & finishing:
+                finishing.add(position)
+                changed = True
+    return reachable <= finishing
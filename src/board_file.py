@@ -0,0 +1,208 @@
+import mmap
+import os
+import struct
+import zlib
+from typing import Dict, List, Tuple
+
+from .constants import Constants as Const
+from .artefact import Artefact, Snake, Ladder
+from .atomic_file import AtomicFile
+from .board import CompiledBoard, MoveTables
+from .game_exceptions import ERROR_MESSAGE_BOARD_FILE_FORMAT
+from .rules import RuleSet
+
+# A board file is a header, then the snakes (head, tail) and the ladders
+# (bottom, top), the lucky positions and the move tables (the default ones,
+# then those of the forfeits where the house rules have them), each table
+# one byte per (position, die roll) move: every position, roll and distance
+# fits in one. A CRC-32 of everything after the header checks the file.
+BOARD_FILE_MAGIC = b"SLCB"
+BOARD_FILE_VERSION = 1
+# Magic, version, max roll, house rules (one bit each, in the order of
+# RuleSet.RULE_NAMES), numbers of snakes, of ladders, of lucky positions and
+# of move tables, and the CRC-32
+BOARD_FILE_HEADER = struct.Struct("<4sHHHHHHHI")
+BOARD_FILE_TABLES = ("next_position", "landing", "lucky", "climbed", "slid")
+
+
+def _rules_bits(rules: RuleSet) -> int:
+    return sum(
+        1 << bit for bit, name in enumerate(RuleSet.RULE_NAMES) if name in rules.names
+    )
+
+
+def _rules_from_bits(bits: int) -> RuleSet:
+    return RuleSet(
+        name for bit, name in enumerate(RuleSet.RULE_NAMES) if bits >> bit & 1
+    )
+
+
+def write_board_file(path: str, board: CompiledBoard) -> int:
+    """
+    Write a compiled board (checked as the game was set up) to a board file;
+    gives its size in bytes
+    """
+    artefacts = list(board.activation_points_map.values())
+    snakes = [artefact for artefact in artefacts if isinstance(artefact, Snake)]
+    ladders = [artefact for artefact in artefacts if isinstance(artefact, Ladder)]
+    table_sets = [board.tables]
+    if board.forfeit_tables is not None:
+        table_sets.append(board.forfeit_tables)
+
+    body = bytearray()
+    for artefact in snakes + ladders:
+        body += bytes([artefact.activation_point, artefact.termination_point])
+    body += bytes(sorted(board.lucky_positions))
+    for tables in table_sets:
+        for name in BOARD_FILE_TABLES:
+            body += bytes(getattr(tables, name))
+    header = BOARD_FILE_HEADER.pack(
+        BOARD_FILE_MAGIC,
+        BOARD_FILE_VERSION,
+        board.max_roll,
+        _rules_bits(board.rules),
+        len(snakes),
+        len(ladders),
+        len(board.lucky_positions),
+        len(table_sets),
+        zlib.crc32(body),
+    )
+    # Written aside and moved into place: processes that mapped the file
+    # before keep reading the board they checked, never one half written
+    with AtomicFile(path, "wb") as board_file:
+        board_file.write(header)
+        board_file.write(body)
+    return len(header) + len(body)
+
+
+class BoardFile:
+    """
+    A board file, read through a memory map: the move tables of its board
+    are views of the mapped pages, not parsed nor copied, so that every
+    process playing off the file shares them (through the page cache). Only
+    the few snakes and ladders are built as objects. Raises ValueError for a
+    file that is not a board file of this version, or is damaged.
+    """
+
+    def __init__(self, path: str):
+        self.path: str = path
+        with open(path, "rb") as board_file:
+            try:
+                self.map = mmap.mmap(board_file.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # An empty file can not be mapped
+                raise ValueError(ERROR_MESSAGE_BOARD_FILE_FORMAT.format(path=path))
+        try:
+            (
+                magic,
+                version,
+                max_roll,
+                rules_bits,
+                number_of_snakes,
+                number_of_ladders,
+                number_of_lucky_positions,
+                number_of_table_sets,
+                crc,
+            ) = BOARD_FILE_HEADER.unpack_from(self.map)
+        except struct.error:
+            magic = None
+        view = memoryview(self.map)
+        size = table_size = 0
+        if magic == BOARD_FILE_MAGIC:
+            table_size = Const.BOARD_POSITION_MAX * (max_roll + 1)
+            size = (
+                BOARD_FILE_HEADER.size
+                + 2 * (number_of_snakes + number_of_ladders)
+                + number_of_lucky_positions
+                + number_of_table_sets * len(BOARD_FILE_TABLES) * table_size
+            )
+        if (
+            magic != BOARD_FILE_MAGIC
+            or version != BOARD_FILE_VERSION
+            or size != len(self.map)
+            or not Const.DIE_ROLL_MIN <= max_roll <= Const.DIE_FACE_MAX
+            or number_of_table_sets not in (1, 2)
+            or zlib.crc32(view[BOARD_FILE_HEADER.size :]) != crc
+        ):
+            view.release()
+            self.map.close()
+            raise ValueError(ERROR_MESSAGE_BOARD_FILE_FORMAT.format(path=path))
+
+        offset = BOARD_FILE_HEADER.size
+        artefacts: List[Artefact] = []
+        for number in range(number_of_snakes + number_of_ladders):
+            start, end = view[offset : offset + 2]
+            offset += 2
+            if number < number_of_snakes:
+                artefacts.append(Snake(head=start, tail=end))
+            else:
+                artefacts.append(Ladder(bottom=start, top=end))
+        lucky_positions = set(view[offset : offset + number_of_lucky_positions])
+        offset += number_of_lucky_positions
+        table_sets: List[MoveTables] = []
+        for _ in range(number_of_table_sets):
+            tables = MoveTables(0)
+            for name in BOARD_FILE_TABLES:
+                setattr(tables, name, view[offset : offset + table_size])
+                offset += table_size
+            table_sets.append(tables)
+        self.view = view
+        self.board: CompiledBoard = CompiledBoard.from_tables(
+            {artefact.activation_point: artefact for artefact in artefacts},
+            lucky_positions,
+            max_roll,
+            _rules_from_bits(rules_bits),
+            table_sets[0],
+            table_sets[1] if number_of_table_sets == 2 else None,
+        )
+
+    @property
+    def snakes(self) -> List[Tuple[int, int]]:
+        return [
+            (artefact.activation_point, artefact.termination_point)
+            for artefact in self.board.activation_points_map.values()
+            if isinstance(artefact, Snake)
+        ]
+
+    @property
+    def ladders(self) -> List[Tuple[int, int]]:
+        return [
+            (artefact.activation_point, artefact.termination_point)
+            for artefact in self.board.activation_points_map.values()
+            if isinstance(artefact, Ladder)
+        ]
+
+    def close(self) -> None:
+        # The board's tables are views of the map: not to be played after
+        for tables in (self.board.tables, self.board.forfeit_tables):
+            if tables is not None:
+                for name in BOARD_FILE_TABLES:
+                    getattr(tables, name).release()
+        self.view.release()
+        self.map.close()
+
+    def __enter__(self) -> "BoardFile":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+# Board files opened by this process, by path, inode and modification time:
+# every game set up from one plays off the same mapped tables, and a file
+# compiled again since is mapped afresh
+_BOARD_FILES: Dict[Tuple[str, int, float], BoardFile] = {}
+
+
+def open_board_file(path: str) -> BoardFile:
+    # Mapped once per process, e.g. by every worker of the pipeline
+    status = os.stat(path)
+    key = (path, status.st_ino, status.st_mtime)
+    board_file = _BOARD_FILES.get(key)
+    if board_file is None:
+        # The boards of an older mapping may still be played: it is only
+        # forgotten, not closed
+        for stale in [stale for stale in _BOARD_FILES if stale[0] == path]:
+            del _BOARD_FILES[stale]
+        board_file = _BOARD_FILES[key] = BoardFile(path)
+    return board_file
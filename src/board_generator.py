@@ -0,0 +1,200 @@
+from array import array
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from random import Random
+from typing import Deque, Iterator, List, Tuple, Union
+
+from .constants import Constants as Const
+from .game_exceptions import ERROR_MESSAGE_BOARD_COUNTS
+
+# Candidate artefacts drawn from the random stream at a time
+BOARD_GENERATOR_DRAWS = 4096
+# Candidates turned down before a board is started over (the ones placed may
+# leave no room for the others), and the boards started over before its
+# counts of snakes and ladders are taken not to fit on a board
+BOARD_GENERATOR_MAX_REJECTIONS = 1000
+BOARD_GENERATOR_MAX_RESTARTS = 100
+# Boards generated off one random stream: a run's boards depend only on its
+# seed, whatever the number of workers generating them
+BOARD_GENERATOR_BLOCK = 10000
+
+# Snakes (head, tail) and ladders (bottom, top) by their two positions
+Board = Tuple[List[List[int]], List[List[int]]]
+
+
+def _row(position: int) -> int:
+    return (position - 1) // Const.BOARD_ROW_SIZE
+
+
+def valid_snakes() -> List[Tuple[int, int]]:
+    # Every (head, tail) Snake() accepts: downwards, across rows, not from
+    # the winning position
+    return [
+        (head, tail)
+        for head in range(Const.BOARD_POSITION_MIN, Const.BOARD_POSITION_MAX)
+        for tail in range(Const.BOARD_POSITION_MIN, head)
+        if _row(head) != _row(tail)
+    ]
+
+
+def valid_ladders() -> List[Tuple[int, int]]:
+    # Every (bottom, top) Ladder() accepts: upwards, across rows, not all the
+    # way from the first to the winning position
+    return [
+        (bottom, top)
+        for bottom in range(Const.BOARD_POSITION_MIN, Const.BOARD_POSITION_MAX)
+        for top in range(bottom + 1, Const.BOARD_POSITION_MAX + 1)
+        if _row(bottom) != _row(top)
+        and (bottom, top) != (Const.BOARD_POSITION_MIN, Const.BOARD_POSITION_MAX)
+    ]
+
+
+class BoardGenerator:
+    """
+    Random boards of exactly so many snakes and so many ladders, every one
+    of which Snake(), Ladder() and Game.add_artefacts() accept, sampled
+    directly: no artefact is built and no exception raised. The snakes and
+    ladders are placed in turn, each drawn from every valid one (uniformly,
+    off a block of random words drawn at once) until one does not start
+    where another starts or ends, nor end where another starts. Each is
+    thus uniform among those that fit the ones before it (the boards are
+    not quite uniform among all valid boards: crowded ones come up less
+    often).
+
+    Boards depend only on the seed and the stream (e.g. the worker
+    generating them). Whether every game on a board finishes depends on the
+    house rules and dice (see board.board_can_finish).
+    """
+
+    def __init__(
+        self,
+        number_of_snakes: int,
+        number_of_ladders: int,
+        seed: Union[int, None] = None,
+        stream: int = 0,
+    ):
+        self.number_of_snakes: int = number_of_snakes
+        self.number_of_ladders: int = number_of_ladders
+        self.rng: Random = Random() if seed is None else Random(f"{seed}:{stream}")
+        snakes, ladders = valid_snakes(), valid_ladders()
+        self.snake_heads: bytes = bytes(head for head, _ in snakes)
+        self.snake_tails: bytes = bytes(tail for _, tail in snakes)
+        self.ladder_bottoms: bytes = bytes(bottom for bottom, _ in ladders)
+        self.ladder_tops: bytes = bytes(top for _, top in ladders)
+        self.draws: array = array("I")
+        self.next_draw: int = 0
+        # Of the boards generated, how many candidates were turned down
+        self.number_of_rejections: int = 0
+
+    def _draw(self) -> None:
+        # A block of random 32-bit words, each to pick a candidate
+        words = self.rng.getrandbits(32 * BOARD_GENERATOR_DRAWS)
+        self.draws = array("I", words.to_bytes(4 * BOARD_GENERATOR_DRAWS, "little"))
+        self.next_draw = 0
+
+    def board(self) -> Board:
+        for _ in range(BOARD_GENERATOR_MAX_RESTARTS):
+            board = self._place()
+            if board is not None:
+                return board
+        raise ValueError(
+            ERROR_MESSAGE_BOARD_COUNTS.format(
+                snakes=self.number_of_snakes, ladders=self.number_of_ladders
+            )
+        )
+
+    def _place(self) -> Union[Board, None]:
+        snakes: List[List[int]] = []
+        ladders: List[List[int]] = []
+        # Per position: 1 where an artefact starts, 2 where one only ends
+        used = bytearray(Const.BOARD_POSITION_MAX + 1)
+        number_of_snakes = self.number_of_snakes
+        number_of_ladders = self.number_of_ladders
+        snake_candidates = len(self.snake_heads)
+        ladder_candidates = len(self.ladder_bottoms)
+        rejections = 0
+        # Snakes and ladders take turns, so that neither gets the board
+        # to itself first
+        while len(snakes) < number_of_snakes or len(ladders) < number_of_ladders:
+            is_snake = len(snakes) < number_of_snakes and (
+                len(ladders) >= number_of_ladders or len(snakes) <= len(ladders)
+            )
+            if self.next_draw == len(self.draws):
+                self._draw()
+            word = self.draws[self.next_draw]
+            self.next_draw += 1
+            if is_snake:
+                candidate = (word * snake_candidates) >> 32
+                start = self.snake_heads[candidate]
+                end = self.snake_tails[candidate]
+            else:
+                candidate = (word * ladder_candidates) >> 32
+                start = self.ladder_bottoms[candidate]
+                end = self.ladder_tops[candidate]
+            if used[start] or used[end] == 1:
+                rejections += 1
+                if rejections > BOARD_GENERATOR_MAX_REJECTIONS:
+                    self.number_of_rejections += rejections
+                    return None
+                continue
+            used[start] = 1
+            used[end] = 2
+            (snakes if is_snake else ladders).append([start, end])
+        self.number_of_rejections += rejections
+        return snakes, ladders
+
+    def boards(self, number_of_boards: int) -> Iterator[Board]:
+        for _ in range(number_of_boards):
+            yield self.board()
+
+
+def _generate_block(
+    number_of_snakes: int,
+    number_of_ladders: int,
+    seed: int,
+    block: int,
+    number_of_boards: int,
+) -> List[Board]:
+    generator = BoardGenerator(number_of_snakes, number_of_ladders, seed, block)
+    return list(generator.boards(number_of_boards))
+
+
+def generate_boards(
+    number_of_boards: int,
+    number_of_snakes: int,
+    number_of_ladders: int,
+    seed: int,
+    number_of_workers: int = 0,
+) -> Iterator[Board]:
+    """
+    So many random valid boards, in blocks of BOARD_GENERATOR_BLOCK boards
+    each off a stream of its own, generated by a pool of worker processes
+    (0: in this process). The boards come in order, and are the same
+    whatever the number of workers.
+    """
+    blocks = (
+        (
+            number_of_snakes,
+            number_of_ladders,
+            seed,
+            block,
+            min(BOARD_GENERATOR_BLOCK, number_of_boards - first),
+        )
+        for block, first in enumerate(
+            range(0, number_of_boards, BOARD_GENERATOR_BLOCK)
+        )
+    )
+    if number_of_workers <= 0:
+        for arguments in blocks:
+            yield from _generate_block(*arguments)
+        return
+    # A couple of blocks per worker at most are generated ahead of the
+    # boards handed out
+    with ProcessPoolExecutor(number_of_workers) as executor:
+        pending: Deque[Future] = deque()
+        for arguments in blocks:
+            pending.append(executor.submit(_generate_block, *arguments))
+            if len(pending) >= 2 * number_of_workers:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
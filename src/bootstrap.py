@@ -0,0 +1,363 @@
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from math import exp, floor, lgamma, log, sqrt
+from operator import add, mul
+from random import Random
+from typing import Callable, Dict, Iterable, List, Tuple, Union
+
+from .constants import Constants as Const
+from .game_exceptions import ERROR_MESSAGE_BOOTSTRAP
+from .game_stats import GameStats
+from .game_stats_columns import GameStatsColumns
+from .stats_accumulator import StatsAccumulator
+
+# The histogram of the games' longest streaks, by their sums: SimulationStats
+# keeps the biggest
+STREAK_SUM = "max_streak_sum"
+# Every statistic of SimulationStats, by the histogram it is worked out from
+# and how: the smallest or biggest value of a game, or the average
+BOOTSTRAP_STATISTICS: Dict[str, Tuple[str, str]] = {
+    "min_number_of_win_rolls": ("game_number_of_rolls_to_win", "min"),
+    "avg_number_of_win_rolls": ("game_number_of_rolls_to_win", "avg"),
+    "max_number_of_win_rolls": ("game_number_of_rolls_to_win", "max"),
+    "min_unlucky_rolls": ("game_total_unlucky_rolls", "min"),
+    "avg_unlucky_rolls": ("game_total_unlucky_rolls", "avg"),
+    "max_unlucky_rolls": ("game_total_unlucky_rolls", "max"),
+    "min_lucky_rolls": ("game_total_lucky_rolls", "min"),
+    "avg_lucky_rolls": ("game_total_lucky_rolls", "avg"),
+    "max_lucky_rolls": ("game_total_lucky_rolls", "max"),
+    "min_distance_climbed": ("game_min_distance_climbed", "min"),
+    "avg_distance_climbed": ("game_total_distance_climbed", "avg"),
+    "max_distance_climbed": ("game_max_distance_climbed", "max"),
+    "biggest_climb_in_a_streak": ("biggest_climb_in_a_streak", "max"),
+    "min_distance_slid": ("game_min_distance_slide", "min"),
+    "avg_distance_slid": ("game_total_distance_slid", "avg"),
+    "max_distance_slid": ("game_max_distance_slide", "max"),
+    "biggest_slide_in_a_streak": ("biggest_slide_in_a_streak", "max"),
+    "max_streak": (STREAK_SUM, "max"),
+}
+# Replicates drawn off one random stream: the intervals depend only on the
+# seed, whatever the number of workers drawing them
+BOOTSTRAP_BLOCK = 100
+# Below this mean, Poisson counts are drawn by inversion; from it, by the
+# transformed rejection (PTRS) of Hormann, "The transformed rejection method
+# for generating Poisson random variables" (1993)
+_POISSON_INVERSION_MAX = 10
+
+Histogram = Dict[Union[int, Tuple[int, int]], int]
+
+
+def streak_sum_histogram(game_stats: Iterable[GameStats]) -> Dict[int, int]:
+    # The sums of the games' longest streaks (of the games won), column by
+    # column where the games are held in columns
+    if not isinstance(game_stats, GameStatsColumns):
+        return dict(
+            Counter(
+                sum(game_stat.game_max_streak)
+                for game_stat in game_stats
+                if not game_stat.truncated
+            )
+        )
+    if game_stats.truncated:
+        game_stats = game_stats.won_games()
+    return dict(Counter(game_stats.streak_sums()))
+
+
+def joint_histogram(
+    game_stats: Iterable[GameStats], numerator: str, denominator: str
+) -> Dict[Tuple[int, int], int]:
+    """
+    The games won by their (numerator, denominator) pair of fields: what a
+    ratio of two averages (e.g. lucky per unlucky roll) is bootstrapped
+    from, so that the two are resampled together, game by game
+    """
+    if isinstance(game_stats, GameStatsColumns):
+        if game_stats.truncated:
+            game_stats = game_stats.won_games()
+        return dict(
+            Counter(
+                zip(
+                    game_stats.columns[numerator], game_stats.columns[denominator]
+                )
+            )
+        )
+    return dict(
+        Counter(
+            (getattr(game_stat, numerator), getattr(game_stat, denominator))
+            for game_stat in game_stats
+            if not game_stat.truncated
+        )
+    )
+
+
+def bootstrap_histograms(
+    accumulator: StatsAccumulator,
+    game_stats: Union[Iterable[GameStats], None] = None,
+) -> Dict[str, Histogram]:
+    # Those of the accumulator, and the streak sums where the games are kept
+    histograms: Dict[str, Histogram] = dict(accumulator.histograms)
+    if game_stats is not None:
+        histograms[STREAK_SUM] = streak_sum_histogram(game_stats)
+    return histograms
+
+
+def _poisson_sampler(mean: float) -> Callable[[Callable[[], float], int], List[int]]:
+    # Draws so many Poisson counts of the mean, its constants worked out once
+    if mean < _POISSON_INVERSION_MAX:
+        zero = exp(-mean)
+
+        def draw_by_inversion(random: Callable[[], float], n: int) -> List[int]:
+            counts = []
+            for _ in range(n):
+                count, p = 0, zero
+                cumulative, u = p, random()
+                while u > cumulative and p:
+                    count += 1
+                    p *= mean / count
+                    cumulative += p
+                counts.append(count)
+            return counts
+
+        return draw_by_inversion
+
+    log_mean = log(mean)
+    b = 0.931 + 2.53 * sqrt(mean)
+    a = -0.059 + 0.02483 * b
+    log_inverse_alpha = log(1.1239 + 1.1328 / (b - 3.4))
+    v_r = 0.9277 - 3.6224 / (b - 2)
+
+    def draw_by_rejection(random: Callable[[], float], n: int) -> List[int]:
+        counts = []
+        for _ in range(n):
+            while True:
+                u = random() - 0.5
+                v = random()
+                us = 0.5 - abs(u)
+                count = floor((2 * a / us + b) * u + mean + 0.43)
+                if us >= 0.07 and v <= v_r:
+                    break
+                if count < 0 or (us < 0.013 and v > us):
+                    continue
+                if log(v) + log_inverse_alpha - log(a / (us * us) + b) <= (
+                    -mean + count * log_mean - lgamma(count + 1)
+                ):
+                    break
+            counts.append(count)
+        return counts
+
+    return draw_by_rejection
+
+
+def _extremes(
+    histogram: Histogram, biggest: bool, random: Callable[[], float], n: int
+) -> List[float]:
+    """
+    The smallest (or biggest) value of so many resamples: scanning the
+    values from that end, each resample keeps a value unless its count
+    comes out 0 (so with chance exp(-count)); most stop at the first few
+    """
+    values: List[float] = [float("nan")] * n
+    pending = range(n)
+    for value in sorted(histogram, reverse=biggest):
+        missing = exp(-histogram[value])
+        kept = []
+        still_pending = []
+        for replicate in pending:
+            (still_pending if random() < missing else kept).append(replicate)
+        for replicate in kept:
+            values[replicate] = value
+        pending = still_pending
+        if not pending:
+            break
+    return values
+
+
+def _replicate_block(
+    histograms: Dict[str, Histogram],
+    statistics: Dict[str, Tuple[str, str]],
+    seed: Union[int, None],
+    block: int,
+    n: int,
+) -> Dict[str, List[float]]:
+    """
+    So many replicates of every statistic, a whole block a value at a time:
+    every value of a histogram has its count drawn for all the replicates at
+    once and added into the replicates' sums, so that the work is per value
+    and replicate, whatever the number of games
+    """
+    rng = Random() if seed is None else Random(f"{seed}:{block}")
+    random = rng.random
+    replicates: Dict[str, List[float]] = {}
+    # The averages (and ratios) of a histogram share its counts
+    averaged: Dict[str, List[str]] = {}
+    for statistic, (name, kind) in statistics.items():
+        if kind in ("min", "max"):
+            replicates[statistic] = _extremes(
+                histograms[name], kind == "max", random, n
+            )
+        else:
+            averaged.setdefault(name, []).append(statistic)
+    for name, averages in averaged.items():
+        histogram = histograms[name]
+        ratio = {
+            statistic: statistics[statistic][1] == "ratio" for statistic in averages
+        }
+        numerators = {statistic: [0] * n for statistic in averages}
+        denominators = {statistic: [0] * n for statistic in averages}
+        games = [0] * n
+        for value, count in histogram.items():
+            counts = _poisson_sampler(count)(random, n)
+            games = list(map(add, games, counts))
+            for statistic in averages:
+                numerator, denominator = value if ratio[statistic] else (value, 1)
+                numerators[statistic] = list(
+                    map(add, numerators[statistic], map(mul, counts, repeat(numerator)))
+                )
+                if ratio[statistic]:
+                    denominators[statistic] = list(
+                        map(
+                            add,
+                            denominators[statistic],
+                            map(mul, counts, repeat(denominator)),
+                        )
+                    )
+        for statistic in averages:
+            totals = denominators[statistic] if ratio[statistic] else games
+            replicates[statistic] = [
+                numerator / total if total else float("nan")
+                for numerator, total in zip(numerators[statistic], totals)
+            ]
+    return replicates
+
+
+def _estimate(histogram: Histogram, kind: str) -> float:
+    # The statistic over the games themselves
+    if not histogram:
+        return float("nan")
+    if kind == "min":
+        return min(histogram)
+    if kind == "max":
+        return max(histogram)
+    if kind == "avg":
+        return sum(value * count for value, count in histogram.items()) / sum(
+            histogram.values()
+        )
+    denominator = sum(value[1] * count for value, count in histogram.items())
+    if not denominator:
+        return float("nan")
+    return sum(value[0] * count for value, count in histogram.items()) / denominator
+
+
+class BootstrapInterval:
+    """
+    A statistic over the games played, with the percentile interval of its
+    bootstrap replicates (and their standard deviation, its standard error).
+    The interval of a minimum or maximum holds values that came up in the
+    games only: it tells how far the one observed could have come out with
+    other games like them, not how much further the true extreme lies.
+    """
+
+    def __init__(
+        self,
+        statistic: str,
+        estimate: float,
+        low: float,
+        high: float,
+        standard_error: float,
+        confidence: float,
+        replicates: int,
+    ):
+        self.statistic: str = statistic
+        self.estimate: float = estimate
+        self.low: float = low
+        self.high: float = high
+        self.standard_error: float = standard_error
+        self.confidence: float = confidence
+        # Replicates the interval is drawn from (those in which no game came
+        # up, with no value, are left out)
+        self.replicates: int = replicates
+
+    def to_dict(self) -> dict:
+        return {
+            "statistic": self.statistic,
+            "estimate": self.estimate,
+            "low": self.low,
+            "high": self.high,
+            "standard_error": self.standard_error,
+            "confidence": self.confidence,
+            "replicates": self.replicates,
+        }
+
+
+def _interval(
+    statistic: str, estimate: float, values: List[float], confidence: float
+) -> BootstrapInterval:
+    values = sorted(value for value in values if value == value)
+    if not values:
+        nan = float("nan")
+        return BootstrapInterval(statistic, estimate, nan, nan, nan, confidence, 0)
+    n = len(values)
+    tail = (1 - confidence) / 2
+    low = values[round(tail * (n - 1))]
+    high = values[round((1 - tail) * (n - 1))]
+    mean = sum(values) / n
+    variance = sum((value - mean) ** 2 for value in values) / max(n - 1, 1)
+    return BootstrapInterval(
+        statistic, estimate, low, high, sqrt(variance), confidence, n
+    )
+
+
+def bootstrap_intervals(
+    histograms: Dict[str, Histogram],
+    replicates: int = Const.BOOTSTRAP_REPLICATES,
+    confidence: float = Const.BOOTSTRAP_CONFIDENCE,
+    seed: Union[int, None] = None,
+    number_of_workers: int = 0,
+    statistics: Union[Dict[str, Tuple[str, str]], None] = None,
+) -> List[BootstrapInterval]:
+    """
+    Bootstrap confidence intervals of the statistics (by default, every
+    statistic of SimulationStats whose histogram is given: see
+    bootstrap_histograms) off the histograms of the games' values, never
+    the games themselves. Each replicate resamples the games by the Poisson
+    bootstrap: every game comes up a Poisson(1) number of times, so a value
+    that came up in so many games comes up a Poisson(so many) number of
+    times. Resampling therefore takes a count per value and replicate, in
+    the seconds for ten million games as for ten thousand.
+
+    The replicates are drawn in blocks of BOOTSTRAP_BLOCK, each off a stream
+    of its own, by a pool of worker processes (0: in this process): with a
+    seed, the intervals are the same whatever the number of workers.
+    Raises ValueError for no replicates, or a confidence not between 0 and 1.
+    """
+    if replicates < 1 or not 0 < confidence < 1:
+        raise ValueError(
+            ERROR_MESSAGE_BOOTSTRAP.format(
+                replicates=replicates, confidence=confidence
+            )
+        )
+    if statistics is None:
+        statistics = {
+            statistic: (name, kind)
+            for statistic, (name, kind) in BOOTSTRAP_STATISTICS.items()
+            if name in histograms
+        }
+    blocks = [
+        (histograms, statistics, seed, block, min(BOOTSTRAP_BLOCK, replicates - first))
+        for block, first in enumerate(range(0, replicates, BOOTSTRAP_BLOCK))
+    ]
+    if number_of_workers <= 0 or len(blocks) == 1:
+        results = [_replicate_block(*arguments) for arguments in blocks]
+    else:
+        with ProcessPoolExecutor(min(number_of_workers, len(blocks))) as executor:
+            results = list(executor.map(_replicate_block, *zip(*blocks)))
+    return [
+        _interval(
+            statistic,
+            _estimate(histograms[name], kind),
+            [value for result in results for value in result[statistic]],
+            confidence,
+        )
+        for statistic, (name, kind) in statistics.items()
+    ]
@@ -0,0 +1,422 @@
+import hashlib
+import linecache
+import sys
+from typing import Callable, Dict, FrozenSet, Iterable, Iterator, Tuple, Union
+
+from .constants import Constants as Const
+from .board import CompiledBoard
+from .die import Die
+from .fast_engine import FastGame
+from .game_stats import GameStats
+from .stats_accumulator import StatsAccumulator
+
+# Every statistic a game reports, as named in GameStats (the rolls to win
+# are always worked out)
+CODEGEN_STATISTICS: Tuple[str, ...] = StatsAccumulator.FIELDS + ("game_max_streak",)
+# The statistics worked out together, by the feature of the generated code
+# that works them out: a feature is left out where none of its statistics
+# is asked for (those keep their GameStats defaults)
+CODEGEN_FEATURE_STATISTICS: Dict[str, Tuple[str, ...]] = {
+    "lucky": ("game_total_lucky_rolls",),
+    "climb": (
+        "game_min_distance_climbed",
+        "game_max_distance_climbed",
+        "game_total_distance_climbed",
+    ),
+    "climb_streak": ("biggest_climb_in_a_streak",),
+    "slide": (
+        "game_total_unlucky_rolls",
+        "game_min_distance_slide",
+        "game_max_distance_slide",
+        "game_total_distance_slid",
+    ),
+    "slide_streak": ("biggest_slide_in_a_streak",),
+    "streak": ("game_max_streak",),
+}
+
+# The play_game function generated for a board, with the rest of it folded
+# in by feature. A line ending in a "#: " tag is only kept where its
+# features (joined by "&", "!" for one left out) are all in; {NAMES} are
+# filled in with the board's tables and constants.
+_TEMPLATE = """\
+def play_game(engine, simulation_number):
+    number_of_players = engine.number_of_players
+    if number_of_players == 0:
+        return None
+    if simulation_number < 1 or simulation_number > engine.number_of_simulations:
+        return None
+
+    next_position = {NEXT_POSITION}
+    lucky_table = {LUCKY}  #: lucky
+    effect_table = {EFFECT}  #: effect
+    move_counts = engine.move_counts  #: moves
+    positions = engine.positions
+    rolls = engine.rolls
+    max_streak_sum = engine.max_streak_sum  #: streak
+    max_streak_repeats = engine.max_streak_repeats  #: streak
+    max_streak_last = engine.max_streak_last  #: streak
+    for player in range(number_of_players):
+        positions[player] = {START}
+        rolls[player] = 0
+        max_streak_sum[player] = 0  #: streak
+        max_streak_repeats[player] = 0  #: streak
+        max_streak_last[player] = 0  #: streak
+
+    lucky = 0  #: lucky
+    unlucky = 0  #: slide
+    total_slid = 0  #: slide
+    min_slid = {MAXSIZE}  #: slide
+    max_slid = 0  #: slide
+    biggest_slide = 0  #: slide_streak
+    total_climbed = 0  #: climb
+    min_climbed = {MAXSIZE}  #: climb
+    max_climbed = 0  #: climb
+    biggest_climb = 0  #: climb_streak
+
+    streak_sum = 0  #: streak
+    streak_repeats = 0  #: repeats
+    streak_slid = 0  #: slide_streak
+    streak_climbed = 0  #: climb_streak
+
+    die = engine.die
+    seat_dice = engine.seat_dice
+    die.start_game(simulation_number)
+    for seat_die in seat_dice.values():
+        seat_die.start_game(simulation_number)
+    seat_rolls = [seat_dice.get(seat, die).roll for seat in range(number_of_players)]
+    roll = seat_rolls[0]
+    roll_cap = engine.roll_cap or {MAXSIZE}
+    game_rolls = 0
+
+    player = 0
+    position = {START}
+    player_rolls = 0
+    while True:
+        die_roll = roll()
+        move = position * {STRIDE} + die_roll
+        move_counts[move] += 1  #: moves
+        position = next_position[move]
+        lucky += lucky_table[move]  #: lucky
+        player_rolls += 1
+
+        effect = effect_table[move]  #: effect
+        if effect > 0:  #: climb_or_streak
+            total_climbed += effect  #: climb
+            streak_climbed += effect  #: climb_streak
+            if effect < min_climbed:  #: climb
+                min_climbed = effect  #: climb
+            if effect > max_climbed:  #: climb
+                max_climbed = effect  #: climb
+        elif effect < 0:  #: climb_or_streak&slide_or_streak
+        if effect < 0:  #: slide_or_streak&!climb_or_streak
+            unlucky += 1  #: slide
+            total_slid -= effect  #: slide
+            streak_slid -= effect  #: slide_streak
+            if -effect < min_slid:  #: slide
+                min_slid = -effect  #: slide
+            if -effect > max_slid:  #: slide
+                max_slid = -effect  #: slide
+
+        streak_sum += die_roll  #: streak
+        if die_roll == {REPEAT}:  #: repeat
+            if position == {GOAL}:  #: repeat
+                break  #: repeat
+            streak_repeats += 1  #: repeats
+            continue  #: repeat&!forfeit
+            if streak_repeats < {FORFEIT_ARM}:  #: forfeit
+                continue  #: forfeit
+            if streak_repeats == {FORFEIT_ARM}:  #: forfeit
+                next_position = {FORFEIT_NEXT_POSITION}  #: forfeit
+                lucky_table = {FORFEIT_LUCKY}  #: forfeit&lucky
+                effect_table = {FORFEIT_EFFECT}  #: forfeit&effect
+                move_counts = engine.forfeit_move_counts  #: forfeit&moves
+                continue  #: forfeit
+            # This (void) repeat roll forfeits the turn  #: forfeit
+            streak_repeats -= 1  #: forfeit
+
+        # The streak (and the turn) ends here
+        if streak_repeats == {FORFEIT_ARM}:  #: forfeit
+            next_position = {NEXT_POSITION}  #: forfeit
+            lucky_table = {LUCKY}  #: forfeit&lucky
+            effect_table = {EFFECT}  #: forfeit&effect
+            move_counts = engine.move_counts  #: forfeit&moves
+        if streak_sum > max_streak_sum[player]:  #: streak
+            max_streak_sum[player] = streak_sum  #: streak
+            max_streak_repeats[player] = streak_repeats  #: streak&repeats
+            max_streak_last[player] = die_roll  #: streak
+        if streak_climbed > biggest_climb:  #: climb_streak
+            biggest_climb = streak_climbed  #: climb_streak
+        if streak_slid > biggest_slide:  #: slide_streak
+            biggest_slide = streak_slid  #: slide_streak
+        streak_sum = 0  #: streak
+        streak_repeats = 0  #: repeats
+        streak_slid = 0  #: slide_streak
+        streak_climbed = 0  #: climb_streak
+
+        if position == {GOAL}:
+            break
+
+        # The turn's rolls count towards the cap
+        game_rolls += player_rolls - rolls[player]  #: !solo
+        if game_rolls >= roll_cap:  #: !solo
+        if player_rolls >= roll_cap:  #: solo
+            game_stat = GameStats()
+            game_stat.truncated = True
+            return game_stat
+
+        # Switch to the next player  #: !solo
+        positions[player] = position  #: !solo
+        rolls[player] = player_rolls  #: !solo
+        player += 1  #: !solo
+        if player == number_of_players:  #: !solo
+            player = 0  #: !solo
+        position = positions[player]  #: !solo
+        player_rolls = rolls[player]  #: !solo
+        roll = seat_rolls[player]  #: !solo
+
+    game_stat = GameStats()
+    game_stat.game_number_of_rolls_to_win = player_rolls
+    game_stat.game_total_lucky_rolls = lucky  #: lucky
+    game_stat.game_total_unlucky_rolls = unlucky  #: slide
+    game_stat.game_min_distance_slide = min_slid  #: slide
+    game_stat.game_max_distance_slide = max_slid  #: slide
+    game_stat.game_total_distance_slid = total_slid  #: slide
+    game_stat.biggest_slide_in_a_streak = biggest_slide  #: slide_streak
+    game_stat.game_min_distance_climbed = min_climbed  #: climb
+    game_stat.game_max_distance_climbed = max_climbed  #: climb
+    game_stat.game_total_distance_climbed = total_climbed  #: climb
+    game_stat.biggest_climb_in_a_streak = biggest_climb  #: climb_streak
+
+    # The first player (in turn order) holding the longest streak  #: streak
+    best = 0  #: streak
+    for player in range(1, number_of_players):  #: streak
+        if max_streak_sum[player] > max_streak_sum[best]:  #: streak
+            best = player  #: streak
+    if max_streak_sum[best] > 0:  #: streak
+        game_stat.game_max_streak = [{REPEAT}] * max_streak_repeats[best] + [  #: streak
+            max_streak_last[best]  #: streak
+        ]  #: streak
+
+    return game_stat
+"""
+
+# The play_game functions generated so far, by board hash and features
+_GENERATED: Dict[Tuple[str, FrozenSet[str]], Callable] = {}
+
+
+def board_hash(board: CompiledBoard) -> str:
+    # The same for any two boards that play the same: their tables and rules
+    digest = hashlib.sha256()
+    digest.update(f"{board.max_roll}:{','.join(board.rules.names)}".encode())
+    for tables in (board.tables, board.forfeit_tables):
+        if tables is not None:
+            for table in (
+                tables.next_position,
+                tables.lucky,
+                tables.climbed,
+                tables.slid,
+            ):
+                digest.update(bytes(table))
+    return digest.hexdigest()
+
+
+def codegen_features(
+    board: CompiledBoard,
+    statistics: Iterable[str] = CODEGEN_STATISTICS,
+    count_moves: bool = True,
+    number_of_players: int = 0,
+) -> FrozenSet[str]:
+    """
+    What the play_game generated for the board has to do, given the
+    statistics asked for: a statistic the board can not change (e.g. the
+    climbs of a board without ladders) needs no code either
+    """
+    statistics = set(statistics)
+    tables = [board.tables]
+    if board.forfeit_tables is not None:
+        tables.append(board.forfeit_tables)
+    climbs = any(any(t.climbed) for t in tables)
+    slides = any(any(t.slid) for t in tables)
+    possible = {
+        "lucky": any(any(t.lucky) for t in tables),
+        "climb": climbs,
+        "climb_streak": climbs,
+        "slide": slides,
+        "slide_streak": slides,
+        "streak": True,
+    }
+    features = {
+        feature
+        for feature, fields in CODEGEN_FEATURE_STATISTICS.items()
+        if possible[feature] and statistics.intersection(fields)
+    }
+    if count_moves:
+        features.add("moves")
+    if number_of_players == 1:
+        # No turns to pass
+        features.add("solo")
+    if board.rules.repeat_roll:
+        features.add("repeat")
+        if board.rules.repeats_to_forfeit:
+            features.add("forfeit")
+        if features & {"streak", "forfeit"}:
+            features.add("repeats")
+    # The move's climb (positive) or slide (negative), where either is used
+    if features & {"climb", "climb_streak"}:
+        features.add("climb_or_streak")
+    if features & {"slide", "slide_streak"}:
+        features.add("slide_or_streak")
+    if features & {"climb_or_streak", "slide_or_streak"}:
+        features.add("effect")
+    return frozenset(features)
+
+
+def _literal(table) -> str:
+    return repr(tuple(table))
+
+
+def generate_source(board: CompiledBoard, features: FrozenSet[str]) -> str:
+    """
+    The source of play_game(engine, simulation_number) for the board: its
+    tables are tuple literals, its rules constants, and the code of every
+    feature left out is not there at all
+    """
+    lines = []
+    for line in _TEMPLATE.splitlines():
+        code, tag, condition = line.partition("  #: ")
+        if tag:
+            kept = all(
+                (term[1:] not in features) if term.startswith("!") else term in features
+                for term in condition.split("&")
+            )
+            if not kept:
+                continue
+        lines.append(code)
+
+    def effects(tables) -> str:
+        return _literal(
+            climbed - slid for climbed, slid in zip(tables.climbed, tables.slid)
+        )
+
+    forfeit_tables = board.forfeit_tables or board.tables
+    constants = {
+        "NEXT_POSITION": _literal(board.tables.next_position),
+        "LUCKY": _literal(board.tables.lucky),
+        "EFFECT": effects(board.tables),
+        "FORFEIT_NEXT_POSITION": _literal(forfeit_tables.next_position),
+        "FORFEIT_LUCKY": _literal(forfeit_tables.lucky),
+        "FORFEIT_EFFECT": effects(forfeit_tables),
+        "START": repr(Const.PLAYER_START_POSITION),
+        "GOAL": repr(Const.BOARD_POSITION_MAX),
+        "STRIDE": repr(board.stride),
+        "MAXSIZE": repr(sys.maxsize),
+        # No roll is 0, so without a repeat roll no roll ever repeats
+        "REPEAT": repr(board.rules.repeat_roll or 0),
+        # Once a streak has this many repeat rolls, the next repeat roll is
+        # void and forfeits the turn: the moves come off the forfeit tables
+        "FORFEIT_ARM": repr(max(board.rules.repeats_to_forfeit - 1, 0)),
+    }
+    return "\n".join(lines).format(**constants) + "\n"
+
+
+def generated_play_game(
+    board: CompiledBoard, features: FrozenSet[str]
+) -> Callable[[FastGame, int], Union[GameStats, None]]:
+    # Generated and compiled once per process for a board and features
+    key = (board_hash(board), features)
+    play_game = _GENERATED.get(key)
+    if play_game is None:
+        source = generate_source(board, features)
+        filename = f"<codegen {key[0][:12]}>"
+        namespace = {"GameStats": GameStats}
+        exec(compile(source, filename, "exec"), namespace)
+        # So that tracebacks show the generated lines
+        linecache.cache[filename] = (
+            len(source),
+            None,
+            source.splitlines(True),
+            filename,
+        )
+        play_game = _GENERATED[key] = namespace["play_game"]
+    return play_game
+
+
+class CodegenGame(FastGame):
+    """
+    An engine that plays the very same games as FastGame, and so as the
+    reference engine, off a play_game function generated and compiled for
+    the board: its move tables are tuple literals (with the climb and slide
+    of a move in one table, signed), its rules constants, and the code of
+    every statistic not asked for, or that the board can not change, and of
+    every rule not played, left out. The function is generated once per
+    process for a board (by board_hash) and the statistics.
+
+    Statistics not asked for keep their GameStats defaults; the rolls to
+    win are always worked out. Without count_moves, no move is counted
+    (for hit_counters, or the metrics of a run). No turn_recorder is called.
+    """
+
+    __slots__ = ("features", "play")
+
+    def __init__(
+        self,
+        board: CompiledBoard,
+        die: Die,
+        number_of_players: int,
+        number_of_simulations: int,
+        seat_dice: Union[Dict[int, Die], None] = None,
+        roll_cap: int = Const.GAME_ROLL_CAP,
+        statistics: Iterable[str] = CODEGEN_STATISTICS,
+        count_moves: bool = True,
+    ):
+        super().__init__(
+            board,
+            die,
+            number_of_players,
+            number_of_simulations,
+            seat_dice,
+            roll_cap,
+            count_moves,
+        )
+        self.features: FrozenSet[str] = codegen_features(
+            board, statistics, count_moves, number_of_players
+        )
+        self.play = generated_play_game(board, self.features)
+
+    @classmethod
+    def from_game(
+        cls,
+        game,
+        board: Union[CompiledBoard, None] = None,
+        statistics: Iterable[str] = CODEGEN_STATISTICS,
+        count_moves: bool = True,
+    ) -> "CodegenGame":
+        return cls(
+            board or CompiledBoard.from_game(game),
+            game.die,
+            len(game.players),
+            game.number_of_simulations,
+            game.seat_dice,
+            game.roll_cap,
+            statistics,
+            count_moves,
+        )
+
+    @property
+    def source(self) -> str:
+        # Of the play_game generated for the engine's board and features
+        return generate_source(self.board, self.features)
+
+    def play_game(self, simulation_number: int) -> Union[GameStats, None]:
+        return self.play(self, simulation_number)
+
+    def iter_games(
+        self, simulation_numbers: Union[Iterable[int], None] = None
+    ) -> Iterator[GameStats]:
+        if simulation_numbers is None:
+            simulation_numbers = range(1, self.number_of_simulations + 1)
+        play = self.play
+        for simulation_number in simulation_numbers:
+            game_stat = play(self, simulation_number)
+            if game_stat is not None:
+                yield game_stat
@@ -9,3 +9,39 @@ class Constants:
     DIE_ROLL_MIN = 1
     DIE_ROLL_MAX = 6
     DIE_ROLL_REPEAT = DIE_ROLL_MAX
+    DIE_ROLL_REPEATS_TO_FORFEIT = 3
+    # Faces of an arbitrary die: any roll up to the whole board
+    DIE_FACE_MAX = BOARD_POSITION_MAX
+
+    # A game is cut short (truncated) after the turn on which the rolls of
+    # all its players reach this many, so that no board stalls a run; 0 for
+    # no cap
+    GAME_ROLL_CAP = 10000
+
+    # Single-player trajectories composed into games of several players,
+    # by default at most this many (of some tens of bytes per turn)
+    TRAJECTORY_POOL_MAX = 20000
+
+    # A run's memory over and above what the process takes before it starts
+    # and its per-game records: accumulators, engines and the like
+    MEMORY_HEADROOM = 4 * 2**20
+    # Memory of each thread of a threaded run (its engine and accumulator)
+    MEMORY_PER_THREAD = 2 * 2**20
+
+    # A pipelined run hands games from stage to stage in batches of this
+    # many, at most so many batches queued between two stages
+    PIPELINED_BATCH_GAMES = 256
+    PIPELINED_QUEUE_BATCHES = 4
+    # Rolls drawn ahead for a game, as a multiple of the rolls it is
+    # expected to take (a game that needs more draws them as it goes)
+    PIPELINED_ROLLS_MARGIN = 1.5
+
+    # A run monitored for metrics reports its progress a batch of games at a
+    # time, and the metrics are written out every so many seconds
+    METRICS_BATCH_GAMES = 1000
+    METRICS_INTERVAL = 15.0
+
+    # Bootstrap confidence intervals are drawn from this many replicates, at
+    # this confidence
+    BOOTSTRAP_REPLICATES = 1000
+    BOOTSTRAP_CONFIDENCE = 0.95
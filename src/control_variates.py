@@ -0,0 +1,179 @@
+from math import sqrt
+from operator import mul
+from typing import Dict, Iterable, List, Union
+
+from .analytic import MultiPlayerAnalysis, analyse_game
+from .engine_selection import ANALYTIC_TRUNCATED_MAX
+from .game_stats import GameStats
+from .game_stats_columns import GameStatsColumns
+from .preflight import PreflightReport, preflight
+
+# The control: the winner's rolls, whose mean the analysis gives exactly
+CONTROL_FIELD = "game_number_of_rolls_to_win"
+# The averages of SimulationStats adjusted, by the per-game field they average
+CONTROL_VARIATE_FIELDS: Dict[str, str] = {
+    "avg_number_of_win_rolls": "game_number_of_rolls_to_win",
+    "avg_unlucky_rolls": "game_total_unlucky_rolls",
+    "avg_lucky_rolls": "game_total_lucky_rolls",
+    "avg_distance_climbed": "game_total_distance_climbed",
+    "avg_distance_slid": "game_total_distance_slid",
+}
+
+
+def known_rolls_to_win(
+    game,
+    report: Union[PreflightReport, None] = None,
+    analysis: Union[MultiPlayerAnalysis, None] = None,
+) -> Union[float, None]:
+    """
+    The exact mean of the winner's rolls, from the analysis (worked out
+    unless given), where it is the mean over the games played: None where
+    the roll cap cuts games short (those are left out of the statistics,
+    and not of the analysis)
+    """
+    if report is None:
+        report = preflight(game)
+    if not report.can_finish or report.truncated_fraction > ANALYTIC_TRUNCATED_MAX:
+        return None
+    return (analysis or analyse_game(game)).expected_rolls_to_win()
+
+
+class ControlVariateMoments:
+    """
+    Mergeable sums over the games won (those cut short at the roll cap are
+    left out, as in the statistics): of the control and of every averaged
+    field, their squares and their products with the control. Integers, so
+    that no precision is lost however many games are summed.
+    """
+
+    def __init__(self):
+        self.number_of_games: int = 0
+        self.sums: Dict[str, int] = {f: 0 for f in CONTROL_VARIATE_FIELDS.values()}
+        self.squares: Dict[str, int] = dict(self.sums)
+        self.products: Dict[str, int] = dict(self.sums)
+
+    def add(self, game_stat: GameStats) -> None:
+        if game_stat.truncated:
+            return
+        self.number_of_games += 1
+        control = getattr(game_stat, CONTROL_FIELD)
+        for field in self.sums:
+            value = getattr(game_stat, field)
+            self.sums[field] += value
+            self.squares[field] += value * value
+            self.products[field] += value * control
+
+    def add_games(self, game_stats: Iterable[GameStats]) -> None:
+        # Column by column where the games are held in columns
+        if not isinstance(game_stats, GameStatsColumns):
+            for game_stat in game_stats:
+                self.add(game_stat)
+            return
+        if game_stats.truncated:
+            game_stats = game_stats.won_games()
+        self.number_of_games += len(game_stats)
+        control = game_stats.columns[CONTROL_FIELD]
+        for field in self.sums:
+            column = game_stats.columns[field]
+            self.sums[field] += sum(column)
+            self.squares[field] += sum(map(mul, column, column))
+            self.products[field] += sum(map(mul, column, control))
+
+    def merge(self, other: "ControlVariateMoments") -> None:
+        self.number_of_games += other.number_of_games
+        for field in self.sums:
+            self.sums[field] += other.sums[field]
+            self.squares[field] += other.squares[field]
+            self.products[field] += other.products[field]
+
+
+class ControlVariateEstimate:
+    """
+    A statistic's average over the games played, and the same adjusted by
+    how far the control's average strays from its known mean:
+        adjusted = average - beta * (control average - known mean)
+    with beta = Cov(field, control) / Var(control), the choice that leaves
+    the least variance: that of the average times 1 - rho^2 (rho, their
+    correlation). The variance reduction is the ratio of the two variances,
+    i.e. how many times fewer games give the same precision.
+    """
+
+    def __init__(
+        self,
+        statistic: str,
+        average: float,
+        adjusted: float,
+        beta: float,
+        standard_error: float,
+        adjusted_standard_error: float,
+    ):
+        self.statistic: str = statistic
+        self.average: float = average
+        self.adjusted: float = adjusted
+        self.beta: float = beta
+        self.standard_error: float = standard_error
+        self.adjusted_standard_error: float = adjusted_standard_error
+
+    @property
+    def variance_reduction(self) -> float:
+        # float("inf") where the adjusted average is exact
+        if self.adjusted_standard_error == 0:
+            return float("inf") if self.standard_error else 1.0
+        return (self.standard_error / self.adjusted_standard_error) ** 2
+
+    def to_dict(self) -> dict:
+        return {
+            "statistic": self.statistic,
+            "average": self.average,
+            "adjusted": self.adjusted,
+            "beta": self.beta,
+            "standard_error": self.standard_error,
+            "adjusted_standard_error": self.adjusted_standard_error,
+            "variance_reduction": self.variance_reduction,
+        }
+
+
+def control_variate_estimates(
+    moments: ControlVariateMoments, known_mean: float
+) -> List[ControlVariateEstimate]:
+    # Every averaged statistic, adjusted with the winner's rolls as control
+    n = moments.number_of_games
+    if n < 2:
+        return []
+
+    def covariance(field: str, other: str) -> float:
+        # Sample covariance, from exact integer sums
+        if other == field:
+            total = n * moments.squares[field] - moments.sums[field] ** 2
+        else:
+            total = (
+                n * moments.products[field]
+                - moments.sums[field] * moments.sums[other]
+            )
+        return total / (n * (n - 1))
+
+    control_variance = covariance(CONTROL_FIELD, CONTROL_FIELD)
+    control_average = moments.sums[CONTROL_FIELD] / n
+    estimates = []
+    for statistic, field in CONTROL_VARIATE_FIELDS.items():
+        average = moments.sums[field] / n
+        variance = covariance(field, field)
+        beta, residual_variance = 0.0, variance
+        if control_variance > 0:
+            field_covariance = covariance(field, CONTROL_FIELD)
+            beta = field_covariance / control_variance
+            residual_variance = max(0.0, variance - field_covariance * beta)
+        if field == CONTROL_FIELD:
+            # The control itself: its mean is known
+            residual_variance = 0.0
+        estimates.append(
+            ControlVariateEstimate(
+                statistic,
+                average,
+                average - beta * (control_average - known_mean),
+                beta,
+                sqrt(variance / n),
+                sqrt(residual_variance / n),
+            )
+        )
+    return estimates
@@ -1,8 +1,200 @@
-from random import randint
+from math import ceil
+from random import randint, Random
+from typing import Dict, Iterable, List, Union
+
 from .constants import Constants as Const
+from .game_exceptions import ERROR_MESSAGE_DIE_DISTRIBUTION
 
 
 class Die:
     @staticmethod
     def roll() -> int:
         return randint(Const.DIE_ROLL_MIN, Const.DIE_ROLL_MAX)
+
+    def start_game(self, simulation_number: int) -> None:
+        # A plain die keeps drawing from the one global random stream
+        pass
+
+    def roll_ahead(self, number_of_rolls: int) -> List[int]:
+        # About so many of the rolls to come, at once
+        return [self.roll() for _ in range(number_of_rolls)]
+
+    def distribution(self) -> Dict[int, float]:
+        return uniform_distribution()
+
+
+# randint() rolls a die off the top bits of a 32-bit word of the generator
+# (CPython's Mersenne Twister), drawing another word where those are out of
+# range; getrandbits() of many words gives the same words, lowest first.
+# The roll of each word's top byte, and the top bytes of no roll:
+_ROLL_FACES = Const.DIE_ROLL_MAX - Const.DIE_ROLL_MIN + 1
+_ROLL_BITS = (_ROLL_FACES - 1).bit_length()
+_ROLL_OF_TOP_BYTE = bytes(
+    (byte >> (8 - _ROLL_BITS)) + Const.DIE_ROLL_MIN for byte in range(256)
+)
+_VOID_TOP_BYTES = bytes(
+    byte for byte in range(256) if byte >> (8 - _ROLL_BITS) >= _ROLL_FACES
+)
+
+
+class SeededDie(Die):
+    """
+    A die whose rolls within a game depend only on the seed and the
+    simulation number. Any slice of the simulations can therefore be run
+    (or re-run) on its own, on any host, and produce the same games.
+    """
+
+    def __init__(self, seed: int):
+        self.seed: int = seed
+        self.rng: Random = Random(seed)
+
+    def start_game(self, simulation_number: int) -> None:
+        self.rng = Random(f"{self.seed}:{simulation_number}")
+
+    def roll(self) -> int:  # type: ignore[override]
+        return self.rng.randint(Const.DIE_ROLL_MIN, Const.DIE_ROLL_MAX)
+
+    def roll_ahead(self, number_of_rolls: int) -> List[int]:
+        # As roll() would roll them, a whole word of the generator at a time
+        words = ceil(number_of_rolls * 2**_ROLL_BITS / _ROLL_FACES)
+        data = self.rng.getrandbits(32 * words).to_bytes(4 * words, "little")
+        return list(data[3::4].translate(_ROLL_OF_TOP_BYTE, _VOID_TOP_BYTES))
+
+
+# Rolls an AliasDie draws at a time
+ALIAS_DIE_BLOCK = 64
+
+
+def uniform_distribution(faces: int = Const.DIE_ROLL_MAX) -> Dict[int, float]:
+    return {face: 1 / faces for face in range(Const.DIE_ROLL_MIN, faces + 1)}
+
+
+def parse_distribution(spec: str) -> Dict[int, float]:
+    """
+    A die's distribution from its spec: NdM is the sum of N dice of M faces
+    (e.g. 2d6), otherwise face:weight pairs separated by commas (e.g.
+    1:1,2:1,3:1,4:1,5:1,6:2 for a die loaded on 6). Raises ValueError.
+    """
+    error = ERROR_MESSAGE_DIE_DISTRIBUTION.format(
+        spec=spec, face_max=Const.DIE_FACE_MAX
+    )
+    spec = spec.strip().lower()
+    try:
+        if ":" in spec:
+            distribution: Dict[int, float] = {}
+            for pair in spec.split(","):
+                face, _, weight = pair.partition(":")
+                distribution[int(face)] = distribution.get(int(face), 0.0) + float(weight)
+        else:
+            number_of_dice, _, faces = spec.partition("d")
+            if int(number_of_dice) * int(faces) > Const.DIE_FACE_MAX:
+                raise ValueError(error)
+            distribution = {0: 1.0}
+            for _ in range(int(number_of_dice)):
+                rolled: Dict[int, float] = {}
+                for total, p in distribution.items():
+                    for face, q in uniform_distribution(int(faces)).items():
+                        rolled[total + face] = rolled.get(total + face, 0.0) + p * q
+                distribution = rolled
+    except ValueError:
+        raise ValueError(error)
+
+    if (
+        not distribution
+        or min(distribution) < Const.DIE_ROLL_MIN
+        or max(distribution) > Const.DIE_FACE_MAX
+        or min(distribution.values()) < 0
+        or sum(distribution.values()) <= 0
+    ):
+        raise ValueError(error)
+    return distribution
+
+
+class AliasTable:
+    """
+    Walker's alias method over a discrete distribution: one column per face,
+    each holding its face for a share of the column and another face (its
+    alias) for the rest. A sample picks a column and a side of its share
+    from a single uniform number, in O(1) whatever the number of faces.
+    """
+
+    def __init__(self, distribution: Dict[int, float]):
+        total = sum(distribution.values())
+        self.distribution: Dict[int, float] = {
+            face: weight / total
+            for face, weight in sorted(distribution.items())
+            if weight > 0
+        }
+        self.faces: List[int] = list(self.distribution)
+        number_of_faces = len(self.faces)
+        self.shares: List[float] = [1.0] * number_of_faces
+        self.aliases: List[int] = list(self.faces)
+
+        # Columns above their share give the excess to the ones below it
+        scaled = [p * number_of_faces for p in self.distribution.values()]
+        small = [column for column, share in enumerate(scaled) if share < 1]
+        large = [column for column, share in enumerate(scaled) if share >= 1]
+        while small and large:
+            column, donor = small.pop(), large[-1]
+            self.shares[column] = scaled[column]
+            self.aliases[column] = self.faces[donor]
+            scaled[donor] -= 1 - scaled[column]
+            if scaled[donor] < 1:
+                small.append(large.pop())
+
+    def sample(self, uniform: float) -> int:
+        # uniform in [0, 1): its integer part (scaled) picks the column and
+        # its fraction the side
+        uniform *= len(self.faces)
+        column = int(uniform)
+        if uniform - column < self.shares[column]:
+            return self.faces[column]
+        return self.aliases[column]
+
+    def sample_many(self, uniforms: Iterable[float]) -> List[int]:
+        return list(map(self.sample, uniforms))
+
+
+class AliasDie(Die):
+    """
+    A die of any distribution (loaded dice, 2d6, ...), sampled off an alias
+    table in blocks of rolls. A seeded die rolls, within a game, what only
+    its seed, its stream (e.g. the seat it is rolled for) and the
+    simulation number decide, as SeededDie does.
+    """
+
+    def __init__(
+        self,
+        distribution: Dict[int, float],
+        seed: Union[int, None] = None,
+        stream: int = 0,
+    ):
+        self.table: AliasTable = AliasTable(distribution)
+        self.seed: Union[int, None] = seed
+        self.stream: int = stream
+        self.rng: Random = Random() if seed is None else Random(f"{seed}:{stream}")
+        self.block: List[int] = []
+        self.next_roll: int = 0
+
+    def start_game(self, simulation_number: int) -> None:
+        if self.seed is not None:
+            self.rng = Random(f"{self.seed}:{self.stream}:{simulation_number}")
+            self.block = []
+            self.next_roll = 0
+
+    def roll(self) -> int:  # type: ignore[override]
+        if self.next_roll == len(self.block):
+            uniform = self.rng.random
+            self.block = self.table.sample_many(
+                [uniform() for _ in range(ALIAS_DIE_BLOCK)]
+            )
+            self.next_roll = 0
+        self.next_roll += 1
+        return self.block[self.next_roll - 1]
+
+    def distribution(self) -> Dict[int, float]:
+        return dict(self.table.distribution)
+
+    def clone(self, seed: Union[int, None]) -> "AliasDie":
+        # The same die on the same stream, for another seed (or none)
+        return AliasDie(self.table.distribution, seed, self.stream)
@@ -0,0 +1,249 @@
+from typing import Dict, Iterable, Union
+
+from .engines import ENGINES
+from .preflight import PreflightReport, preflight
+from .stats_accumulator import StatsAccumulator
+
+AUTO_ENGINE = "auto"
+# The engine that works the rolls to win out exactly, without playing games
+ANALYTIC_ENGINE = "analytic"
+# Statistics a run can be asked for: every statistic of the games played,
+# or only the rolls the winner takes to win (which the analysis gives)
+STATISTICS_ALL = "all"
+STATISTICS_ROLLS = "rolls"
+STATISTICS = (STATISTICS_ALL, STATISTICS_ROLLS)
+
+# What the engines take, as measured on the default board on one core: a
+# game costs its setup plus every roll of every player. Only the ratios
+# between the engines really matter.
+ENGINE_SECONDS_PER_GAME: Dict[str, float] = {
+    "reference": 120e-6,
+    "fast": 25e-6,
+    "codegen": 25e-6,
+}
+ENGINE_SECONDS_PER_ROLL: Dict[str, float] = {
+    "reference": 2.2e-6,
+    "fast": 1.0e-6,
+    "codegen": 0.9e-6,
+}
+# And once per run: the codegen engine generates and compiles its code
+ENGINE_SETUP_SECONDS: Dict[str, float] = {
+    "reference": 0.0,
+    "fast": 0.0,
+    "codegen": 5e-3,
+}
+# The rolls of a game of P players grow as P to this power times the rolls
+# a lone player takes
+ENGINE_PLAYERS_EXPONENT = 0.68
+# The analysis follows every die's first passage up to its tail (in rolls,
+# see the pre-flight check), and for several players the costlier joint
+# (turn, rolls) passage, up to a horizon that shrinks as players are added.
+# The joint passage is taken to grow as the square of the tail.
+ANALYTIC_SECONDS_PER_TAIL_ROLL = 1e-3
+ANALYTIC_JOINT_SECONDS = 2.5
+ANALYTIC_JOINT_PLAYERS_EXPONENT = 0.7
+ANALYTIC_REFERENCE_TAIL = 205
+# The analysis does not model the roll cap: it is only exact where (but for
+# its own tolerance) no game is cut short
+ANALYTIC_TRUNCATED_MAX = 1e-12
+
+
+def game_rolls(report: PreflightReport, number_of_players: int) -> float:
+    # Rolls of a game, on average, of all the players
+    return report.expected_rolls * number_of_players**ENGINE_PLAYERS_EXPONENT
+
+
+def estimated_seconds(
+    name: str,
+    report: PreflightReport,
+    number_of_players: int,
+    number_of_simulations: int,
+    number_of_dice: int = 1,
+) -> float:
+    """
+    About how long an engine takes over so many games (the analysis, over
+    as many of them as there are, on so many distinct dice)
+    """
+    if name == ANALYTIC_ENGINE:
+        tail = max(report.tail_rolls, 1)
+        seconds = ANALYTIC_SECONDS_PER_TAIL_ROLL * tail
+        if number_of_players > 1:
+            seconds += (
+                ANALYTIC_JOINT_SECONDS
+                * (tail / ANALYTIC_REFERENCE_TAIL) ** 2
+                / (number_of_players - 1) ** ANALYTIC_JOINT_PLAYERS_EXPONENT
+            )
+        return seconds * number_of_dice
+    rolls = game_rolls(report, number_of_players)
+    return ENGINE_SETUP_SECONDS[name] + number_of_simulations * (
+        ENGINE_SECONDS_PER_GAME[name] + ENGINE_SECONDS_PER_ROLL[name] * rolls
+    )
+
+
+def format_seconds(seconds: float) -> str:
+    if seconds < 1:
+        return f"{seconds * 1000:.3g} ms"
+    return f"{seconds:.3g} s"
+
+
+class EngineChoice:
+    """
+    The engine picked for a run, why, and what each engine it weighed was
+    estimated to take (in seconds)
+    """
+
+    def __init__(self, name: str, reason: str, estimates: Dict[str, float]):
+        self.name: str = name
+        self.reason: str = reason
+        self.estimates: Dict[str, float] = estimates
+
+    def __str__(self) -> str:
+        return f"{self.name} ({self.reason})"
+
+
+def choose_engine(
+    game,
+    number_of_simulations: int,
+    statistics: str = STATISTICS_ALL,
+    report: Union[PreflightReport, None] = None,
+    games_needed_for: Union[str, None] = None,
+    number_of_players: Union[int, None] = None,
+) -> EngineChoice:
+    """
+    The cheapest engine that gives the statistics asked for, exactly, from
+    the board's pre-flight check (how many rolls its games take), the
+    numbers of players and of simulations. Every statistic needs the games
+    played, and every engine plays them exactly as the reference engine
+    does: the cheapest of them plays them. The rolls to win alone can be
+    worked out exactly instead, unless the games must be played for
+    something else (games_needed_for names it) or the roll cap cuts some of
+    them short.
+    """
+    number_of_players = number_of_players or len(game.players) or 1
+    if report is None:
+        report = preflight(game, number_of_players)
+    estimates = {
+        name: estimated_seconds(name, report, number_of_players, number_of_simulations)
+        for name in ENGINES
+    }
+    engine = min(ENGINES, key=estimates.__getitem__)
+    playing = estimates[engine]
+    played = (
+        f"playing {number_of_simulations} games takes about "
+        f"{format_seconds(playing)} on the {engine} engine"
+    )
+
+    if statistics != STATISTICS_ROLLS:
+        return EngineChoice(
+            engine,
+            f"every statistic needs the games played; {played}, "
+            f"{estimates['reference'] / playing:.1f}x faster than the reference engine",
+            estimates,
+        )
+    if games_needed_for is not None:
+        return EngineChoice(
+            engine, f"{games_needed_for} needs the games played", estimates
+        )
+    if not report.can_finish or report.truncated_fraction > ANALYTIC_TRUNCATED_MAX:
+        return EngineChoice(
+            engine,
+            "the analysis does not model games cut short at the roll cap",
+            estimates,
+        )
+
+    number_of_dice = len(
+        {
+            tuple(sorted(game.distribution_for_seat(seat).items()))
+            for seat in range(number_of_players)
+        }
+    )
+    analytic = estimated_seconds(
+        ANALYTIC_ENGINE,
+        report,
+        number_of_players,
+        number_of_simulations,
+        number_of_dice,
+    )
+    estimates[ANALYTIC_ENGINE] = analytic
+    worked_out = (
+        f"working the rolls to win out exactly about {format_seconds(analytic)}"
+    )
+    if analytic < playing:
+        return EngineChoice(
+            ANALYTIC_ENGINE,
+            f"only the rolls to win are asked for; {worked_out}, where {played}",
+            estimates,
+        )
+    return EngineChoice(engine, f"{played}, {worked_out}", estimates)
+
+
+class RollsToWin:
+    """
+    How many rolls the winner takes: exactly (from the analysis, with no
+    maximum, the games being unbounded) or over the games played
+    """
+
+    QUANTILES = (0.5, 0.9, 0.99)
+
+    def __init__(
+        self,
+        distribution: Dict[int, float],
+        exact: bool,
+        number_of_truncated_games: int = 0,
+    ):
+        total = sum(distribution.values())
+        self.distribution: Dict[int, float] = {
+            rolls: p / total for rolls, p in sorted(distribution.items()) if p
+        }
+        self.exact: bool = exact
+        self.number_of_games: int = 0 if exact else round(total)
+        self.number_of_truncated_games: int = number_of_truncated_games
+
+    @classmethod
+    def from_analysis(cls, analysis) -> "RollsToWin":
+        return cls(analysis.rolls_to_win, exact=True)
+
+    @classmethod
+    def from_accumulator(cls, accumulator: StatsAccumulator) -> "RollsToWin":
+        return cls(
+            accumulator.histograms["game_number_of_rolls_to_win"],
+            exact=False,
+            number_of_truncated_games=accumulator.number_of_truncated_games,
+        )
+
+    @property
+    def minimum(self) -> Union[int, None]:
+        return min(self.distribution, default=None)
+
+    @property
+    def maximum(self) -> Union[int, None]:
+        if self.exact:
+            return None
+        return max(self.distribution, default=None)
+
+    @property
+    def average(self) -> float:
+        return sum(rolls * p for rolls, p in self.distribution.items())
+
+    def quantile(self, q: float) -> Union[int, None]:
+        # The fewest rolls the winner takes in at least a fraction q of games
+        cumulative = 0.0
+        for rolls, p in self.distribution.items():
+            cumulative += p
+            if cumulative >= q:
+                return rolls
+        return max(self.distribution, default=None)
+
+    def quantiles(self, qs: Iterable[float] = QUANTILES) -> Dict[str, Union[int, None]]:
+        return {f"{round(q * 100)}%": self.quantile(q) for q in qs}
+
+    def to_dict(self) -> dict:
+        return {
+            "exact": self.exact,
+            "number_of_games": self.number_of_games,
+            "number_of_truncated_games": self.number_of_truncated_games,
+            "minimum": self.minimum,
+            "average": self.average,
+            "quantiles": self.quantiles(),
+            "maximum": self.maximum,
+        }
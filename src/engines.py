@@ -0,0 +1,26 @@
+from typing import Callable, Dict, Union
+
+from .board import CompiledBoard
+from .fast_engine import FastGame
+from .codegen_engine import CodegenGame
+
+# Every engine plays a set-up Game's simulations, given its die, exactly as
+# Game.play does: play_game(simulation_number) gives a game's GameStats and
+# iter_games(simulation_numbers) streams them. The reference engine is the
+# Game itself. Engines played off a CompiledBoard may be handed one to share,
+# and told not to count the moves played (nothing but the heatmap and the
+# metrics read them).
+ENGINES: Dict[str, Callable] = {
+    "reference": lambda game, board=None, count_moves=True: game,
+    "fast": FastGame.from_game,
+    "codegen": CodegenGame.from_game,
+}
+
+
+def make_engine(
+    name: str,
+    game,
+    board: Union[CompiledBoard, None] = None,
+    count_moves: bool = True,
+):
+    return ENGINES[name](game, board, count_moves=count_moves)
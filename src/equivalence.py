@@ -0,0 +1,225 @@
+from math import sqrt
+from random import Random
+from typing import Callable, Dict, Iterable, List, Tuple, Union
+
+from .constants import Constants as Const
+from .artefact import Artefact, Snake, Ladder
+from .board import CompiledBoard, board_can_finish
+from .board_generator import BoardGenerator
+from .die import Die, SeededDie, AliasDie
+from .game_stats import GameStats
+from .player import Player
+from .rules import RuleSet
+from .snake_ladder_simulation import Game
+from .stats_accumulator import StatsAccumulator
+from .engines import ENGINES, make_engine
+
+# Means further apart than this many standard errors are a mismatch
+EQUIVALENCE_Z_LIMIT = 4.0
+# Defaults of a full check: random boards to fuzz, games per statistical run
+EQUIVALENCE_FUZZ_BOARDS = 50
+EQUIVALENCE_STATISTICAL_GAMES = 5000
+# A fuzzed board has up to so many snakes and ladders, and is drawn up to so
+# many times for one where every game finishes (else it is left bare)
+EQUIVALENCE_FUZZ_MAX_ARTEFACTS = 10
+EQUIVALENCE_FUZZ_ATTEMPTS = 100
+
+
+class ScriptedDie(Die):
+    """
+    Rolls the same script at the start of every game, then seeded random
+    rolls (keyed by the game, as SeededDie does), so that every game is
+    sure to finish whatever the board
+    """
+
+    def __init__(self, script: Iterable[int], seed: int = 0):
+        self.script: List[int] = list(script)
+        self.seed: int = seed
+        self.rng: Random = Random(seed)
+        self.next_roll: int = 0
+
+    def start_game(self, simulation_number: int) -> None:
+        self.rng = Random(f"{self.seed}:{simulation_number}")
+        self.next_roll = 0
+
+    def roll(self) -> int:  # type: ignore[override]
+        if self.next_roll < len(self.script):
+            self.next_roll += 1
+            return self.script[self.next_roll - 1]
+        return self.rng.randint(Const.DIE_ROLL_MIN, Const.DIE_ROLL_MAX)
+
+
+def compare_game_stats(
+    name: str, simulation_number: int, expected: GameStats, actual: GameStats
+) -> List[str]:
+    if expected is None or actual is None:
+        if expected is actual:
+            return []
+        return [f"{name} game {simulation_number}: {actual!r}, reference {expected!r}"]
+    return [
+        f"{name} game {simulation_number}: {field} = {value!r}, "
+        f"reference {expected.__dict__[field]!r}"
+        for field, value in actual.__dict__.items()
+        if value != expected.__dict__[field]
+    ]
+
+
+def compare_exact(
+    make_game: Callable[[Die], Game],
+    make_die: Callable[[], Die],
+    simulation_numbers: Iterable[int],
+    engines: Union[Iterable[str], None] = None,
+) -> List[str]:
+    """
+    Play the same games, each engine with a die of its own rolling the same
+    rolls, and list every per-game stat that differs from the reference
+    """
+    simulation_numbers = list(simulation_numbers)
+    reference = make_game(make_die())
+    expected = [reference.play_game(n) for n in simulation_numbers]
+
+    mismatches = []
+    for name in engines or ENGINES:
+        if name == "reference":
+            continue
+        engine = make_engine(name, make_game(make_die()))
+        for simulation_number, expected_stat in zip(simulation_numbers, expected):
+            mismatches += compare_game_stats(
+                name, simulation_number, expected_stat, engine.play_game(simulation_number)
+            )
+    return mismatches
+
+
+def _mean_and_variance(histogram: Dict[int, int], count: int) -> Tuple[float, float]:
+    mean = sum(value * n for value, n in histogram.items()) / count
+    variance = sum(n * (value - mean) ** 2 for value, n in histogram.items()) / count
+    return mean, variance
+
+
+def compare_statistically(
+    make_game: Callable[[Die], Game],
+    seed: int,
+    engines: Union[Iterable[str], None] = None,
+    z_limit: float = EQUIVALENCE_Z_LIMIT,
+) -> List[str]:
+    """
+    Play a large run on each engine, with a different seed than the
+    reference, and list every per-game stat whose mean is further from the
+    reference's than chance allows. For engines that do not draw their
+    rolls as the reference does, and so can not match it game for game.
+    """
+
+    def summary(engine) -> StatsAccumulator:
+        accumulator = StatsAccumulator()
+        for game_stat in engine.iter_games():
+            accumulator.add(game_stat)
+        return accumulator
+
+    reference = summary(make_game(SeededDie(seed)))
+    mismatches = []
+    for number, name in enumerate(engines or ENGINES, 1):
+        if name == "reference":
+            continue
+        other = summary(make_engine(name, make_game(SeededDie(seed + number))))
+        for field in StatsAccumulator.FIELDS:
+            if field.startswith("game_min_"):
+                # sys.maxsize stands for no slide (climb) at all
+                continue
+            mean, variance = _mean_and_variance(
+                reference.histograms[field], reference.number_of_games
+            )
+            other_mean, other_variance = _mean_and_variance(
+                other.histograms[field], other.number_of_games
+            )
+            error = sqrt(
+                variance / reference.number_of_games
+                + other_variance / other.number_of_games
+            )
+            if abs(other_mean - mean) > z_limit * error:
+                mismatches.append(
+                    f"{name}: mean {field} = {round(other_mean, 3)}, "
+                    f"reference {round(mean, 3)} (standard error {round(error, 3)})"
+                )
+    return mismatches
+
+
+def fuzz(
+    number_of_boards: int,
+    seed: int = 0,
+    number_of_games: int = 20,
+    engines: Union[Iterable[str], None] = None,
+) -> List[str]:
+    """
+    Property check over random valid boards (drawn by BoardGenerator, as
+    many snakes and ladders as the rng picks), house rules, player counts
+    and scripted starts (rich in repeat rolls): every engine plays every
+    game exactly as the reference does
+    """
+    rng = Random(seed)
+    mismatches = []
+    for board_number in range(1, number_of_boards + 1):
+        generator = BoardGenerator(
+            rng.randint(0, EQUIVALENCE_FUZZ_MAX_ARTEFACTS),
+            rng.randint(0, EQUIVALENCE_FUZZ_MAX_ARTEFACTS),
+            seed,
+            board_number,
+        )
+        artefacts: List[Artefact] = []
+        for snakes, ladders in generator.boards(EQUIVALENCE_FUZZ_ATTEMPTS):
+            candidate: List[Artefact] = [
+                Snake(head=head, tail=tail) for head, tail in snakes
+            ]
+            candidate += [Ladder(bottom=bottom, top=top) for bottom, top in ladders]
+            activation_points_map = {
+                artefact.activation_point: artefact for artefact in candidate
+            }
+            if board_can_finish(CompiledBoard(activation_points_map, set())):
+                artefacts = candidate
+                break
+        rule_names = [name for name in RuleSet.RULE_NAMES if rng.random() < 0.3]
+        number_of_players = rng.randint(1, 4)
+        script = [
+            Const.DIE_ROLL_REPEAT if rng.random() < 0.4 else rng.randint(1, 6)
+            for _ in range(rng.randint(0, 40))
+        ]
+        die_seed = rng.randrange(2**32)
+        # Some seats roll dice of their own, with faces up to 12, as long
+        # as they can finish on the board
+        board = CompiledBoard(
+            {artefact.activation_point: artefact for artefact in artefacts},
+            set(),
+            max_roll=12,
+            rules=RuleSet(rule_names),
+        )
+        seat_distributions = {}
+        for seat in range(number_of_players):
+            faces = rng.sample(range(1, 13), rng.randint(1, 6))
+            if (
+                rng.random() < 0.3
+                and set(faces) != {Const.DIE_ROLL_REPEAT}
+                and board_can_finish(board, faces)
+            ):
+                seat_distributions[seat] = {face: rng.random() for face in faces}
+
+        def make_game(die: Die) -> Game:
+            game = Game(die, number_of_games, rules=RuleSet(rule_names))
+            game.add_players(
+                [Player(f"Player_{n}") for n in range(1, number_of_players + 1)]
+            )
+            game.add_artefacts(artefacts)
+            for seat, distribution in seat_distributions.items():
+                game.set_seat_die(seat, AliasDie(distribution, die.seed, seat + 1))
+            return game
+
+        for mismatch in compare_exact(
+            make_game,
+            lambda: ScriptedDie(script, die_seed),
+            range(1, number_of_games + 1),
+            engines,
+        ):
+            mismatches.append(
+                f"board {board_number} {artefacts} rules {rule_names} "
+                f"players {number_of_players} dice {seat_distributions} "
+                f"script {script}: {mismatch}"
+            )
+    return mismatches
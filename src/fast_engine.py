@@ -0,0 +1,325 @@
+import sys
+from typing import Callable, Dict, Union, List, Iterable, Iterator
+
+from .constants import Constants as Const
+from .board import CompiledBoard
+from .die import Die
+from .game_stats import GameStats
+from .game_stats_columns import GameStatsColumns
+from .heatmap import HitCounters
+from .game_exceptions import ERROR_MESSAGE_MOVES_NOT_COUNTED
+
+
+class FastGame:
+    """
+    A drop-in engine for Game.play / Game.play_game that produces the very
+    same GameStats, played off a CompiledBoard. The per move work is a few
+    table lookups on locals: no Player objects, no streak lists and no
+    tuples are built while the game runs. The per player state lives in
+    lists allocated once, when the engine is created.
+
+    Without count_moves, no move is counted (for hit_counters, or the
+    metrics of a run) and move_counts is None.
+
+    Given a turn_recorder, it is called after every turn that does not win
+    the game with the stats so far: the rolls of the player who played it,
+    the game's lucky and unlucky rolls, its slides (minimum, or sys.maxsize
+    if none yet, maximum, total and biggest in a streak) and climbs (alike),
+    and the player's longest streak (sum, repeat rolls and last roll).
+    """
+
+    __slots__ = (
+        "board",
+        "die",
+        "seat_dice",
+        "number_of_players",
+        "number_of_simulations",
+        "roll_cap",
+        "positions",
+        "rolls",
+        "max_streak_sum",
+        "max_streak_repeats",
+        "max_streak_last",
+        "move_counts",
+        "forfeit_move_counts",
+        "turn_recorder",
+    )
+
+    def __init__(
+        self,
+        board: CompiledBoard,
+        die: Die,
+        number_of_players: int,
+        number_of_simulations: int,
+        seat_dice: Union[Dict[int, Die], None] = None,
+        roll_cap: int = Const.GAME_ROLL_CAP,
+        count_moves: bool = True,
+    ):
+        self.board: CompiledBoard = board
+        self.die: Die = die
+        # Dice of their own for some seats, as in Game
+        self.seat_dice: Dict[int, Die] = dict(seat_dice or {})
+        self.number_of_players: int = number_of_players
+        self.number_of_simulations: int = number_of_simulations
+        # As in Game: checked between turns, 0 for no cap
+        self.roll_cap: int = roll_cap
+
+        # Per player state; a longest streak is kept as its sum plus the
+        # number of repeat rolls and the roll that ended it
+        self.positions: List[int] = [0] * number_of_players
+        self.rolls: List[int] = [0] * number_of_players
+        self.max_streak_sum: List[int] = [0] * number_of_players
+        self.max_streak_repeats: List[int] = [0] * number_of_players
+        self.max_streak_last: List[int] = [0] * number_of_players
+
+        # Every move played, counted by its index in the board tables (the
+        # forfeit tables' moves separately)
+        self.move_counts: Union[List[int], None] = None
+        self.forfeit_move_counts: Union[List[int], None] = None
+        if count_moves:
+            self.move_counts = [0] * len(board.next_position)
+            self.forfeit_move_counts = [0] * len(board.next_position)
+        self.turn_recorder: Union[Callable[..., None], None] = None
+
+    @classmethod
+    def from_game(
+        cls,
+        game,
+        board: Union[CompiledBoard, None] = None,
+        count_moves: bool = True,
+    ) -> "FastGame":
+        # Engines may share one (read-only) compiled board
+        return cls(
+            board or CompiledBoard.from_game(game),
+            game.die,
+            len(game.players),
+            game.number_of_simulations,
+            game.seat_dice,
+            game.roll_cap,
+            count_moves,
+        )
+
+    def play_game(self, simulation_number: int) -> Union[GameStats, None]:
+        number_of_players = self.number_of_players
+        # Same preconditions as Game.play
+        if number_of_players == 0:
+            return None
+        if simulation_number < 1 or simulation_number > self.number_of_simulations:
+            return None
+
+        board = self.board
+        stride = board.stride
+        tables = board.tables
+        next_position = tables.next_position
+        lucky_table = tables.lucky
+        climbed_table = tables.climbed
+        slid_table = tables.slid
+        positions = self.positions
+        rolls = self.rolls
+        max_streak_sum = self.max_streak_sum
+        max_streak_repeats = self.max_streak_repeats
+        max_streak_last = self.max_streak_last
+        move_counts = self.move_counts
+        counting = move_counts is not None
+        record_turn = self.turn_recorder
+        for player in range(number_of_players):
+            positions[player] = Const.PLAYER_START_POSITION
+            rolls[player] = 0
+            max_streak_sum[player] = 0
+            max_streak_repeats[player] = 0
+            max_streak_last[player] = 0
+
+        # No roll is 0, so without a repeat roll no roll ever repeats
+        REPEAT = board.rules.repeat_roll or 0
+        GOAL = Const.BOARD_POSITION_MAX
+        # Once a streak has this many repeat rolls, the next repeat roll is
+        # void and forfeits the turn: the moves come off the forfeit tables
+        forfeit_arm = sys.maxsize
+        if board.rules.repeats_to_forfeit:
+            forfeit_arm = board.rules.repeats_to_forfeit - 1
+
+        lucky = 0
+        unlucky = 0
+        total_slid = 0
+        min_slid = sys.maxsize
+        max_slid = 0
+        biggest_slide = 0
+        total_climbed = 0
+        min_climbed = sys.maxsize
+        max_climbed = 0
+        biggest_climb = 0
+
+        streak_sum = 0
+        streak_repeats = 0
+        streak_slid = 0
+        streak_climbed = 0
+
+        self.die.start_game(simulation_number)
+        for seat_die in self.seat_dice.values():
+            seat_die.start_game(simulation_number)
+        seat_rolls = [
+            self.seat_dice.get(seat, self.die).roll for seat in range(number_of_players)
+        ]
+        roll = seat_rolls[0]
+        roll_cap = self.roll_cap or sys.maxsize
+        game_rolls = 0
+
+        player = 0
+        position = Const.PLAYER_START_POSITION
+        player_rolls = 0
+        while True:
+            die_roll = roll()
+            move = position * stride + die_roll
+            if counting:
+                move_counts[move] += 1
+            position = next_position[move]
+            lucky += lucky_table[move]
+            player_rolls += 1
+
+            climbed = climbed_table[move]
+            if climbed:
+                total_climbed += climbed
+                streak_climbed += climbed
+                if climbed < min_climbed:
+                    min_climbed = climbed
+                if climbed > max_climbed:
+                    max_climbed = climbed
+            else:
+                slid = slid_table[move]
+                if slid:
+                    unlucky += 1
+                    total_slid += slid
+                    streak_slid += slid
+                    if slid < min_slid:
+                        min_slid = slid
+                    if slid > max_slid:
+                        max_slid = slid
+
+            streak_sum += die_roll
+            if die_roll == REPEAT:
+                if position == GOAL:
+                    break
+                streak_repeats += 1
+                if streak_repeats < forfeit_arm:
+                    continue
+                if streak_repeats == forfeit_arm:
+                    forfeit_tables = board.forfeit_tables
+                    next_position = forfeit_tables.next_position
+                    lucky_table = forfeit_tables.lucky
+                    climbed_table = forfeit_tables.climbed
+                    slid_table = forfeit_tables.slid
+                    move_counts = self.forfeit_move_counts
+                    continue
+                # This (void) repeat roll forfeits the turn
+                streak_repeats -= 1
+
+            # The streak (and the turn) ends here
+            if streak_repeats == forfeit_arm:
+                next_position = tables.next_position
+                lucky_table = tables.lucky
+                climbed_table = tables.climbed
+                slid_table = tables.slid
+                move_counts = self.move_counts
+            if streak_sum > max_streak_sum[player]:
+                max_streak_sum[player] = streak_sum
+                max_streak_repeats[player] = streak_repeats
+                max_streak_last[player] = die_roll
+            if streak_climbed > biggest_climb:
+                biggest_climb = streak_climbed
+            if streak_slid > biggest_slide:
+                biggest_slide = streak_slid
+            streak_sum = 0
+            streak_repeats = 0
+            streak_slid = 0
+            streak_climbed = 0
+
+            if position == GOAL:
+                break
+            if record_turn is not None:
+                record_turn(
+                    player_rolls,
+                    lucky,
+                    unlucky,
+                    min_slid,
+                    max_slid,
+                    total_slid,
+                    biggest_slide,
+                    min_climbed,
+                    max_climbed,
+                    total_climbed,
+                    biggest_climb,
+                    max_streak_sum[player],
+                    max_streak_repeats[player],
+                    max_streak_last[player],
+                )
+
+            # The turn's rolls count towards the cap
+            game_rolls += player_rolls - rolls[player]
+            if game_rolls >= roll_cap:
+                game_stat = GameStats()
+                game_stat.truncated = True
+                return game_stat
+
+            # Switch to the next player
+            positions[player] = position
+            rolls[player] = player_rolls
+            player += 1
+            if player == number_of_players:
+                player = 0
+            position = positions[player]
+            player_rolls = rolls[player]
+            roll = seat_rolls[player]
+
+        game_stat = GameStats()
+        game_stat.game_number_of_rolls_to_win = player_rolls
+        game_stat.game_total_lucky_rolls = lucky
+        game_stat.game_total_unlucky_rolls = unlucky
+        game_stat.game_min_distance_slide = min_slid
+        game_stat.game_max_distance_slide = max_slid
+        game_stat.game_total_distance_slid = total_slid
+        game_stat.biggest_slide_in_a_streak = biggest_slide
+        game_stat.game_min_distance_climbed = min_climbed
+        game_stat.game_max_distance_climbed = max_climbed
+        game_stat.game_total_distance_climbed = total_climbed
+        game_stat.biggest_climb_in_a_streak = biggest_climb
+
+        # The first player (in turn order) holding the longest streak
+        best = 0
+        for player in range(1, number_of_players):
+            if max_streak_sum[player] > max_streak_sum[best]:
+                best = player
+        if max_streak_sum[best] > 0:
+            game_stat.game_max_streak = [REPEAT] * max_streak_repeats[best] + [
+                max_streak_last[best]
+            ]
+
+        return game_stat
+
+    def hit_counters(self) -> HitCounters:
+        # Landings and snakes/ladders taken over all the games played so far
+        if self.move_counts is None:
+            raise ValueError(ERROR_MESSAGE_MOVES_NOT_COUNTED)
+        hit_counters = HitCounters()
+        hit_counters.add_move_counts(self.board.tables, self.move_counts)
+        if self.board.forfeit_tables is not None:
+            hit_counters.add_move_counts(
+                self.board.forfeit_tables, self.forfeit_move_counts
+            )
+        return hit_counters
+
+    def iter_games(
+        self, simulation_numbers: Union[Iterable[int], None] = None
+    ) -> Iterator[GameStats]:
+        if simulation_numbers is None:
+            simulation_numbers = range(1, self.number_of_simulations + 1)
+        for simulation_number in simulation_numbers:
+            game_stat = self.play_game(simulation_number)
+            if game_stat is not None:
+                yield game_stat
+
+    def run_simulations(self, game_stats: GameStatsColumns) -> None:
+        # Fill in a Game's preallocated records, as Game.run_simulations does
+        for simulation_number in range(1, self.number_of_simulations + 1):
+            game_stat = self.play_game(simulation_number)
+            if game_stat is not None:
+                game_stats[simulation_number - 1] = game_stat
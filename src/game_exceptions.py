@@ -7,6 +7,56 @@ ERROR_MESSAGE_ACTIVATION_CLASH = (
 ERROR_MESSAGE_UNSUPPORTED_ARTEFACT = (
     "Neither snake, nor ladder! Unsupported game object"
 )
+ERROR_MESSAGE_SHARD_NOT_SEEDED = "A shard must be played with seeded dice"
+ERROR_MESSAGE_DIE_DISTRIBUTION = (
+    "Invalid die {spec!r}: expected NdM (e.g. 2d6) or face:weight pairs "
+    "(e.g. 1:1,2:1,3:1,4:1,5:1,6:2) with faces from 1 to {face_max}"
+)
+ERROR_MESSAGE_TAPE_FORMAT = "{path}: not a roll tape"
+ERROR_MESSAGE_TAPE_ROLL = "A roll tape only holds rolls of 1 to 6, got {roll}"
+ERROR_MESSAGE_TAPE_DICE = (
+    "A roll tape only holds rolls of 1 to 6, and the dice of this game roll up "
+    "to {max_roll}"
+)
+ERROR_MESSAGE_TAPE_GAME_ORDER = (
+    "A roll tape records games in order: expected game {expected}, got {got}"
+)
+ERROR_MESSAGE_TAPE_NO_GAME = "The roll tape holds games 1 to {number_of_games}, not {game}"
+ERROR_MESSAGE_TAPE_RAN_OUT = "The roll tape ran out of rolls in game {game}"
+ERROR_MESSAGE_PIPELINE_JSON = "Not a JSON object: {error}"
+ERROR_MESSAGE_CONFIG_VALUE = "Invalid board config: {error}"
+ERROR_MESSAGE_CONFIG_LINE = "Invalid configuration line: {line}"
+ERROR_MESSAGE_CONFIG_FILE = "Please supply a config file by name {path}"
+ERROR_MESSAGE_CONFIG_ENGINE = "No such engine {name!r}: expected one of {names}"
+ERROR_MESSAGE_CONFIG_STATISTICS = "No such statistics {name!r}: expected one of {names}"
+ERROR_MESSAGE_BOARD_UNFINISHABLE = "Some games on this board never finish"
+ERROR_MESSAGE_CONTROL_VARIATES = (
+    "Control variates not applied: the roll cap cuts games short"
+)
+ERROR_MESSAGE_BOARD_COUNTS = "{snakes} snakes and {ladders} ladders do not fit on a board"
+ERROR_MESSAGE_BOARD_RULES = "The board is compiled for the house rules: {rules}"
+ERROR_MESSAGE_BOARD_FILE_FORMAT = "{path}: not a compiled board file"
+ERROR_MESSAGE_BOARD_FILE_CONFIG = (
+    "A board file holds the snakes, ladders and house rules: none may be given with it"
+)
+ERROR_MESSAGE_MOVES_NOT_COUNTED = (
+    "The engine counts no moves (made without count_moves): it has no hits to give"
+)
+ERROR_MESSAGE_BOOTSTRAP = (
+    "Invalid bootstrap of {replicates} replicates at confidence {confidence}: "
+    "expected at least 1 replicate and a confidence between 0 and 1"
+)
+ERROR_MESSAGE_MEMORY_SIZE = "Invalid memory size {spec!r}: expected e.g. 512M or 2G"
+ERROR_MESSAGE_MEMORY_BUDGET = (
+    "A memory budget of {budget} is too small: the run needs {needed} to start with"
+)
+ERROR_MESSAGE_NO_PARTIAL_RESULTS = "No partial results to merge"
+ERROR_MESSAGE_PARTIAL_RESULT_FORMAT = "{path}: not a partial result file"
+ERROR_MESSAGE_PARTIAL_RESULT_MISMATCH = (
+    "{path}: {key} does not match the other partial results"
+)
+ERROR_MESSAGE_SHARD_DUPLICATED = "Shard {index}/{count} is supplied more than once"
+ERROR_MESSAGE_SHARDS_MISSING = "Missing shard(s) {missing} of {count}"
 
 
 class EXCEPTION_SNAKE_LADDER_SIMULATOR(Exception):
@@ -65,3 +115,30 @@ class EXCEPTION_SNAKE_AT_WINNING_POSITION(EXCEPTION_SNAKE_LADDER_SIMULATOR):
     def __init__(self, activation_point, termination_point):
         # TODO: Check if it is a good practice to instantiate custom exception with arguments
         super().__init__(self.message_fmt, "Snake", activation_point, termination_point)
+
+
+class EXCEPTION_SIMULATION_CONFIG(ValueError):
+    # A simulation config that can not be run, and why (in message)
+    def __init__(self, message: str):
+        super().__init__(message)
+        self.message = message
+
+
+class EXCEPTION_CONFIG_FILE(EXCEPTION_SIMULATION_CONFIG):
+    # The config file can not be read
+    pass
+
+
+class EXCEPTION_CONFIG_SYNTAX(EXCEPTION_SIMULATION_CONFIG):
+    # A line of a config file, or a value of a config, that does not parse
+    pass
+
+
+class EXCEPTION_BOARD_INVALID(EXCEPTION_SIMULATION_CONFIG):
+    # Snakes and ladders that can not be placed on the board
+    pass
+
+
+class EXCEPTION_BOARD_UNFINISHABLE(EXCEPTION_SIMULATION_CONFIG):
+    # A board (and dice) on which some games never finish
+    pass
@@ -28,6 +28,10 @@ class GameStats:
         # streak
         self.game_max_streak: List[int] = []
 
+        # Cut short at the roll cap, without a winner: the other stats do not
+        # count
+        self.truncated: bool = False
+
     def __repr__(self):  # pragma: no coverage
         return pprint.pformat(self.__dict__.copy())
 
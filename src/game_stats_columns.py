@@ -0,0 +1,324 @@
+import sys
+from array import array
+from operator import add, mul
+from itertools import accumulate, compress, repeat
+from collections import Counter
+from typing import Dict, Iterator, List, Set, Tuple, Union
+
+from .constants import Constants as Const
+from .game_stats import GameStats
+from .simulation_stats import SimulationStats
+from .stats_accumulator import StatsAccumulator
+
+
+class GameStatsColumns:
+    """
+    The stats of every game of a run, held column-wise: one typed array per
+    GameStats field, so a game takes tens of bytes instead of a full object.
+    A game's max streak is always some repeat rolls and a last roll, and is
+    kept as those two numbers (any other list is kept as it is, aside), and
+    the games cut short at the roll cap as a set of their indexes.
+
+    Indexing gives a live view of a game's row, whose fields read and write
+    the columns; iterating gives GameStats records.
+    """
+
+    # The minimum slide and climb stay at sys.maxsize in games without one;
+    # no slide or climb is 0 long, so those columns keep that as 0
+    MINIMUM_FIELDS = ("game_min_distance_slide", "game_min_distance_climbed")
+    NO_MINIMUM = 0
+
+    def __init__(
+        self, number_of_games: int = 0, repeat_roll: int = Const.DIE_ROLL_REPEAT
+    ):
+        self.repeat_roll: int = repeat_roll
+        # One 4 byte int per field and game
+        self.columns: Dict[str, array] = {
+            field: array("i", [0]) * number_of_games
+            for field in StatsAccumulator.FIELDS
+        }
+        # The max streak: so many repeat rolls and then the last roll (0 for
+        # no streak)
+        self.streak_repeats = array("H", [0]) * number_of_games
+        self.streak_last = array("B", [0]) * number_of_games
+        # Max streaks of any other shape, by game
+        self.irregular_streaks: Dict[int, List[int]] = {}
+        # Games cut short at the roll cap (they are rare)
+        self.truncated: Set[int] = set()
+
+    def __len__(self) -> int:
+        return len(self.streak_last)
+
+    def __getitem__(self, index: int) -> "GameStatsRow":
+        return GameStatsRow(self, self._index(index))
+
+    def __setitem__(self, index: int, game_stat: GameStats) -> None:
+        index = self._index(index)
+        for field in self.columns:
+            self.set_field(index, field, getattr(game_stat, field))
+        self.set_max_streak(index, game_stat.game_max_streak)
+        self.set_truncated(index, game_stat.truncated)
+
+    def __iter__(self) -> Iterator[GameStats]:
+        for index in range(len(self)):
+            yield self.game_stat(index)
+
+    def _index(self, index: int) -> int:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("game stats index out of range")
+        return index
+
+    def append(self, game_stat: GameStats) -> None:
+        for column in self.columns.values():
+            column.append(0)
+        self.streak_repeats.append(0)
+        self.streak_last.append(0)
+        self[len(self) - 1] = game_stat
+
+    def game_stat(self, index: int) -> GameStats:
+        game_stat = GameStats()
+        for field in self.columns:
+            setattr(game_stat, field, self.field(index, field))
+        game_stat.game_max_streak = self.max_streak(index)
+        game_stat.truncated = index in self.truncated
+        return game_stat
+
+    def field(self, index: int, field: str) -> int:
+        value = self.columns[field][index]
+        if field in self.MINIMUM_FIELDS and value == self.NO_MINIMUM:
+            return sys.maxsize
+        return value
+
+    def set_field(self, index: int, field: str, value: int) -> None:
+        if field in self.MINIMUM_FIELDS and value == sys.maxsize:
+            value = self.NO_MINIMUM
+        self.columns[field][index] = value
+
+    def set_truncated(self, index: int, truncated: bool) -> None:
+        if truncated:
+            self.truncated.add(index)
+        else:
+            self.truncated.discard(index)
+
+    def won_games(self) -> "GameStatsColumns":
+        # A copy of the columns without the games cut short
+        kept = [index not in self.truncated for index in range(len(self))]
+        won = GameStatsColumns(0, self.repeat_roll)
+        for field, column in self.columns.items():
+            won.columns[field] = array(column.typecode, compress(column, kept))
+        won.streak_repeats = array("H", compress(self.streak_repeats, kept))
+        won.streak_last = array("B", compress(self.streak_last, kept))
+        if self.irregular_streaks:
+            new_index = list(accumulate(kept, initial=-1))[1:]
+            won.irregular_streaks = {
+                new_index[index]: streak
+                for index, streak in self.irregular_streaks.items()
+                if kept[index]
+            }
+        return won
+
+    def max_streak(self, index: int) -> List[int]:
+        if index in self.irregular_streaks:
+            return list(self.irregular_streaks[index])
+        last = self.streak_last[index]
+        if not last:
+            return []
+        return [self.repeat_roll] * self.streak_repeats[index] + [last]
+
+    def streak_sums(self) -> List[int]:
+        # The sum of every game's longest streak, column by column
+        streak_sums = list(
+            map(
+                add,
+                map(mul, self.streak_repeats, repeat(self.repeat_roll)),
+                self.streak_last,
+            )
+        )
+        for index, streak in self.irregular_streaks.items():
+            streak_sums[index] = sum(streak)
+        return streak_sums
+
+    def set_max_streak(self, index: int, streak: List[int]) -> None:
+        self.irregular_streaks.pop(index, None)
+        encoded = self._encode_streak(streak)
+        if encoded is None:
+            self.irregular_streaks[index] = list(streak)
+            encoded = (0, 0)
+        self.streak_repeats[index], self.streak_last[index] = encoded
+
+    def _encode_streak(self, streak: List[int]) -> Union[Tuple[int, int], None]:
+        if not streak:
+            return (0, 0)
+        repeats = len(streak) - 1
+        if (
+            repeats <= 0xFFFF
+            and 0 < streak[-1] <= 0xFF
+            and all(roll == self.repeat_roll for roll in streak[:-1])
+        ):
+            return (repeats, streak[-1])
+        return None
+
+    @classmethod
+    def bytes_per_game(cls) -> int:
+        # Memory a game's record takes (irregular streaks aside)
+        return 4 * len(StatsAccumulator.FIELDS) + 2 + 1
+
+    @property
+    def nbytes(self) -> int:
+        # Memory taken by the columns (irregular streaks aside)
+        columns = list(self.columns.values()) + [self.streak_repeats, self.streak_last]
+        return sum(column.itemsize * len(column) for column in columns)
+
+    def to_simulation_stats(self) -> SimulationStats:
+        """
+        The run's statistics, reduced column by column. Same results as
+        folding the games one at a time, including the first game to hold
+        the longest streak. Games cut short at the roll cap are only counted.
+        """
+        if self.truncated:
+            sim_stats = self.won_games().to_simulation_stats()
+            sim_stats.number_of_simulations = len(self)
+            sim_stats.number_of_truncated_games = len(self.truncated)
+            return sim_stats
+
+        sim_stats = SimulationStats()
+        number_of_games = len(self)
+        sim_stats.number_of_simulations = number_of_games
+        if number_of_games == 0:
+            return sim_stats
+
+        columns = self.columns
+
+        def reduce(minimum_of, maximum_of=None, total_of=None):
+            maximum_of = maximum_of or minimum_of
+            total_of = total_of or minimum_of
+            minimums = columns[minimum_of]
+            if minimum_of in self.MINIMUM_FIELDS:
+                minimums = filter(None, minimums)
+            return (
+                min(minimums, default=sys.maxsize),
+                max(max(columns[maximum_of]), 0),
+                round(sum(columns[total_of]) / number_of_games, 2),
+            )
+
+        # rolls
+        (
+            sim_stats.min_number_of_win_rolls,
+            sim_stats.max_number_of_win_rolls,
+            sim_stats.avg_number_of_win_rolls,
+        ) = reduce("game_number_of_rolls_to_win")
+        (
+            sim_stats.min_unlucky_rolls,
+            sim_stats.max_unlucky_rolls,
+            sim_stats.avg_unlucky_rolls,
+        ) = reduce("game_total_unlucky_rolls")
+        (
+            sim_stats.min_lucky_rolls,
+            sim_stats.max_lucky_rolls,
+            sim_stats.avg_lucky_rolls,
+        ) = reduce("game_total_lucky_rolls")
+
+        # distance climbed
+        (
+            sim_stats.min_distance_climbed,
+            sim_stats.max_distance_climbed,
+            sim_stats.avg_distance_climbed,
+        ) = reduce(
+            "game_min_distance_climbed",
+            "game_max_distance_climbed",
+            "game_total_distance_climbed",
+        )
+        sim_stats.biggest_climb_in_a_streak = max(
+            max(columns["biggest_climb_in_a_streak"]), 0
+        )
+
+        # distance slid
+        (
+            sim_stats.min_distance_slid,
+            sim_stats.max_distance_slid,
+            sim_stats.avg_distance_slid,
+        ) = reduce(
+            "game_min_distance_slide",
+            "game_max_distance_slide",
+            "game_total_distance_slid",
+        )
+        sim_stats.biggest_slide_in_a_streak = max(
+            max(columns["biggest_slide_in_a_streak"]), 0
+        )
+
+        # streak: the first game with the biggest sum, if bigger than the default
+        streak_sums = self.streak_sums()
+        biggest = max(streak_sums)
+        if biggest > sum(sim_stats.max_streak):
+            sim_stats.max_streak = self.max_streak(streak_sums.index(biggest))
+
+        return sim_stats
+
+    def to_accumulator(self) -> StatsAccumulator:
+        """
+        The games as a StatsAccumulator, reduced column by column: the same
+        summary as adding the games one at a time (a game without a slide
+        or climb counts its minimum as sys.maxsize)
+        """
+        if self.truncated:
+            accumulator = self.won_games().to_accumulator()
+            accumulator.number_of_truncated_games = len(self.truncated)
+            return accumulator
+
+        accumulator = StatsAccumulator()
+        number_of_games = len(self)
+        accumulator.number_of_games = number_of_games
+        for field, column in self.columns.items():
+            histogram = dict(Counter(column))
+            if field in self.MINIMUM_FIELDS and self.NO_MINIMUM in histogram:
+                histogram[sys.maxsize] = histogram.pop(self.NO_MINIMUM)
+            accumulator.histograms[field] = histogram
+            if number_of_games:
+                accumulator.sums[field] = sum(
+                    value * count for value, count in histogram.items()
+                )
+                accumulator.mins[field] = min(histogram)
+                accumulator.maxs[field] = max(histogram)
+
+        if number_of_games:
+            streak_sums = self.streak_sums()
+            biggest = max(streak_sums)
+            if biggest > 0:
+                accumulator.max_streak = self.max_streak(streak_sums.index(biggest))
+        return accumulator
+
+
+class GameStatsRow:
+    """
+    One game's row of a GameStatsColumns, with the fields of a GameStats
+    """
+
+    __slots__ = ("_columns", "_index")
+
+    def __init__(self, columns: GameStatsColumns, index: int):
+        object.__setattr__(self, "_columns", columns)
+        object.__setattr__(self, "_index", index)
+
+    def __getattr__(self, name):
+        if name == "game_max_streak":
+            return self._columns.max_streak(self._index)
+        if name == "truncated":
+            return self._index in self._columns.truncated
+        if name in self._columns.columns:
+            return self._columns.field(self._index, name)
+        raise AttributeError(name)
+
+    def __setattr__(self, name, value):
+        if name == "game_max_streak":
+            self._columns.set_max_streak(self._index, value)
+        elif name == "truncated":
+            self._columns.set_truncated(self._index, value)
+        elif name in self._columns.columns:
+            self._columns.set_field(self._index, name, value)
+        else:
+            raise AttributeError(name)
+
+    def __repr__(self):  # pragma: no coverage
+        return repr(self._columns.game_stat(self._index))
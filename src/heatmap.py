@@ -0,0 +1,101 @@
+from array import array
+from typing import Dict, List, Set, Tuple
+
+from .constants import Constants as Const
+from .artefact import Artefact
+from .board import MoveTables
+
+HEATMAP_SHADES = " .:-=+*#%@"
+
+
+class HitCounters:
+    """
+    How often each board cell is landed on, and how often the snake or
+    ladder at each activation point is taken. Both are plain integer
+    arrays indexed by the board position. Lucky position hits are the
+    landings on those cells.
+    """
+
+    def __init__(self):
+        self.landings = array("q", [0]) * (Const.BOARD_POSITION_MAX + 1)
+        self.triggers = array("q", [0]) * (Const.BOARD_POSITION_MAX + 1)
+
+    def record_landing(self, position: int) -> None:
+        self.landings[position] += 1
+
+    def record_trigger(self, position: int) -> None:
+        self.triggers[position] += 1
+
+    def add_move_counts(self, tables: MoveTables, move_counts: List[int]) -> None:
+        # Engines count the moves by their table index (a bincount of the
+        # moves); those fold into cells through the board's own tables.
+        # Void moves land on the start position, which is never reported.
+        for move, count in enumerate(move_counts):
+            if count:
+                self.landings[tables.landing[move]] += count
+                if tables.climbed[move] or tables.slid[move]:
+                    self.triggers[tables.landing[move]] += count
+
+    def merge(self, other: "HitCounters") -> None:
+        for position in range(Const.BOARD_POSITION_MAX + 1):
+            self.landings[position] += other.landings[position]
+            self.triggers[position] += other.triggers[position]
+
+    def artefact_hits(
+        self, activation_points_map: Dict[int, Artefact]
+    ) -> List[Tuple[Artefact, int]]:
+        return [
+            (activation_points_map[position], self.triggers[position])
+            for position in sorted(activation_points_map)
+        ]
+
+    def lucky_position_hits(self, lucky_positions: Set[int]) -> List[Tuple[int, int]]:
+        return [(position, self.landings[position]) for position in sorted(lucky_positions)]
+
+
+def format_heatmap(hit_counters: HitCounters) -> List[str]:
+    """
+    The board as rows of cells, 100 at the top and 1 at the bottom, each row
+    running the opposite way to the one below it. Every cell is shaded by
+    how often it is landed on, relative to the busiest cell.
+    """
+    busiest = max(hit_counters.landings[Const.BOARD_POSITION_MIN :]) or 1
+    lines = []
+    for row in reversed(range(Const.BOARD_POSITION_MAX // Const.BOARD_ROW_SIZE)):
+        cells = range(
+            row * Const.BOARD_ROW_SIZE + 1, (row + 1) * Const.BOARD_ROW_SIZE + 1
+        )
+        if row % 2:
+            cells = reversed(cells)
+        line = ""
+        for cell in cells:
+            shade = HEATMAP_SHADES[
+                hit_counters.landings[cell] * (len(HEATMAP_SHADES) - 1) // busiest
+            ]
+            line += f"{cell:4d}{shade * 2}"
+        lines.append(line)
+    return lines
+
+
+def print_hit_frequencies(
+    hit_counters: HitCounters,
+    activation_points_map: Dict[int, Artefact],
+    lucky_positions: Set[int],
+    number_of_games: int,
+):
+    number_of_games = number_of_games or 1
+
+    print("Landings per cell (busiest cell = @):")
+    for line in format_heatmap(hit_counters):
+        print(line)
+
+    print()
+    print("Snakes and ladders taken:")
+    for artefact, hits in hit_counters.artefact_hits(activation_points_map):
+        print(f"{artefact!r}: {hits} ({round(hits / number_of_games, 2)} per game)")
+
+    print()
+    print("Lucky positions landed on:")
+    for position, hits in hit_counters.lucky_position_hits(lucky_positions):
+        print(f"{position}: {hits} ({round(hits / number_of_games, 2)} per game)")
+    print()
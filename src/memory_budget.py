@@ -0,0 +1,274 @@
+import os
+import sys
+import tempfile
+from array import array
+from typing import Dict, Iterator, List, Set, Tuple, Union
+
+from .constants import Constants as Const
+from .game_stats import GameStats
+from .game_stats_columns import GameStatsColumns
+from .simulation_stats import SimulationStats
+from .stats_accumulator import StatsAccumulator
+from .game_exceptions import ERROR_MESSAGE_MEMORY_SIZE, ERROR_MESSAGE_MEMORY_BUDGET
+
+MEMORY_UNITS = {"": 1, "K": 2**10, "M": 2**20, "G": 2**30, "T": 2**40}
+
+
+def parse_memory_size(spec: str) -> int:
+    # A number of bytes, or of K, M, G or T (binary) units, e.g. 512M
+    number, unit = spec.strip().upper().rstrip("B"), ""
+    if number and number[-1] in MEMORY_UNITS:
+        number, unit = number[:-1], number[-1]
+    try:
+        size = int(float(number) * MEMORY_UNITS[unit])
+    except ValueError:
+        size = 0
+    if size <= 0:
+        raise ValueError(ERROR_MESSAGE_MEMORY_SIZE.format(spec=spec))
+    return size
+
+
+def format_memory_size(size: int) -> str:
+    return f"{size / 2**20:.1f} MB"
+
+
+def _status_bytes(key: str) -> Union[int, None]:
+    # A memory figure of this process, from /proc (Linux) in kB
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith(key + ":"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def current_memory() -> int:
+    # Resident memory of the process now (its peak where that is all there is)
+    resident = _status_bytes("VmRSS")
+    return resident if resident is not None else peak_memory()
+
+
+def peak_memory() -> int:
+    peak = _status_bytes("VmHWM")
+    if peak is not None:
+        return peak
+    import resource
+
+    # Kilobytes on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def reset_peak_memory() -> bool:
+    # Start the peak resident memory afresh (Linux only)
+    try:
+        with open("/proc/self/clear_refs", "w") as clear_refs:
+            clear_refs.write("5")
+        return True
+    except OSError:
+        return False
+
+
+class MemoryMonitor:
+    """
+    Peak resident memory of the process by phase of the run, the phases
+    started one after another. Where the peak can not be reset (other than
+    on Linux), each phase's peak is the peak of the run so far.
+    """
+
+    def __init__(self):
+        self.phases: List[Tuple[str, int]] = []
+        self.current_phase: Union[str, None] = None
+        self.per_phase: bool = True
+
+    def start_phase(self, name: str) -> None:
+        self.end_phase()
+        self.per_phase = reset_peak_memory() and self.per_phase
+        self.current_phase = name
+
+    def end_phase(self) -> None:
+        if self.current_phase is not None:
+            self.phases.append((self.current_phase, peak_memory()))
+            self.current_phase = None
+
+    def report(self) -> List[str]:
+        self.end_phase()
+        lines = [
+            f"Peak in {name} = {format_memory_size(peak)}" for name, peak in self.phases
+        ]
+        if not self.per_phase:
+            lines.append("(peaks of the run up to the end of each phase)")
+        return lines
+
+
+class MemoryPlan:
+    """
+    How a run fits a memory budget: what the process already takes aside,
+    as many per-game records as fit are kept in memory and the others are
+    spilled to disk, in chunks of which two at most are in memory at a
+    time (the one being filled, and one read back to be reduced). Threaded
+    runs aggregate as they go and keep no records; each thread takes
+    Const.MEMORY_PER_THREAD of its own.
+    """
+
+    def __init__(
+        self,
+        max_memory: int,
+        number_of_simulations: int,
+        number_of_threads: int = 1,
+        baseline: Union[int, None] = None,
+    ):
+        self.max_memory: int = max_memory
+        self.baseline: int = current_memory() if baseline is None else baseline
+        available = max_memory - self.baseline - Const.MEMORY_HEADROOM
+        if available <= 0:
+            raise ValueError(
+                ERROR_MESSAGE_MEMORY_BUDGET.format(
+                    budget=format_memory_size(max_memory),
+                    needed=format_memory_size(self.baseline + Const.MEMORY_HEADROOM),
+                )
+            )
+        self.available: int = available
+
+        self.number_of_threads: int = max(
+            1, min(number_of_threads, available // Const.MEMORY_PER_THREAD)
+        )
+        bytes_per_game = GameStatsColumns.bytes_per_game()
+        self.spill: bool = (
+            self.number_of_threads == 1
+            and number_of_simulations * bytes_per_game > available
+        )
+        self.chunk_size: int = number_of_simulations
+        if self.spill:
+            self.chunk_size = max(1, available // (2 * bytes_per_game))
+
+    def describe(self) -> str:
+        if self.number_of_threads > 1:
+            return (
+                f"{self.number_of_threads} threads aggregating as they go, "
+                "no per-game records kept"
+            )
+        if self.spill:
+            return (
+                f"per-game records spilled to disk in chunks of {self.chunk_size} "
+                "games, statistics reduced chunk by chunk"
+            )
+        return "every per-game record kept in memory"
+
+
+class SpillingGameStats:
+    """
+    Per-game records, in order, kept in memory a chunk at a time: every
+    full chunk is written to a spill file (every column's raw bytes in
+    turn) and dropped. The statistics are reduced chunk by chunk, so that
+    no more than two chunks are ever in memory. Stands in for a Game's
+    GameStatsColumns, filled in game after game.
+    """
+
+    def __init__(
+        self,
+        chunk_size: int,
+        repeat_roll: int = Const.DIE_ROLL_REPEAT,
+        spill_dir: Union[str, None] = None,
+    ):
+        self.chunk_size: int = chunk_size
+        self.repeat_roll: int = repeat_roll
+        self.spill_dir: Union[str, None] = spill_dir
+        self.chunk: GameStatsColumns = GameStatsColumns(0, repeat_roll)
+        self.spill_file = None
+        # Number of games of every chunk written to the spill file
+        self.spilled_chunks: List[int] = []
+        self.number_of_spilled_games: int = 0
+        # Max streaks of any other shape, by game (they are rare)
+        self.irregular_streaks: Dict[int, List[int]] = {}
+        # Games cut short at the roll cap, by game
+        self.truncated: Set[int] = set()
+
+    def __len__(self) -> int:
+        return self.number_of_spilled_games + len(self.chunk)
+
+    def __setitem__(self, index: int, game_stat: GameStats) -> None:
+        # The games are recorded in order
+        if index != len(self):
+            raise IndexError("spilled game stats are recorded in order")
+        self.append(game_stat)
+
+    def append(self, game_stat: GameStats) -> None:
+        self.chunk.append(game_stat)
+        index = len(self.chunk) - 1
+        if index in self.chunk.irregular_streaks:
+            self.irregular_streaks[len(self) - 1] = list(
+                self.chunk.irregular_streaks[index]
+            )
+        if game_stat.truncated:
+            self.truncated.add(len(self) - 1)
+        if len(self.chunk) == self.chunk_size:
+            self._spill()
+
+    def _spill(self) -> None:
+        if self.spill_file is None:
+            self.spill_file = tempfile.TemporaryFile(
+                prefix="game-stats-", dir=self.spill_dir
+            )
+        for column in self._arrays(self.chunk):
+            column.tofile(self.spill_file)
+        self.spilled_chunks.append(len(self.chunk))
+        self.number_of_spilled_games += len(self.chunk)
+        self.chunk = GameStatsColumns(0, self.repeat_roll)
+
+    @staticmethod
+    def _arrays(chunk: GameStatsColumns) -> List[array]:
+        columns = list(chunk.columns.values())
+        return columns + [chunk.streak_repeats, chunk.streak_last]
+
+    def _chunks(self) -> Iterator[GameStatsColumns]:
+        # Every chunk in turn, the spilled ones read back
+        first_game = 0
+        if self.spill_file is not None:
+            self.spill_file.flush()
+            self.spill_file.seek(0)
+        for number_of_games in self.spilled_chunks:
+            chunk = GameStatsColumns(0, self.repeat_roll)
+            for column in self._arrays(chunk):
+                column.fromfile(self.spill_file, number_of_games)
+            for index in range(number_of_games):
+                if first_game + index in self.irregular_streaks:
+                    chunk.irregular_streaks[index] = self.irregular_streaks[
+                        first_game + index
+                    ]
+                if first_game + index in self.truncated:
+                    chunk.truncated.add(index)
+            first_game += number_of_games
+            yield chunk
+        if self.spill_file is not None:
+            self.spill_file.seek(0, os.SEEK_END)
+        yield self.chunk
+
+    def __iter__(self) -> Iterator[GameStats]:
+        for chunk in self._chunks():
+            yield from chunk
+
+    @property
+    def nbytes(self) -> int:
+        # Memory taken by the chunk in memory
+        return self.chunk.nbytes
+
+    @property
+    def spilled_bytes(self) -> int:
+        return self.number_of_spilled_games * GameStatsColumns.bytes_per_game()
+
+    def to_accumulator(self) -> StatsAccumulator:
+        accumulator = StatsAccumulator()
+        for chunk in self._chunks():
+            accumulator.merge(chunk.to_accumulator())
+        return accumulator
+
+    def to_simulation_stats(self) -> SimulationStats:
+        return self.to_accumulator().to_simulation_stats()
+
+    def close(self) -> None:
+        if self.spill_file is not None:
+            self.spill_file.close()
+            self.spill_file = None
@@ -0,0 +1,269 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from operator import attrgetter
+from typing import Dict, List, Union
+
+from .constants import Constants as Const
+from .atomic_file import AtomicFile
+from .game_stats import GameStats
+
+# Every metric is named after the simulator
+METRICS_NAMESPACE = "snakes_ladders"
+OPENMETRICS_CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+# The SimulationStats averages estimated as the games come in, by the
+# per-game field they average
+METRICS_ESTIMATES: Dict[str, str] = {
+    "avg_number_of_win_rolls": "game_number_of_rolls_to_win",
+    "avg_unlucky_rolls": "game_total_unlucky_rolls",
+    "avg_lucky_rolls": "game_total_lucky_rolls",
+    "avg_distance_climbed": "game_total_distance_climbed",
+    "avg_distance_slid": "game_total_distance_slid",
+}
+
+
+def moves_played(engine) -> Union[int, None]:
+    # Moves of every game the engine has played, where it counts them
+    move_counts = getattr(engine, "move_counts", None)
+    if move_counts is None:
+        return None
+    return sum(move_counts) + sum(engine.forfeit_move_counts)
+
+
+class RunMetrics:
+    """
+    The progress of a run, for monitoring: the run records it a batch of
+    games at a time (with the seconds its worker was busy playing them and,
+    where the engine counts them, the moves played so far), so that nothing
+    is added per game or roll; the exporters read it on their own schedule.
+    The checkpoint is the last batch recorded: its age is how long the run
+    has gone without folding in any games (e.g. a stalled worker).
+    """
+
+    def __init__(self, number_of_simulations: int, number_of_workers: int = 1):
+        self.number_of_simulations: int = number_of_simulations
+        self.started: float = time.monotonic()
+        self.checkpoint: float = self.started
+        self.lock = threading.Lock()
+        self.number_of_games: int = 0
+        self.number_of_truncated_games: int = 0
+        self.sums: Dict[str, int] = {field: 0 for field in METRICS_ESTIMATES.values()}
+        # Per worker
+        self.busy: List[float] = [0.0] * number_of_workers
+        self.moves: List[Union[int, None]] = [None] * number_of_workers
+
+    def record(
+        self,
+        game_stats: List[GameStats],
+        busy_seconds: float,
+        worker: int = 0,
+        moves: Union[int, None] = None,
+    ) -> None:
+        won = [game_stat for game_stat in game_stats if not game_stat.truncated]
+        sums = {field: sum(map(attrgetter(field), won)) for field in self.sums}
+        with self.lock:
+            self.number_of_games += len(won)
+            self.number_of_truncated_games += len(game_stats) - len(won)
+            for field, total in sums.items():
+                self.sums[field] += total
+            self.busy[worker] += busy_seconds
+            if moves is not None:
+                self.moves[worker] = moves
+            self.checkpoint = time.monotonic()
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            now = time.monotonic()
+            elapsed = max(now - self.started, 1e-9)
+            games = self.number_of_games + self.number_of_truncated_games
+            moves = None
+            if any(worker_moves is not None for worker_moves in self.moves):
+                moves = sum(worker_moves or 0 for worker_moves in self.moves)
+            return {
+                "games_planned": self.number_of_simulations,
+                "games_completed": games,
+                "games_truncated": self.number_of_truncated_games,
+                "games_per_second": games / elapsed,
+                "moves": moves,
+                "moves_per_second": None if moves is None else moves / elapsed,
+                "worker_utilization": [busy / elapsed for busy in self.busy],
+                "checkpoint_age_seconds": now - self.checkpoint,
+                "elapsed_seconds": elapsed,
+                "estimates": {
+                    statistic: self.sums[field] / self.number_of_games
+                    for statistic, field in METRICS_ESTIMATES.items()
+                    if self.number_of_games
+                },
+            }
+
+    def to_openmetrics(self) -> str:
+        # The OpenMetrics text exposition (which Prometheus reads as well)
+        snapshot = self.snapshot()
+        families = [
+            ("games_planned", "gauge", "Games the run plays."),
+            (
+                "games_completed",
+                "counter",
+                "Games played so far, those cut short at the roll cap included.",
+            ),
+            ("games_truncated", "counter", "Games cut short at the roll cap so far."),
+            ("games_per_second", "gauge", "Games played per second, over the run."),
+            ("moves", "counter", "Moves played so far."),
+            ("moves_per_second", "gauge", "Moves played per second, over the run."),
+            (
+                "worker_utilization",
+                "gauge",
+                "Fraction of the run each worker was busy playing games.",
+            ),
+            (
+                "checkpoint_age_seconds",
+                "gauge",
+                "Seconds since the run last recorded a batch of games.",
+            ),
+            ("elapsed_seconds", "gauge", "Seconds since the run started."),
+            (
+                "estimate",
+                "gauge",
+                "SimulationStats averages over the games won so far.",
+            ),
+        ]
+        samples = {
+            name: [("", snapshot[name])]
+            for name, _, _ in families
+            if name in snapshot and snapshot[name] is not None
+        }
+        samples["worker_utilization"] = [
+            (f'{{worker="{worker}"}}', utilization)
+            for worker, utilization in enumerate(snapshot["worker_utilization"], 1)
+        ]
+        samples["estimate"] = [
+            (f'{{statistic="{statistic}"}}', value)
+            for statistic, value in snapshot["estimates"].items()
+        ]
+
+        lines: List[str] = []
+        for name, kind, help in families:
+            if name not in samples:
+                # e.g. the moves, where the engine does not count them
+                continue
+            family = f"{METRICS_NAMESPACE}_{name}"
+            lines.append(f"# TYPE {family} {kind}")
+            lines.append(f"# HELP {family} {help}")
+            suffix = "_total" if kind == "counter" else ""
+            for labels, value in samples[name]:
+                lines.append(f"{family}{suffix}{labels} {value:.10g}")
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+
+def write_textfile(path: str, metrics: RunMetrics) -> None:
+    # Written aside and moved into place, so that a collector never reads a
+    # file half written
+    with AtomicFile(path) as textfile:
+        textfile.write(metrics.to_openmetrics())
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    metrics: RunMetrics
+
+    def do_GET(self) -> None:
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = self.metrics.to_openmetrics().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", OPENMETRICS_CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args) -> None:
+        # Scrapes are not logged
+        pass
+
+
+class MetricsExporter:
+    """
+    Exposes a run's metrics while it runs: rewrites a textfile (for a
+    node_exporter textfile collector) every so many seconds, and, given a
+    port, serves them at /metrics on the local host, each off a daemon
+    thread. Stopping writes the textfile a last time.
+    """
+
+    def __init__(
+        self,
+        metrics: RunMetrics,
+        textfile: Union[str, None] = None,
+        port: Union[int, None] = None,
+        interval: float = Const.METRICS_INTERVAL,
+    ):
+        self.metrics: RunMetrics = metrics
+        self.textfile: Union[str, None] = textfile
+        self.interval: float = interval
+        self.stopping = threading.Event()
+        self.writer: Union[threading.Thread, None] = None
+        self.server: Union[ThreadingHTTPServer, None] = None
+        if port is not None:
+            handler = type("MetricsHandler", (_MetricsHandler,), {"metrics": metrics})
+            self.server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+            self.server.daemon_threads = True
+
+    @property
+    def port(self) -> Union[int, None]:
+        # The port served on (the one picked, where asked for port 0)
+        return None if self.server is None else self.server.server_address[1]
+
+    def _write_periodically(self) -> None:
+        while not self.stopping.wait(self.interval):
+            write_textfile(self.textfile, self.metrics)
+
+    def start(self) -> "MetricsExporter":
+        if self.textfile is not None:
+            write_textfile(self.textfile, self.metrics)
+            self.writer = threading.Thread(
+                target=self._write_periodically, name="metrics", daemon=True
+            )
+            self.writer.start()
+        if self.server is not None:
+            threading.Thread(
+                target=self.server.serve_forever, name="metrics-http", daemon=True
+            ).start()
+        return self
+
+    def stop(self) -> None:
+        self.stopping.set()
+        if self.writer is not None:
+            self.writer.join()
+            write_textfile(self.textfile, self.metrics)
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+
+    def __enter__(self) -> "MetricsExporter":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+
+def run_simulations(
+    engine,
+    game_stats,
+    metrics: RunMetrics,
+    batch_games: int = Const.METRICS_BATCH_GAMES,
+) -> None:
+    """
+    Fill in a Game's records as engine.run_simulations does, a batch of
+    games at a time, recording every batch to the metrics
+    """
+    play_game = engine.play_game
+    last = engine.number_of_simulations + 1
+    for first in range(1, last, batch_games):
+        start = time.perf_counter()
+        batch: List[GameStats] = []
+        for simulation_number in range(first, min(first + batch_games, last)):
+            game_stat = play_game(simulation_number)
+            if game_stat is not None:
+                game_stats[simulation_number - 1] = game_stat
+                batch.append(game_stat)
+        metrics.record(batch, time.perf_counter() - start, 0, moves_played(engine))
@@ -0,0 +1,119 @@
+import json
+from collections import deque
+from concurrent.futures import (
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    FIRST_COMPLETED,
+    wait,
+)
+from typing import Callable, Deque, Iterable, Tuple, Union
+
+from .simulator import SimulationConfig, Simulator
+from .snake_ladder_simulation import Game
+from .game_exceptions import ERROR_MESSAGE_PIPELINE_JSON
+
+# Boards handed to every worker at a time: enough to keep it busy while
+# its results are written, few enough to bound the memory of a long stream
+PIPELINE_BOARDS_PER_WORKER = 2
+
+
+def game_from_config(config: dict) -> Game:
+    """
+    A game set up from a board config: the keys of game.conf in lower case,
+    as JSON (see SimulationConfig.from_dict). Raises ValueError.
+    """
+    return SimulationConfig.from_dict(config).make_game()
+
+
+def evaluate_board(config: dict, engine_name: str = "fast") -> dict:
+    # The statistics of a board config's run, with what its pre-flight check
+    # flagged, or why it can not be run
+    try:
+        simulator = Simulator(SimulationConfig.from_dict(config), engine_name)
+    except ValueError as error:
+        return {"error": str(error)}
+    return simulator.run().to_dict()
+
+
+class _Done(Future):
+    # The result of a board that needs no worker (e.g. a line that is not
+    # JSON)
+    def __init__(self, result: dict):
+        super().__init__()
+        self.set_result(result)
+
+
+class _Inline(Executor):
+    # Evaluates every board as it is submitted, within this process
+    def submit(self, fn, *args, **kwargs):
+        return _Done(fn(*args, **kwargs))
+
+
+def run_pipeline(
+    lines: Iterable[str],
+    write: Callable[[str], None],
+    number_of_workers: int,
+    ordered: bool = True,
+    engine_name: str = "fast",
+) -> int:
+    """
+    Evaluate board configs, one JSON object per line, on a pool of worker
+    processes started once for the whole stream (none: within this
+    process), and write one JSON object per board: its line number, its
+    "id" if it has one, and its "statistics" (with any pre-flight
+    "warnings") or an "error". The results
+    come in input order, or as soon as they are ready; either way only so
+    many boards are read ahead of the results written, however long the
+    stream. Returns the number of boards.
+    """
+    window = max(number_of_workers, 1) * PIPELINE_BOARDS_PER_WORKER
+    executor: Executor = (
+        ProcessPoolExecutor(number_of_workers) if number_of_workers > 0 else _Inline()
+    )
+    pending: Deque[Tuple[int, Union[str, None], Future]] = deque()
+    number_of_boards = 0
+
+    def write_result(line_number: int, board_id, future: Future) -> None:
+        try:
+            result = future.result()
+        except Exception as error:  # e.g. a worker that died
+            result = {"error": repr(error)}
+        record = {"line": line_number}
+        if board_id is not None:
+            record["id"] = board_id
+        record.update(result)
+        write(json.dumps(record))
+
+    def drain(limit: int) -> None:
+        # Write results until no more than limit boards are outstanding
+        while len(pending) > limit:
+            if ordered:
+                line_number, board_id, future = pending.popleft()
+                write_result(line_number, board_id, future)
+                continue
+            done, _ = wait(
+                [future for _, _, future in pending], return_when=FIRST_COMPLETED
+            )
+            for entry in [entry for entry in pending if entry[2] in done]:
+                pending.remove(entry)
+                write_result(*entry)
+
+    with executor:
+        for line_number, line in enumerate(lines, 1):
+            if not line.strip():
+                continue
+            number_of_boards += 1
+            try:
+                config = json.loads(line)
+                if not isinstance(config, dict):
+                    raise ValueError(type(config).__name__)
+            except ValueError as error:
+                message = ERROR_MESSAGE_PIPELINE_JSON.format(error=error)
+                pending.append((line_number, None, _Done({"error": message})))
+            else:
+                future = executor.submit(evaluate_board, config, engine_name)
+                pending.append((line_number, config.get("id"), future))
+            drain(window - 1)
+        drain(0)
+    return number_of_boards
@@ -0,0 +1,205 @@
+import copy
+import queue
+import threading
+import time
+from math import ceil
+from typing import Dict, List, Tuple, Union
+
+from .constants import Constants as Const
+from .board import CompiledBoard
+from .die import Die, SeededDie
+from .engine_selection import game_rolls
+from .engines import make_engine
+from .game_stats import GameStats
+from .preflight import preflight
+from .snake_ladder_simulation import Game
+from .stats_accumulator import StatsAccumulator
+
+# The stages of a pipelined run, in order
+PIPELINED_STAGES = ("rolls", "games", "statistics")
+
+# Ends the stream of batches between two stages
+_END = None
+
+
+class PrefetchedDie(Die):
+    """
+    Rolls a game's rolls drawn ahead of time by the rolls stage (in bulk,
+    see Die.roll_ahead): each game hands over its rolls along with the die
+    that drew them, which rolls any more the game needs exactly as it would
+    have gone on to. The games are therefore those of the die itself,
+    however many rolls are drawn ahead.
+    """
+
+    def __init__(self, template: Die):
+        self.template: Die = template
+        self.seed: Union[int, None] = getattr(template, "seed", None)
+        # Of the batch being played: rolls and die, by simulation number
+        self.games: Dict[int, Tuple[List[int], Die]] = {}
+        self.rolls: List[int] = []
+        self.die: Die = template
+        self.next_roll: int = 0
+
+    def feed(self, games: Dict[int, Tuple[List[int], Die]]) -> None:
+        self.games = games
+
+    def start_game(self, simulation_number: int) -> None:
+        self.rolls, self.die = self.games.pop(simulation_number)
+        self.next_roll = 0
+
+    def roll(self) -> int:  # type: ignore[override]
+        if self.next_roll == len(self.rolls):
+            return self.die.roll()
+        self.next_roll += 1
+        return self.rolls[self.next_roll - 1]
+
+    def distribution(self) -> Dict[int, float]:
+        return self.template.distribution()
+
+
+def _put(to_stage: queue.Queue, item, stop: threading.Event) -> bool:
+    # Waits for room (the backpressure), unless the run is being stopped
+    while not stop.is_set():
+        try:
+            to_stage.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            pass
+    return False
+
+
+def _get(from_stage: queue.Queue, stop: threading.Event):
+    # The next batch, or the end of the stream once the run is being stopped
+    while not stop.is_set():
+        try:
+            return from_stage.get(timeout=0.1)
+        except queue.Empty:
+            pass
+    return _END
+
+
+def run_pipelined(
+    game: Game,
+    seed: int,
+    engine_name: str = "fast",
+    batch_games: int = Const.PIPELINED_BATCH_GAMES,
+    queue_batches: int = Const.PIPELINED_QUEUE_BATCHES,
+) -> Tuple[StatsAccumulator, Dict[str, float]]:
+    """
+    Play the game's simulations in three pipelined stages, on a thread
+    each: the rolls stage draws every game's die rolls ahead of time, a
+    batch of games at a time; the games stage plays the batches off those
+    rolls on an engine; and the statistics stage (the calling thread)
+    folds the games played into a StatsAccumulator. Bounded queues between
+    the stages hold a few batches at most, so that a stage ahead of the
+    next one waits for it. The games are those of a single-threaded run
+    with the seed.
+
+    Gives the accumulator and the seconds each stage was busy (waiting
+    left out), along with the "wall" time of the run. Like the threads of
+    a threaded run, the stages only overlap on a free-threaded build: under
+    the GIL they take turns, and the busy times show which stage to speed
+    up.
+    """
+    seeded = game.clone(SeededDie(seed))
+    number_of_players = len(game.players)
+    board = CompiledBoard.from_game(game)
+
+    # Every die rolled, the shared one under None, with the rolls drawn
+    # ahead for each game: as many as the seats rolling it take, on average,
+    # with a margin
+    templates: Dict[Union[int, None], Die] = {None: seeded.die}
+    templates.update(seeded.seat_dice)
+    report = preflight(game)
+    rolls_ahead: Dict[Union[int, None], int] = {}
+    for key in templates:
+        seats = 1
+        if key is None:
+            seats = max(1, number_of_players - len(seeded.seat_dice))
+        rolls_ahead[key] = ceil(
+            Const.PIPELINED_ROLLS_MARGIN * game_rolls(report, seats)
+        )
+
+    playing = game.clone(PrefetchedDie(seeded.die))
+    prefetched: Dict[Union[int, None], PrefetchedDie] = {None: playing.die}
+    for seat, seat_die in seeded.seat_dice.items():
+        prefetched[seat] = PrefetchedDie(seat_die)
+        playing.set_seat_die(seat, prefetched[seat])
+    engine = make_engine(engine_name, playing, board, count_moves=False)
+
+    busy: Dict[str, float] = {stage: 0.0 for stage in PIPELINED_STAGES}
+    errors: List[BaseException] = []
+    stop = threading.Event()
+    rolls_queue: queue.Queue = queue.Queue(maxsize=queue_batches)
+    games_queue: queue.Queue = queue.Queue(maxsize=queue_batches)
+
+    def draw_rolls() -> None:
+        try:
+            dice = {key: copy.copy(die) for key, die in templates.items()}
+            for first in range(1, game.number_of_simulations + 1, batch_games):
+                start = time.perf_counter()
+                numbers = range(
+                    first, min(first + batch_games, game.number_of_simulations + 1)
+                )
+                batch: Dict[Union[int, None], Dict[int, Tuple[List[int], Die]]] = {}
+                for key, die in dice.items():
+                    games = batch[key] = {}
+                    roll_ahead, ahead = die.roll_ahead, rolls_ahead[key]
+                    for simulation_number in numbers:
+                        die.start_game(simulation_number)
+                        rolls = roll_ahead(ahead)
+                        # The die goes on with the game; the next start_game
+                        # sets up a stream of its own
+                        games[simulation_number] = (rolls, copy.copy(die))
+                busy["rolls"] += time.perf_counter() - start
+                if not _put(rolls_queue, (numbers, batch), stop):
+                    return
+        except BaseException as error:
+            errors.append(error)
+            stop.set()
+        _put(rolls_queue, _END, stop)
+
+    def play_games() -> None:
+        try:
+            while True:
+                item = _get(rolls_queue, stop)
+                if item is _END:
+                    break
+                start = time.perf_counter()
+                numbers, batch = item
+                for key, die in prefetched.items():
+                    die.feed(batch[key])
+                game_stats: List[GameStats] = list(engine.iter_games(numbers))
+                busy["games"] += time.perf_counter() - start
+                if not _put(games_queue, game_stats, stop):
+                    return
+        except BaseException as error:
+            errors.append(error)
+            stop.set()
+        _put(games_queue, _END, stop)
+
+    started = time.perf_counter()
+    stages = [
+        threading.Thread(target=draw_rolls, name="rolls", daemon=True),
+        threading.Thread(target=play_games, name="games", daemon=True),
+    ]
+    for stage in stages:
+        stage.start()
+    accumulator = StatsAccumulator()
+    try:
+        while True:
+            game_stats = _get(games_queue, stop)
+            if game_stats is _END:
+                break
+            start = time.perf_counter()
+            for game_stat in game_stats:
+                accumulator.add(game_stat)
+            busy["statistics"] += time.perf_counter() - start
+    finally:
+        stop.set()
+        for stage in stages:
+            stage.join()
+    if errors:
+        raise errors[0]
+    busy["wall"] = time.perf_counter() - started
+    return accumulator, busy
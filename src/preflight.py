@@ -0,0 +1,196 @@
+from math import log
+from typing import Dict, List, Tuple, Union
+
+from .constants import Constants as Const
+from .board import CompiledBoard, board_can_finish
+from .game_exceptions import ERROR_MESSAGE_BOARD_UNFINISHABLE
+
+# Rolls of a single player followed at most, before the rest of the length
+# distribution is extrapolated from its rate of decay
+PREFLIGHT_MAX_ROLLS = 1000
+# The decay rate has settled once it changes by less than this in a roll,
+# so many rolls in a row
+PREFLIGHT_DECAY_TOLERANCE = 1e-9
+PREFLIGHT_SETTLED_ROLLS = 10
+# The tail looked at: the length only one game in so many outlasts
+PREFLIGHT_TAIL = 1e-6
+# Boards are flagged whose games take more rolls per player on average, or
+# in the tail, than these, or whose games are cut short more often
+PREFLIGHT_EXPECTED_ROLLS_MAX = 500
+PREFLIGHT_TAIL_ROLLS_MAX = 5000
+PREFLIGHT_TRUNCATED_MAX = 1e-4
+
+
+class RollSurvival:
+    """
+    How long a single player, alone on the board, takes to reach the goal,
+    in rolls: the chance of not having finished after each of the first
+    rolls, followed move by move on the compiled board (the forfeit rule
+    included), and beyond those a geometric tail at the rate the chance
+    was last seen to decay.
+    """
+
+    def __init__(self, board: CompiledBoard, face_probabilities: Dict[int, float]):
+        self.survival: List[float] = [1.0]
+        self.decay: float = 0.0
+
+        stride = board.stride
+        repeat_roll = board.rules.repeat_roll or 0
+        forfeit_arm = 0
+        if board.rules.repeats_to_forfeit:
+            forfeit_arm = board.rules.repeats_to_forfeit - 1
+        faces = [
+            (face, probability)
+            for face, probability in sorted(face_probabilities.items())
+            if probability > 0
+        ]
+        GOAL = Const.BOARD_POSITION_MAX
+
+        # Unfinished players by position and repeat rolls in the streak (the
+        # repeat rolls only matter under the forfeit rule)
+        states: Dict[Tuple[int, int], float] = {(Const.PLAYER_START_POSITION, 0): 1.0}
+        settled_rolls = 0
+        while len(self.survival) <= PREFLIGHT_MAX_ROLLS:
+            next_states: Dict[Tuple[int, int], float] = {}
+            for (position, repeats), p in states.items():
+                tables = board.tables
+                if forfeit_arm and repeats == forfeit_arm:
+                    tables = board.forfeit_tables
+                for face, probability in faces:
+                    next_position = tables.next_position[position * stride + face]
+                    if next_position == GOAL:
+                        continue
+                    next_repeats = 0
+                    if forfeit_arm and face == repeat_roll and repeats < forfeit_arm:
+                        next_repeats = repeats + 1
+                    key = (next_position, next_repeats)
+                    next_states[key] = next_states.get(key, 0.0) + p * probability
+            states = next_states
+            unfinished = sum(states.values())
+            if unfinished <= 0.0:
+                self.survival.append(0.0)
+                self.decay = 0.0
+                break
+            decay = unfinished / self.survival[-1]
+            self.survival.append(unfinished)
+            # No game finishes in the first few rolls: the chance does not
+            # decay at all, yet
+            if decay < 1.0 and abs(decay - self.decay) < PREFLIGHT_DECAY_TOLERANCE:
+                settled_rolls += 1
+            else:
+                settled_rolls = 0
+            self.decay = decay
+            if settled_rolls == PREFLIGHT_SETTLED_ROLLS:
+                break
+
+    def unfinished_after(self, rolls: int) -> float:
+        # The chance of not having finished after so many rolls
+        if rolls < len(self.survival):
+            return self.survival[rolls]
+        return self.survival[-1] * self.decay ** (rolls - len(self.survival) + 1)
+
+    def expected_rolls(self) -> float:
+        tail = self.survival[-1] * self.decay / (1.0 - self.decay)
+        return sum(self.survival) + tail
+
+    def rolls_outlasted_by(self, tail: float) -> int:
+        # The fewest rolls only so many players (a fraction) still need more
+        # than
+        for rolls, unfinished in enumerate(self.survival):
+            if unfinished <= tail:
+                return rolls
+        last = len(self.survival) - 1
+        return last + int(log(tail / self.survival[last]) / log(self.decay)) + 1
+
+
+class PreflightReport:
+    """
+    What a pre-flight check found out about a game's board, seat by seat
+    (the seats rolling the same die alike), before any game is played
+    """
+
+    def __init__(self):
+        self.can_finish: bool = True
+        # Of the slowest seat, per player
+        self.expected_rolls: float = 0.0
+        self.tail_rolls: int = 0
+        # The chance of a game being cut short at the roll cap
+        self.truncated_fraction: float = 0.0
+        self.problems: List[str] = []
+
+    @property
+    def ok(self) -> bool:
+        return not self.problems
+
+
+def unfinishable_seat(
+    game, board: CompiledBoard, number_of_players: Union[int, None] = None
+) -> Union[int, None]:
+    # The first seat whose die leaves some of its games on the board never
+    # ending, if any: each distinct die is checked once
+    number_of_players = number_of_players or len(game.players) or 1
+    finishing: Dict[Tuple[Tuple[int, float], ...], bool] = {}
+    for seat in range(number_of_players):
+        distribution = game.distribution_for_seat(seat)
+        key = tuple(sorted(distribution.items()))
+        if key not in finishing:
+            finishing[key] = board_can_finish(board, distribution)
+        if not finishing[key]:
+            return seat
+    return None
+
+
+def preflight(game, number_of_players: Union[int, None] = None) -> PreflightReport:
+    """
+    Check a game's board for games that never end, or are extremely long,
+    before simulating it: its compiled moves are followed for a single
+    player per die, a few hundred rolls at most. Games of several players
+    are taken to be cut short when every player would still be playing
+    after an even share of the roll cap.
+    """
+    number_of_players = number_of_players or len(game.players) or 1
+    board = CompiledBoard.from_game(game)
+    report = PreflightReport()
+
+    stuck = unfinishable_seat(game, board, number_of_players)
+    if stuck is not None:
+        report.can_finish = False
+        report.problems.append(
+            f"{ERROR_MESSAGE_BOARD_UNFINISHABLE} (player {stuck + 1})"
+        )
+        return report
+
+    survivals: Dict[Tuple[Tuple[int, float], ...], RollSurvival] = {}
+    seats: List[RollSurvival] = []
+    for seat in range(number_of_players):
+        distribution = game.distribution_for_seat(seat)
+        key = tuple(sorted(distribution.items()))
+        if key not in survivals:
+            survivals[key] = RollSurvival(board, distribution)
+        seats.append(survivals[key])
+
+    report.expected_rolls = max(seat.expected_rolls() for seat in seats)
+    report.tail_rolls = max(seat.rolls_outlasted_by(PREFLIGHT_TAIL) for seat in seats)
+    if report.expected_rolls > PREFLIGHT_EXPECTED_ROLLS_MAX:
+        report.problems.append(
+            f"Games are extremely long: about {round(report.expected_rolls)} "
+            "rolls per player on average"
+        )
+    if report.tail_rolls > PREFLIGHT_TAIL_ROLLS_MAX:
+        report.problems.append(
+            f"One player in a million needs over {report.tail_rolls} rolls "
+            "to finish"
+        )
+
+    if game.roll_cap:
+        share = game.roll_cap // number_of_players
+        truncated = 1.0
+        for seat in seats:
+            truncated *= seat.unfinished_after(share)
+        report.truncated_fraction = truncated
+        if truncated > PREFLIGHT_TRUNCATED_MAX:
+            report.problems.append(
+                f"About {truncated:.2%} of the games will be cut short at the "
+                f"roll cap of {game.roll_cap} rolls"
+            )
+    return report
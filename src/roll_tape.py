@@ -0,0 +1,243 @@
+import mmap
+import struct
+import sys
+from array import array
+from typing import List
+
+from .constants import Constants as Const
+from .atomic_file import AtomicFile
+from .die import Die
+from .game_exceptions import (
+    ERROR_MESSAGE_TAPE_FORMAT,
+    ERROR_MESSAGE_TAPE_ROLL,
+    ERROR_MESSAGE_TAPE_GAME_ORDER,
+    ERROR_MESSAGE_TAPE_NO_GAME,
+    ERROR_MESSAGE_TAPE_RAN_OUT,
+)
+
+# A roll tape is a header, the rolls of every game one after another, 3 bits
+# a roll (8 rolls to 3 bytes, the first roll in the lowest bits), and an
+# index of where each game's rolls start, closed by the number of rolls.
+# Every number is little-endian.
+TAPE_MAGIC = b"SLRT"
+TAPE_VERSION = 1
+TAPE_BITS_PER_ROLL = 3
+# Magic, version, bits per roll, number of games, number of rolls and the
+# offset of the index
+TAPE_HEADER = struct.Struct("<4sHHQQQ")
+# Rolls packed and written at a time
+TAPE_WRITE_BLOCK = 8 * 8192
+
+
+class RollTapeWriter:
+    """
+    Records the rolls of a run, game by game, into a roll tape. Games are
+    recorded in order of their simulation numbers, starting with 1. The tape
+    is written aside and only moved into place once closed: a run that
+    fails (or is discarded) leaves no partial tape behind.
+    """
+
+    def __init__(self, path: str):
+        self.path: str = path
+        self.tape = AtomicFile(path, "wb")
+        self.file = self.tape.file
+        self.file.write(bytes(TAPE_HEADER.size))
+        # Where each game's rolls start
+        self.index = array("Q")
+        self.number_of_rolls: int = 0
+        self.pending: List[int] = []
+
+    def start_game(self, simulation_number: int) -> None:
+        if simulation_number == len(self.index):
+            # Already started, by another seat's die
+            return
+        if simulation_number != len(self.index) + 1:
+            raise ValueError(
+                ERROR_MESSAGE_TAPE_GAME_ORDER.format(
+                    expected=len(self.index) + 1, got=simulation_number
+                )
+            )
+        self.index.append(self.number_of_rolls)
+
+    def roll(self, die_roll: int) -> None:
+        if not Const.DIE_ROLL_MIN <= die_roll <= Const.DIE_ROLL_MAX:
+            raise ValueError(ERROR_MESSAGE_TAPE_ROLL.format(roll=die_roll))
+        self.pending.append(die_roll)
+        self.number_of_rolls += 1
+        if len(self.pending) >= TAPE_WRITE_BLOCK:
+            self._write_pending()
+
+    def _write_pending(self) -> None:
+        # Whole groups of 8 rolls only, but for the last ones (padded with 0)
+        pending = self.pending
+        number_of_groups = len(pending) // 8
+        packed = bytearray()
+        for start in range(0, number_of_groups * 8, 8):
+            r = pending[start : start + 8]
+            group = (
+                r[0]
+                | r[1] << 3
+                | r[2] << 6
+                | r[3] << 9
+                | r[4] << 12
+                | r[5] << 15
+                | r[6] << 18
+                | r[7] << 21
+            )
+            packed += group.to_bytes(3, "little")
+        self.file.write(packed)
+        del pending[: number_of_groups * 8]
+
+    def close(self) -> None:
+        self.pending += [0] * (-len(self.pending) % 8)
+        self._write_pending()
+        # The index starts 8 byte aligned
+        self.file.write(bytes(-self.file.tell() % 8))
+        index_offset = self.file.tell()
+        index = array("Q", self.index)
+        index.append(self.number_of_rolls)
+        if sys.byteorder != "little":  # pragma: no cover
+            index.byteswap()
+        self.file.write(index.tobytes())
+
+        self.file.seek(0)
+        self.file.write(
+            TAPE_HEADER.pack(
+                TAPE_MAGIC,
+                TAPE_VERSION,
+                TAPE_BITS_PER_ROLL,
+                len(self.index),
+                self.number_of_rolls,
+                index_offset,
+            )
+        )
+        self.tape.commit()
+
+    def discard(self) -> None:
+        self.tape.discard()
+
+    def __enter__(self) -> "RollTapeWriter":
+        return self
+
+    def __exit__(self, exc_type, *exc_info) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
+
+
+class RecordingDie(Die):
+    # Rolls the given die, recording every roll onto the tape
+    def __init__(self, die: Die, writer: RollTapeWriter):
+        self.die: Die = die
+        self.writer: RollTapeWriter = writer
+
+    def start_game(self, simulation_number: int) -> None:
+        self.die.start_game(simulation_number)
+        self.writer.start_game(simulation_number)
+
+    def roll(self) -> int:  # type: ignore[override]
+        die_roll = self.die.roll()
+        self.writer.roll(die_roll)
+        return die_roll
+
+    def distribution(self):
+        return self.die.distribution()
+
+
+class RollTape:
+    """
+    A roll tape, read through a memory map: only the pages of the games
+    replayed are ever read in, whatever the size of the tape
+    """
+
+    def __init__(self, path: str):
+        self.path: str = path
+        with open(path, "rb") as tape_file:
+            try:
+                self.map = mmap.mmap(tape_file.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # An empty file can not be mapped
+                raise ValueError(ERROR_MESSAGE_TAPE_FORMAT.format(path=path))
+        try:
+            (
+                magic,
+                version,
+                bits_per_roll,
+                self.number_of_games,
+                self.number_of_rolls,
+                index_offset,
+            ) = TAPE_HEADER.unpack_from(self.map)
+        except struct.error:
+            magic = None
+        index_end = index_offset + 8 * (self.number_of_games + 1) if magic else 0
+        if (
+            magic != TAPE_MAGIC
+            or version != TAPE_VERSION
+            or bits_per_roll != TAPE_BITS_PER_ROLL
+            or index_end > len(self.map)
+        ):
+            self.map.close()
+            raise ValueError(ERROR_MESSAGE_TAPE_FORMAT.format(path=path))
+
+        if sys.byteorder == "little":
+            self.index = memoryview(self.map)[index_offset:index_end].cast("Q")
+        else:  # pragma: no cover
+            self.index = array("Q", self.map[index_offset:index_end])
+            self.index.byteswap()
+
+    def __len__(self) -> int:
+        return self.number_of_games
+
+    def rolls(self, simulation_number: int) -> List[int]:
+        # Every roll of the game, unpacked at once
+        if not 1 <= simulation_number <= self.number_of_games:
+            raise ValueError(
+                ERROR_MESSAGE_TAPE_NO_GAME.format(
+                    number_of_games=self.number_of_games, game=simulation_number
+                )
+            )
+        start = self.index[simulation_number - 1]
+        end = self.index[simulation_number]
+        first_byte = TAPE_HEADER.size + start // 8 * 3
+        last_byte = TAPE_HEADER.size + (end + 7) // 8 * 3
+        packed = int.from_bytes(self.map[first_byte:last_byte], "little")
+        packed >>= start % 8 * 3
+        return [(packed >> shift) & 7 for shift in range(0, (end - start) * 3, 3)]
+
+    def close(self) -> None:
+        if isinstance(self.index, memoryview):
+            self.index.release()
+        self.map.close()
+
+    def __enter__(self) -> "RollTape":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class TapeDie(Die):
+    """
+    Replays a roll tape: game n rolls exactly what game n rolled when the
+    tape was recorded, by every seat in turn
+    """
+
+    def __init__(self, tape: RollTape):
+        self.tape: RollTape = tape
+        self.simulation_number: int = 0
+        self.rolls: List[int] = []
+        self.next_roll: int = 0
+
+    def start_game(self, simulation_number: int) -> None:
+        self.simulation_number = simulation_number
+        self.rolls = self.tape.rolls(simulation_number)
+        self.next_roll = 0
+
+    def roll(self) -> int:  # type: ignore[override]
+        if self.next_roll == len(self.rolls):
+            raise ValueError(
+                ERROR_MESSAGE_TAPE_RAN_OUT.format(game=self.simulation_number)
+            )
+        self.next_roll += 1
+        return self.rolls[self.next_roll - 1]
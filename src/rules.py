@@ -0,0 +1,53 @@
+from typing import Iterable, Tuple, Union
+
+from .constants import Constants as Const
+
+
+class RuleSet:
+    """
+    House rules a game is played by. With no rules named, the game is played
+    by the default rules (see README.txt).
+
+    EXACT_ROLL_TO_WIN:        A roll that overshoots the winning position is
+                              void (the token stays), instead of bouncing back
+    THREE_SIXES_FORFEIT:      The third repeat roll in a row is void and ends
+                              the turn (the moves of the first two stand)
+    NO_EXTRA_TURN:            A repeat roll does not earn another roll
+    LADDERS_ON_EXACT_LANDING: A ladder is not taken when the token lands on its
+                              bottom by bouncing back
+    """
+
+    EXACT_ROLL_TO_WIN = "EXACT_ROLL_TO_WIN"
+    THREE_SIXES_FORFEIT = "THREE_SIXES_FORFEIT"
+    NO_EXTRA_TURN = "NO_EXTRA_TURN"
+    LADDERS_ON_EXACT_LANDING = "LADDERS_ON_EXACT_LANDING"
+    RULE_NAMES = (
+        EXACT_ROLL_TO_WIN,
+        THREE_SIXES_FORFEIT,
+        NO_EXTRA_TURN,
+        LADDERS_ON_EXACT_LANDING,
+    )
+
+    def __init__(self, names: Iterable[str] = ()):
+        rule_names = {name.strip().upper() for name in names}
+        unknown = rule_names - set(self.RULE_NAMES)
+        if unknown:
+            raise ValueError(f"Unknown rule(s): {', '.join(sorted(unknown))}")
+        self.names: Tuple[str, ...] = tuple(sorted(rule_names))
+
+        self.exact_roll_to_win: bool = self.EXACT_ROLL_TO_WIN in rule_names
+        self.repeat_roll: Union[int, None] = (
+            None if self.NO_EXTRA_TURN in rule_names else Const.DIE_ROLL_REPEAT
+        )
+        # Number of repeat rolls in a row that forfeits the turn (0 = never)
+        self.repeats_to_forfeit: int = (
+            Const.DIE_ROLL_REPEATS_TO_FORFEIT
+            if self.THREE_SIXES_FORFEIT in rule_names and self.repeat_roll is not None
+            else 0
+        )
+        self.ladders_on_bounce_back: bool = (
+            self.LADDERS_ON_EXACT_LANDING not in rule_names
+        )
+
+    def __repr__(self):
+        return f"RuleSet({', '.join(self.names) or 'default'})"
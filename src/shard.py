@@ -0,0 +1,180 @@
+import json
+import hashlib
+from typing import List, Tuple, Union
+
+from .constants import Constants as Const
+from .atomic_file import AtomicFile
+from .artefact import Snake
+from .die import SeededDie
+from .snake_ladder_simulation import Game
+from .stats_accumulator import StatsAccumulator
+from .game_exceptions import (
+    ERROR_MESSAGE_SHARD_NOT_SEEDED,
+    ERROR_MESSAGE_NO_PARTIAL_RESULTS,
+    ERROR_MESSAGE_PARTIAL_RESULT_FORMAT,
+    ERROR_MESSAGE_PARTIAL_RESULT_MISMATCH,
+    ERROR_MESSAGE_SHARD_DUPLICATED,
+    ERROR_MESSAGE_SHARDS_MISSING,
+)
+
+PARTIAL_RESULT_FORMAT = "snakes-and-ladders-partial-result"
+PARTIAL_RESULT_VERSION = 1
+
+
+class Shard:
+    """
+    Shard i of N (1-based) owns a fixed, contiguous slice of the
+    simulation numbers. Together the N shards cover every simulation
+    exactly once.
+    """
+
+    def __init__(self, index: int, count: int):
+        if count < 1 or index < 1 or index > count:
+            raise ValueError(f"Invalid shard {index}/{count}")
+        self.index: int = index
+        self.count: int = count
+
+    @classmethod
+    def parse(cls, spec: str) -> "Shard":
+        index, _, count = spec.partition("/")
+        return cls(int(index), int(count))
+
+    def simulation_numbers(self, number_of_simulations: int) -> range:
+        begin = (self.index - 1) * number_of_simulations // self.count
+        end = self.index * number_of_simulations // self.count
+        return range(begin + 1, end + 1)
+
+    def __repr__(self):
+        return f"{self.index}/{self.count}"
+
+
+def board_fingerprint(game: Game) -> str:
+    board = sorted(
+        (
+            "S" if isinstance(artefact, Snake) else "L",
+            artefact.activation_point,
+            artefact.termination_point,
+        )
+        for artefact in game.activation_points_map.values()
+    )
+    fingerprint = (board, game.rules.names)
+    if game.seat_dice:
+        fingerprint += (
+            sorted(
+                (seat, sorted(seat_die.distribution().items()))
+                for seat, seat_die in game.seat_dice.items()
+            ),
+        )
+    if game.roll_cap != Const.GAME_ROLL_CAP:
+        # Games cut short elsewhere are other games
+        fingerprint += (("roll_cap", game.roll_cap),)
+    return hashlib.sha256(repr(fingerprint).encode()).hexdigest()
+
+
+def run_shard(game: Game, shard: Shard, engine=None) -> dict:
+    # The games are played by the given engine (e.g. a FastGame of the
+    # same board), or by the game itself
+    if not isinstance(game.die, SeededDie) or any(
+        seat_die.seed != game.die.seed for seat_die in game.seat_dice.values()
+    ):
+        raise ValueError(ERROR_MESSAGE_SHARD_NOT_SEEDED)
+
+    accumulator = StatsAccumulator()
+    simulation_numbers = shard.simulation_numbers(game.number_of_simulations)
+    for game_stat in (engine or game).iter_games(simulation_numbers):
+        accumulator.add(game_stat)
+
+    return {
+        "format": PARTIAL_RESULT_FORMAT,
+        "version": PARTIAL_RESULT_VERSION,
+        "shard_index": shard.index,
+        "shard_count": shard.count,
+        "seed": game.die.seed,
+        "number_of_simulations": game.number_of_simulations,
+        "number_of_players": len(game.players),
+        "board": board_fingerprint(game),
+        "simulation_numbers": [simulation_numbers.start, simulation_numbers.stop - 1],
+        "stats": accumulator.to_dict(),
+    }
+
+
+def write_partial_result(path: str, partial_result: dict) -> None:
+    # Write next to the target and rename, so that a crashed shard never
+    # leaves a truncated file behind that looks complete
+    with AtomicFile(path) as partial_file:
+        json.dump(partial_result, partial_file, separators=(",", ":"))
+
+
+def read_partial_result(path: str) -> dict:
+    with open(path) as partial_file:
+        return json.load(partial_file)
+
+
+def merge_partial_results(
+    paths: List[str],
+) -> Tuple[bool, str, Union[dict, None], Union[StatsAccumulator, None]]:
+    """
+    Merge the partial results of the shards of one run. Returns the common
+    run parameters (seed, players, ...) along with the merged stats.
+    """
+    MUST_MATCH = (
+        "shard_count",
+        "seed",
+        "number_of_simulations",
+        "number_of_players",
+        "board",
+    )
+
+    if not paths:
+        return False, ERROR_MESSAGE_NO_PARTIAL_RESULTS, None, None
+
+    run: Union[dict, None] = None
+    shards_seen = set()
+    accumulator = StatsAccumulator()
+    for path in paths:
+        try:
+            partial_result = read_partial_result(path)
+        except (OSError, ValueError):
+            return False, ERROR_MESSAGE_PARTIAL_RESULT_FORMAT.format(path=path), None, None
+        if (
+            partial_result.get("format") != PARTIAL_RESULT_FORMAT
+            or partial_result.get("version") != PARTIAL_RESULT_VERSION
+        ):
+            return False, ERROR_MESSAGE_PARTIAL_RESULT_FORMAT.format(path=path), None, None
+
+        if run is None:
+            run = {key: partial_result[key] for key in MUST_MATCH}
+        for key in MUST_MATCH:
+            if partial_result[key] != run[key]:
+                return (
+                    False,
+                    ERROR_MESSAGE_PARTIAL_RESULT_MISMATCH.format(path=path, key=key),
+                    None,
+                    None,
+                )
+
+        index = partial_result["shard_index"]
+        if index in shards_seen:
+            return (
+                False,
+                ERROR_MESSAGE_SHARD_DUPLICATED.format(
+                    index=index, count=run["shard_count"]
+                ),
+                None,
+                None,
+            )
+        shards_seen.add(index)
+        accumulator.merge(StatsAccumulator.from_dict(partial_result["stats"]))
+
+    missing = sorted(set(range(1, run["shard_count"] + 1)) - shards_seen)
+    if missing:
+        return (
+            False,
+            ERROR_MESSAGE_SHARDS_MISSING.format(
+                missing=", ".join(map(str, missing)), count=run["shard_count"]
+            ),
+            None,
+            None,
+        )
+
+    return True, "", run, accumulator
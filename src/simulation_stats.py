@@ -9,6 +9,9 @@ class SimulationStats:
 
     def init_simulation_stats(self):
         self.number_of_simulations: int = 0
+        # Of the simulations, those cut short at the roll cap: every other
+        # statistic is over the games that were won
+        self.number_of_truncated_games: int = 0
 
         # rolls
         self.min_number_of_win_rolls: int = sys.maxsize
@@ -34,3 +37,17 @@ class SimulationStats:
         self.biggest_slide_in_a_streak: int = 0
 
         self.max_streak: List[int] = [0]
+
+    @property
+    def number_of_games_won(self) -> int:
+        return self.number_of_simulations - self.number_of_truncated_games
+
+    def to_dict(self) -> dict:
+        # Where every game was cut short there are no statistics of the games
+        # won: None rather than the values they start from
+        data = dict(self.__dict__)
+        if not self.number_of_games_won:
+            for field in data:
+                if field not in ("number_of_simulations", "number_of_truncated_games"):
+                    data[field] = None
+        return data
@@ -0,0 +1,442 @@
+from typing import Dict, Iterable, List, Sequence, Union
+
+from .constants import Constants as Const
+from .artefact import Artefact, Snake, Ladder
+from .board import CompiledBoard
+from .board_file import open_board_file
+from .control_variates import (
+    ControlVariateEstimate,
+    ControlVariateMoments,
+    control_variate_estimates,
+    known_rolls_to_win,
+)
+from .die import Die, SeededDie, AliasDie, parse_distribution
+from .analytic import MultiPlayerAnalysis, analyse_game
+from .engines import ENGINES, make_engine
+from .engine_selection import (
+    AUTO_ENGINE,
+    ANALYTIC_ENGINE,
+    STATISTICS,
+    STATISTICS_ALL,
+    STATISTICS_ROLLS,
+    EngineChoice,
+    RollsToWin,
+    choose_engine,
+)
+from .player import Player
+from .preflight import PreflightReport, preflight, unfinishable_seat
+from .rules import RuleSet
+from .simulation_stats import SimulationStats
+from .snake_ladder_simulation import Game
+from .stats_accumulator import StatsAccumulator
+from .game_exceptions import (
+    EXCEPTION_SNAKE_LADDER_SIMULATOR,
+    EXCEPTION_SIMULATION_CONFIG,
+    EXCEPTION_CONFIG_FILE,
+    EXCEPTION_CONFIG_SYNTAX,
+    EXCEPTION_BOARD_INVALID,
+    EXCEPTION_BOARD_UNFINISHABLE,
+    ERROR_MESSAGE_CONFIG_VALUE,
+    ERROR_MESSAGE_CONFIG_LINE,
+    ERROR_MESSAGE_CONFIG_FILE,
+    ERROR_MESSAGE_CONFIG_ENGINE,
+    ERROR_MESSAGE_CONFIG_STATISTICS,
+    ERROR_MESSAGE_BOARD_UNFINISHABLE,
+    ERROR_MESSAGE_CONTROL_VARIATES,
+    ERROR_MESSAGE_BOARD_FILE_CONFIG,
+)
+
+
+class SimulationConfig:
+    """
+    Everything a run is set up from: the numbers of simulations and of
+    players, the snakes (head, tail), the ladders (bottom, top), the house
+    rules, the dice (die specs by player number, 0 for every player), the
+    seed (None for unseeded dice) and the roll cap. A board file compiled
+    ahead (see the compile command) may stand in for the snakes, ladders and
+    rules: it is memory-mapped once per process. Built from a game.conf file
+    or its text, or from a dict with the keys of game.conf in lower case
+    (see the pipeline); nothing is printed, and every error is an
+    EXCEPTION_SIMULATION_CONFIG (a ValueError).
+    """
+
+    def __init__(
+        self,
+        number_of_simulations: int = 0,
+        number_of_players: int = 0,
+        snakes: Iterable[Sequence[int]] = (),
+        ladders: Iterable[Sequence[int]] = (),
+        rules: Iterable[str] = (),
+        dice: Union[Dict[int, str], None] = None,
+        seed: Union[int, None] = None,
+        roll_cap: int = Const.GAME_ROLL_CAP,
+        board_file: Union[str, None] = None,
+    ):
+        self.number_of_simulations: int = number_of_simulations
+        self.number_of_players: int = number_of_players
+        self.snakes: List[List[int]] = [list(snake) for snake in snakes]
+        self.ladders: List[List[int]] = [list(ladder) for ladder in ladders]
+        self.rules: List[str] = [rule.upper() for rule in rules]
+        self.dice: Dict[int, str] = dict(dice or {})
+        self.seed: Union[int, None] = seed
+        self.roll_cap: int = roll_cap
+        self.board_file: Union[str, None] = board_file
+
+    @classmethod
+    def from_file(cls, path: str = "game.conf") -> "SimulationConfig":
+        try:
+            with open(path) as conf_file:
+                text = conf_file.read()
+        except OSError:
+            raise EXCEPTION_CONFIG_FILE(ERROR_MESSAGE_CONFIG_FILE.format(path=path))
+        return cls.from_string(text)
+
+    @classmethod
+    def from_string(cls, text: str) -> "SimulationConfig":
+        # The lines of a game.conf; keys it does not know are ignored
+        config = cls()
+
+        def number(value: str, line: str) -> int:
+            try:
+                n = int(value)
+            except ValueError:
+                n = -1
+            if n < 0:
+                raise EXCEPTION_CONFIG_SYNTAX(ERROR_MESSAGE_CONFIG_LINE.format(line=line))
+            return n
+
+        for line in text.splitlines():
+            line = line.strip().split("#")[0]  # Strip away the comments
+            if not line:
+                continue
+            key_value = line.split("=")
+            if len(key_value) < 2:
+                raise EXCEPTION_CONFIG_SYNTAX(ERROR_MESSAGE_CONFIG_LINE.format(line=line))
+            key, value = key_value[0].strip().upper(), key_value[1].strip()
+            if key == "NUMBER_OF_SIMULATIONS":
+                config.number_of_simulations = number(value, line)
+            elif key == "NUMBER_OF_PLAYERS":
+                config.number_of_players = number(value, line)
+            elif key == "SNAKE" or key == "LADDER":
+                positions = [number(n.strip(), line) for n in value.split(",")]
+                if len(positions) != 2:
+                    raise EXCEPTION_CONFIG_SYNTAX(
+                        ERROR_MESSAGE_CONFIG_LINE.format(line=line)
+                    )
+                (config.snakes if key == "SNAKE" else config.ladders).append(positions)
+            elif key == "RULE":
+                if value.upper() not in RuleSet.RULE_NAMES:
+                    raise EXCEPTION_CONFIG_SYNTAX(
+                        ERROR_MESSAGE_CONFIG_LINE.format(line=line)
+                    )
+                config.rules.append(value.upper())
+            elif key == "DIE" or key.startswith("DIE_PLAYER_"):
+                player_number = (
+                    0 if key == "DIE" else number(key[len("DIE_PLAYER_") :], line)
+                )
+                try:
+                    parse_distribution(value)
+                except ValueError as error:
+                    raise EXCEPTION_CONFIG_SYNTAX(
+                        f"{error}\n{ERROR_MESSAGE_CONFIG_LINE.format(line=line)}"
+                    )
+                config.dice[player_number] = value
+            elif key == "BOARD_FILE":
+                config.board_file = value
+        return config
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "SimulationConfig":
+        """
+        A config from a dict with the keys of game.conf in lower case, e.g.
+            {"number_of_simulations": 1000, "number_of_players": 3,
+             "snakes": [[27, 5], [89, 53]], "ladders": [[4, 25]],
+             "rules": ["EXACT_ROLL_TO_WIN"], "die": "2d6", "dice": {"1": "1:1,6:2"},
+             "seed": 42, "roll_cap": 5000}
+        or with a "board_file" instead of the snakes, ladders and rules.
+        Only the number of simulations and of players are required; "die" is
+        the die of every player and "dice" the dice of some players, by player
+        number. Checked as it is built.
+        """
+        try:
+            dice = {
+                int(player_number): spec
+                for player_number, spec in data.get("dice", {}).items()
+            }
+            if data.get("die") is not None:
+                dice[0] = data["die"]
+            seed = data.get("seed")
+            config = cls(
+                int(data["number_of_simulations"]),
+                int(data["number_of_players"]),
+                [(int(head), int(tail)) for head, tail in data.get("snakes", [])],
+                [(int(bottom), int(top)) for bottom, top in data.get("ladders", [])],
+                list(data.get("rules", [])),
+                dice,
+                None if seed is None else int(seed),
+                int(data.get("roll_cap", Const.GAME_ROLL_CAP)),
+                data.get("board_file"),
+            )
+        except (KeyError, TypeError, ValueError, AttributeError) as error:
+            raise EXCEPTION_CONFIG_SYNTAX(ERROR_MESSAGE_CONFIG_VALUE.format(error=error))
+        config.check()
+        return config
+
+    def to_dict(self) -> dict:
+        data: dict = {
+            "number_of_simulations": self.number_of_simulations,
+            "number_of_players": self.number_of_players,
+            "snakes": self.snakes,
+            "ladders": self.ladders,
+            "rules": self.rules,
+            "dice": {
+                str(player_number): spec
+                for player_number, spec in self.dice.items()
+                if player_number
+            },
+            "seed": self.seed,
+            "roll_cap": self.roll_cap,
+        }
+        if 0 in self.dice:
+            data["die"] = self.dice[0]
+        if self.board_file is not None:
+            data["board_file"] = self.board_file
+        return data
+
+    def check(self) -> None:
+        # Raises EXCEPTION_CONFIG_SYNTAX for a value no game can be set up with
+        problem = None
+        if self.number_of_simulations < 1 or self.number_of_players < 1:
+            problem = "the numbers of simulations and players must be positive"
+        elif self.roll_cap < 0:
+            problem = "the roll cap must not be negative"
+        elif any(rule not in RuleSet.RULE_NAMES for rule in self.rules):
+            problem = f"no such house rule among {self.rules}"
+        elif self.board_file is not None and (
+            self.snakes or self.ladders or self.rules
+        ):
+            problem = ERROR_MESSAGE_BOARD_FILE_CONFIG
+        elif any(player_number < 0 for player_number in self.dice):
+            problem = "dice are by player number, from 1 (0 for every player)"
+        else:
+            for spec in self.dice.values():
+                try:
+                    parse_distribution(spec)
+                except ValueError as error:
+                    problem = str(error)
+        if problem is not None:
+            raise EXCEPTION_CONFIG_SYNTAX(ERROR_MESSAGE_CONFIG_VALUE.format(error=problem))
+
+    def artefacts(self) -> List[Artefact]:
+        try:
+            return [Snake(head=head, tail=tail) for head, tail in self.snakes] + [
+                Ladder(bottom=bottom, top=top) for bottom, top in self.ladders
+            ]
+        except EXCEPTION_SNAKE_LADDER_SIMULATOR as exception_sim:
+            raise EXCEPTION_BOARD_INVALID(
+                ERROR_MESSAGE_CONFIG_VALUE.format(error=exception_sim.message)
+            )
+
+    def make_game(self, retain_game_stats: bool = False) -> Game:
+        """
+        The game set up from the config, its board checked: raises
+        EXCEPTION_BOARD_INVALID for snakes and ladders that can not be
+        placed, and EXCEPTION_BOARD_UNFINISHABLE where some games would never
+        finish
+        """
+        self.check()
+        rules = RuleSet(self.rules)
+        board: Union[CompiledBoard, None] = None
+        if self.board_file is not None:
+            try:
+                board = open_board_file(self.board_file).board
+            except OSError:
+                raise EXCEPTION_CONFIG_FILE(
+                    ERROR_MESSAGE_CONFIG_FILE.format(path=self.board_file)
+                )
+            except ValueError as error:
+                raise EXCEPTION_BOARD_INVALID(
+                    ERROR_MESSAGE_CONFIG_VALUE.format(error=error)
+                )
+            rules = board.rules
+        die: Die = Die() if self.seed is None else SeededDie(self.seed)
+        game = Game(
+            die,
+            self.number_of_simulations,
+            retain_game_stats=retain_game_stats,
+            rules=rules,
+            roll_cap=self.roll_cap,
+        )
+        game.add_players(
+            [Player(f"Player_{n}") for n in range(1, self.number_of_players + 1)]
+        )
+        for seat in range(self.number_of_players):
+            spec = self.dice.get(seat + 1, self.dice.get(0))
+            if spec is not None:
+                game.set_seat_die(
+                    seat, AliasDie(parse_distribution(spec), self.seed, seat + 1)
+                )
+        if board is not None:
+            game.set_compiled_board(board)
+        else:
+            isSuccess, err_message = game.add_artefacts(self.artefacts())
+            if not isSuccess:
+                raise EXCEPTION_BOARD_INVALID(
+                    ERROR_MESSAGE_CONFIG_VALUE.format(error=err_message)
+                )
+
+        # No run may be stuck in a game that does not end
+        if unfinishable_seat(game, CompiledBoard.from_game(game)) is not None:
+            raise EXCEPTION_BOARD_UNFINISHABLE(ERROR_MESSAGE_BOARD_UNFINISHABLE)
+        return game
+
+
+class SimulationResult:
+    """
+    The outcome of a run: its statistics, the summary they come from (to
+    merge with other runs') and what the board's pre-flight check flagged.
+    Where only the rolls to win were asked for, those are summed up too;
+    worked out by the analysis, they are all there is (no games played, no
+    statistics). An engine picked automatically comes with its reason, and
+    the averages adjusted with control variates, where asked for, with the
+    variance they save.
+    """
+
+    def __init__(
+        self,
+        accumulator: Union[StatsAccumulator, None],
+        warnings: List[str],
+        seed: Union[int, None] = None,
+        rolls_to_win: Union[RollsToWin, None] = None,
+        engine_choice: Union[EngineChoice, None] = None,
+        control_variates: Union[List[ControlVariateEstimate], None] = None,
+    ):
+        self.accumulator: Union[StatsAccumulator, None] = accumulator
+        self.statistics: Union[SimulationStats, None] = None
+        if accumulator is not None:
+            self.statistics = accumulator.to_simulation_stats()
+        self.warnings: List[str] = list(warnings)
+        self.seed: Union[int, None] = seed
+        self.rolls_to_win: Union[RollsToWin, None] = rolls_to_win
+        self.engine_choice: Union[EngineChoice, None] = engine_choice
+        self.control_variates: List[ControlVariateEstimate] = control_variates or []
+
+    def to_dict(self) -> dict:
+        result: dict = {}
+        if self.warnings:
+            result["warnings"] = self.warnings
+        if self.statistics is not None:
+            result["statistics"] = self.statistics.to_dict()
+        if self.rolls_to_win is not None:
+            result["rolls_to_win"] = self.rolls_to_win.to_dict()
+        if self.control_variates:
+            result["control_variates"] = [
+                estimate.to_dict() for estimate in self.control_variates
+            ]
+        return result
+
+
+class Simulator:
+    """
+    A reusable handle on one config, for running simulations within a
+    process: the game is set up, its board checked and compiled once, and
+    every run() plays fresh games off it. Nothing is printed; invalid
+    configs raise EXCEPTION_SIMULATION_CONFIG (a ValueError). The "auto"
+    engine picks, run by run, the cheapest engine for the statistics asked
+    for ("all", or only the "rolls" to win). With control_variates, the
+    averages are adjusted with the winner's rolls, whose mean the analysis
+    gives exactly.
+
+        simulator = Simulator(SimulationConfig.from_file("game.conf"))
+        result = simulator.run(seed=42)
+        result.statistics.avg_number_of_win_rolls
+    """
+
+    def __init__(
+        self,
+        config: SimulationConfig,
+        engine: str = "fast",
+        statistics: str = STATISTICS_ALL,
+        control_variates: bool = False,
+    ):
+        if engine not in ENGINES and engine != AUTO_ENGINE:
+            raise EXCEPTION_SIMULATION_CONFIG(
+                ERROR_MESSAGE_CONFIG_ENGINE.format(
+                    name=engine, names=list(ENGINES) + [AUTO_ENGINE]
+                )
+            )
+        if statistics not in STATISTICS:
+            raise EXCEPTION_SIMULATION_CONFIG(
+                ERROR_MESSAGE_CONFIG_STATISTICS.format(
+                    name=statistics, names=list(STATISTICS)
+                )
+            )
+        self.config: SimulationConfig = config
+        self.engine_name: str = engine
+        self.statistics: str = statistics
+        self.control_variates: bool = control_variates
+        self.game: Game = config.make_game()
+        self.board: CompiledBoard = CompiledBoard.from_game(self.game)
+        self.preflight: PreflightReport = preflight(self.game)
+        # Worked out once, the first time the analysis is picked
+        self.analysis: Union[MultiPlayerAnalysis, None] = None
+
+    def run(
+        self,
+        number_of_simulations: Union[int, None] = None,
+        seed: Union[int, None] = None,
+    ) -> SimulationResult:
+        # So many games (by default, the config's), with the given seed (by
+        # default, the config's)
+        if seed is None:
+            seed = self.config.seed
+        engine_name, choice = self.engine_name, None
+        if engine_name == AUTO_ENGINE:
+            choice = choose_engine(
+                self.game,
+                number_of_simulations or self.config.number_of_simulations,
+                self.statistics,
+                self.preflight,
+                "control variates" if self.control_variates else None,
+            )
+            engine_name = choice.name
+        if engine_name == ANALYTIC_ENGINE:
+            if self.analysis is None:
+                self.analysis = analyse_game(self.game)
+            return SimulationResult(
+                None,
+                self.preflight.problems,
+                seed,
+                RollsToWin.from_analysis(self.analysis),
+                choice,
+            )
+
+        die: Die = Die() if seed is None else SeededDie(seed)
+        game = self.game.clone(die, number_of_simulations)
+        accumulator = StatsAccumulator()
+        games = make_engine(
+            engine_name, game, self.board, count_moves=False
+        ).iter_games()
+        warnings = list(self.preflight.problems)
+        estimates: List[ControlVariateEstimate] = []
+        if self.control_variates:
+            moments = ControlVariateMoments()
+            for game_stat in games:
+                accumulator.add(game_stat)
+                moments.add(game_stat)
+            if self.analysis is None:
+                self.analysis = analyse_game(self.game)
+            known_mean = known_rolls_to_win(self.game, self.preflight, self.analysis)
+            if known_mean is None:
+                warnings.append(ERROR_MESSAGE_CONTROL_VARIATES)
+            else:
+                estimates = control_variate_estimates(moments, known_mean)
+        else:
+            for game_stat in games:
+                accumulator.add(game_stat)
+        rolls_to_win = None
+        if self.statistics == STATISTICS_ROLLS:
+            rolls_to_win = RollsToWin.from_accumulator(accumulator)
+        return SimulationResult(
+            accumulator, warnings, seed, rolls_to_win, choice, estimates
+        )
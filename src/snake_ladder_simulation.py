@@ -1,37 +1,106 @@
 import sys
-from typing import Union, List, Tuple, Dict, Set
+from typing import Union, List, Tuple, Dict, Set, Iterable, Iterator
 import argparse
 import logging
 
 from .constants import Constants as Const
 from .player import Player
 from .artefact import Artefact, Snake, Ladder
+from .board import CompiledBoard
 from .die import Die
+from .rules import RuleSet
 from .simulation_stats import SimulationStats
 from .game_stats import GameStats
+from .game_stats_columns import GameStatsColumns
+from .heatmap import HitCounters
 from .game_exceptions import (
     ERROR_MESSAGE_ACTIVATION_CLASH,
     ERROR_MESSAGE_ACTIVATION_DUPLICATED,
+    ERROR_MESSAGE_BOARD_RULES,
     ERROR_MESSAGE_UNSUPPORTED_ARTEFACT,
 )
 
 
 class Game:
-    def __init__(self, die: Die, number_of_simulations: int):
+    def __init__(
+        self,
+        die: Die,
+        number_of_simulations: int,
+        retain_game_stats: bool = True,
+        rules: Union[RuleSet, None] = None,
+        roll_cap: int = Const.GAME_ROLL_CAP,
+    ):
         self.number_of_simulations = number_of_simulations
+        self.rules: RuleSet = rules or RuleSet()
+        # Rolls (of all players) after which a game is cut short; 0 for none
+        self.roll_cap: int = roll_cap
         self.players: List[Player] = []
         self.snakes: List[Snake] = []
         self.ladders: List[Ladder] = []
         self.die: Die = die
+        # Dice of their own for some seats (0-based, in turn order); the
+        # other seats roll the shared die
+        self.seat_dice: Dict[int, Die] = {}
         self.activation_points_map: Dict[int, Artefact] = dict()
         self.termination_points: Set[int] = set()
         self.lucky_positions: Set[int] = set()
         self.curr_player_ndx: int = 0
-        self.game_stats: List[GameStats] = []
         self.sim_stats: SimulationStats = SimulationStats()
+        # Set to a HitCounters to have the moves counted per board cell
+        self.hit_counters: Union[HitCounters, None] = None
+        # The board compiled ahead, where it was set up from one (see
+        # set_compiled_board)
+        self.compiled_board: Union[CompiledBoard, None] = None
+
+        # Callers that fold each game into their own aggregate (e.g. shards)
+        # do not need a record per simulation kept around
+        self.game_stats: GameStatsColumns = GameStatsColumns(
+            number_of_simulations if retain_game_stats else 0,
+            self.rules.repeat_roll or Const.DIE_ROLL_REPEAT,
+        )
 
-        for n in range(number_of_simulations):
-            self.game_stats.append(GameStats())
+    def clone(
+        self,
+        die: Die,
+        number_of_simulations: Union[int, None] = None,
+        retain_game_stats: bool = False,
+    ) -> "Game":
+        """
+        A game of the same players, snakes, ladders and rules, played with
+        another die (e.g. by another thread or engine)
+        """
+        game = Game(
+            die,
+            number_of_simulations or self.number_of_simulations,
+            retain_game_stats=retain_game_stats,
+            rules=self.rules,
+            roll_cap=self.roll_cap,
+        )
+        game.add_players([Player(player.name) for player in self.players])
+        if self.compiled_board is not None:
+            game.set_compiled_board(self.compiled_board)
+        else:
+            game.add_artefacts(list(self.activation_points_map.values()))
+        for seat, seat_die in self.seat_dice.items():
+            game.set_seat_die(seat, seat_die.clone(getattr(die, "seed", None)))
+        return game
+
+    def set_seat_die(self, seat: int, die: Die) -> None:
+        # The die rolled by the player in the given seat (0-based)
+        self.seat_dice[seat] = die
+
+    def die_for_seat(self, seat: int) -> Die:
+        return self.seat_dice.get(seat, self.die)
+
+    def distribution_for_seat(self, seat: int) -> Dict[int, float]:
+        return self.die_for_seat(seat).distribution()
+
+    def max_roll(self) -> int:
+        # The biggest roll any seat can make (the shared die is a d6)
+        return max(
+            [Const.DIE_ROLL_MAX]
+            + [max(seat_die.distribution()) for seat_die in self.seat_dice.values()]
+        )
 
     def reset_player_state(self) -> None:
         self.curr_player_ndx = 0
@@ -62,6 +131,37 @@ class Game:
             ):
                 self.lucky_positions.add(before)
 
+    def set_compiled_board(self, board: CompiledBoard) -> None:
+        """
+        Set up the board from one compiled (and checked) ahead, e.g. read
+        from a board file: its snakes, ladders and lucky positions are taken
+        as they are, and the engines play off its tables. The board must be
+        compiled for the game's house rules (raises ValueError).
+        """
+        if board.rules.names != self.rules.names:
+            raise ValueError(
+                ERROR_MESSAGE_BOARD_RULES.format(
+                    rules=", ".join(board.rules.names) or "none"
+                )
+            )
+        self.activation_points_map = dict(board.activation_points_map)
+        self.termination_points = {
+            artefact.termination_point
+            for artefact in self.activation_points_map.values()
+        }
+        self.lucky_positions = set(board.lucky_positions)
+        self.snakes = [
+            artefact
+            for artefact in self.activation_points_map.values()
+            if isinstance(artefact, Snake)
+        ]
+        self.ladders = [
+            artefact
+            for artefact in self.activation_points_map.values()
+            if isinstance(artefact, Ladder)
+        ]
+        self.compiled_board = board
+
     def add_artefacts(self, artefacts: List[Artefact]) -> Tuple[bool, str]:
         # Ensure that the snakes and the ladders do not start at the same position
         # (take into consideration snakes and ladders in this list, and alse those
@@ -92,6 +192,9 @@ class Game:
         if len(overlaps):
             return (False, ERROR_MESSAGE_ACTIVATION_CLASH)
 
+        # The board changes: any compiled ahead no longer holds
+        self.compiled_board = None
+
         # Update internal records of activation, termination
         new_activation_points_map = {
             artefact.activation_point: artefact for artefact in artefacts
@@ -123,8 +226,11 @@ class Game:
         return True, ""
 
     def play(self, simulation_number) -> Tuple[bool, Union[Player, None]]:
+        # A game cut short at the roll cap is played, without a winner
         winner: Union[Player, None] = None
         curr_streak = []
+        game_rolls: int = 0
+        roll_cap: int = self.roll_cap or sys.maxsize
         distance_slid: int = 0
         distance_climbed: int = 0
         total_distance_slid_in_a_streak: int = 0
@@ -136,28 +242,47 @@ class Game:
 
         # simulation_number is expected to be 1-based
         if simulation_number < 1 or simulation_number > self.number_of_simulations:
-            print(
+            logging.warning(
                 f"Invalid simulation number ({simulation_number}). Expected number between 1 and {self.number_of_simulations}"
             )
             return (False, None)
 
+        self.die.start_game(simulation_number)
+        for seat_die in self.seat_dice.values():
+            seat_die.start_game(simulation_number)
+
         while True:
             winner = self.spot_winner()
             if winner:
                 break
+            if game_rolls >= roll_cap:
+                logging.info(f"Game cut short after {game_rolls} rolls")
+                break
 
             curr_player: Player = self.players[self.curr_player_ndx]
 
-            die_roll = self.die.roll()
-            distance_climbed, distance_slid = self.move_token(curr_player, die_roll)
+            die_roll = self.die_for_seat(self.curr_player_ndx).roll()
+
+            # House rule: too many repeat rolls in a row forfeit the turn
+            forfeit = (
+                die_roll == self.rules.repeat_roll
+                and len(curr_streak) + 1 == self.rules.repeats_to_forfeit
+            )
+            if forfeit:
+                logging.info(f"{curr_player.name} forfeits the turn rolling {die_roll}")
+                distance_climbed, distance_slid = 0, 0
+            else:
+                distance_climbed, distance_slid = self.move_token(
+                    curr_player, die_roll
+                )
 
             curr_player.number_of_rolls += 1
             curr_streak.append(die_roll)
             total_distance_climbed_in_a_streak += distance_climbed
             total_distance_slid_in_a_streak += distance_slid
 
-            # Case: die roll is not the 'repeat' roll
-            if die_roll != Const.DIE_ROLL_REPEAT:
+            # Case: die roll is not the 'repeat' roll (or the turn is forfeited)
+            if die_roll != self.rules.repeat_roll or forfeit:
                 if sum(curr_streak) > sum(curr_player.max_streak):
                     curr_player.max_streak = curr_streak
                 curr_player.biggest_climb_in_a_streak = max(
@@ -172,13 +297,21 @@ class Game:
                 total_distance_climbed_in_a_streak = 0
                 # Switch to the next player
                 self.curr_player_ndx = (self.curr_player_ndx + 1) % len(self.players)
+                game_rolls += len(curr_streak)
                 curr_streak = []
 
         return (True, winner)
 
-    def record_game_stat(self, winner: Player, simulation_number_offset):
+    def record_game_stat(self, winner: Union[Player, None], simulation_number_offset):
         # TODO: Write test for game_stat calculations
-        game_stat = self.game_stats[simulation_number_offset]
+        game_stat = GameStats()
+        self.fill_game_stat(winner, game_stat)
+        self.game_stats[simulation_number_offset] = game_stat
+
+    def fill_game_stat(self, winner: Union[Player, None], game_stat: GameStats):
+        if winner is None:
+            game_stat.truncated = True
+            return
         game_stat.game_number_of_rolls_to_win = winner.number_of_rolls
         player: Player
         for player in self.players:
@@ -229,6 +362,7 @@ class Game:
 
         distance_slid: int = 0
         distance_climbed: int = 0
+        bounced: bool = False
 
         # Check if this the last lucky roll from the lucky zone
         if (
@@ -241,7 +375,12 @@ class Game:
             player.number_of_lucky_rolls += 1
 
         if player.token_position + die_roll > Const.BOARD_POSITION_MAX:
+            if self.rules.exact_roll_to_win:
+                # House rule: overshooting the board is not a move at all
+                logging.info(f"{player.name} needs an exact roll to win")
+                return (distance_climbed, distance_slid)
             # Bounce back if we are overshooting the board
+            bounced = True
             player.token_position = (
                 Const.BOARD_POSITION_MAX
                 - die_roll
@@ -251,6 +390,9 @@ class Game:
         else:
             player.token_position += die_roll
 
+        if self.hit_counters is not None:
+            self.hit_counters.record_landing(player.token_position)
+
         # Check if the player missed a snake by 1 or 2 positions
         if player.token_position in self.lucky_positions:
             # TODO: Write a test for this
@@ -259,9 +401,20 @@ class Game:
             )
             player.number_of_lucky_rolls += 1
 
+        # House rule: a ladder is not taken when bounced back onto
+        if (
+            bounced
+            and not self.rules.ladders_on_bounce_back
+            and isinstance(self.activation_points_map.get(player.token_position), Ladder)
+        ):
+            logging.info(f"{player.name} bounced back onto a ladder, not taking it")
+            return (distance_climbed, distance_slid)
+
         # Act if we have arrived at the head of snake, or start of a ladder
         if player.token_position in self.activation_points_map:
             artefact: Artefact = self.activation_points_map[player.token_position]
+            if self.hit_counters is not None:
+                self.hit_counters.record_trigger(player.token_position)
             player.token_position = artefact.termination_point
             if isinstance(artefact, Snake):
                 player.number_of_unlucky_rolls += 1
@@ -291,6 +444,36 @@ class Game:
                 )
         return (distance_climbed, distance_slid)
 
+    def play_game(self, simulation_number) -> Union[GameStats, None]:
+        """
+        Play one game and return its stats without retaining them.
+        The players are reset, ready for the next game.
+        """
+        game_stat: Union[GameStats, None] = None
+        isSuccess, winner = self.play(simulation_number)
+        if isSuccess:
+            game_stat = GameStats()
+            self.fill_game_stat(winner, game_stat)
+        self.reset_player_state()
+        return game_stat
+
+    def iter_games(
+        self, simulation_numbers: Union[Iterable[int], None] = None
+    ) -> Iterator[GameStats]:
+        """
+        Lazily play the games and yield the stats of each one as soon as it
+        finishes. Nothing is played ahead of the consumer and nothing is
+        retained, so the consumer may stop at any point. (Construct the game
+        with retain_game_stats=False to keep memory independent of the
+        number of simulations.)
+        """
+        if simulation_numbers is None:
+            simulation_numbers = range(1, self.number_of_simulations + 1)
+        for simulation_number in simulation_numbers:
+            game_stat = self.play_game(simulation_number)
+            if game_stat is not None:
+                yield game_stat
+
     def run_simulations(self, print_progress=False):
         isSuccess: bool = False
         winner: Player = None
@@ -305,82 +488,5 @@ class Game:
             self.reset_player_state()
 
     def calculate_simultation_statistics(self):
-        self.sim_stats.number_of_simulations = len(self.game_stats)
-
-        sum_number_of_win_rolls = 0
-        sum_distance_climbed = 0
-        sum_distance_slid = 0
-        sum_unlucky_rolls = 0
-        sum_lucky_rolls = 0
-
-        for game_stat in self.game_stats:
-            self.sim_stats.min_number_of_win_rolls = min(
-                game_stat.game_number_of_rolls_to_win,
-                self.sim_stats.min_number_of_win_rolls,
-            )
-            self.sim_stats.max_number_of_win_rolls = max(
-                game_stat.game_number_of_rolls_to_win,
-                self.sim_stats.max_number_of_win_rolls,
-            )
-            sum_number_of_win_rolls += game_stat.game_number_of_rolls_to_win
-
-            self.sim_stats.min_distance_climbed = min(
-                game_stat.game_min_distance_climbed, self.sim_stats.min_distance_climbed
-            )
-            self.sim_stats.max_distance_climbed = max(
-                game_stat.game_max_distance_climbed,
-                self.sim_stats.max_distance_climbed,
-            )
-            sum_distance_climbed += game_stat.game_total_distance_climbed
-
-            self.sim_stats.min_distance_slid = min(
-                game_stat.game_min_distance_slide, self.sim_stats.min_distance_slid
-            )
-            self.sim_stats.max_distance_slid = max(
-                game_stat.game_max_distance_slide, self.sim_stats.max_distance_slid
-            )
-            sum_distance_slid += game_stat.game_total_distance_slid
-
-            self.sim_stats.biggest_climb_in_a_streak = max(
-                game_stat.biggest_climb_in_a_streak,
-                self.sim_stats.biggest_climb_in_a_streak,
-            )
-            self.sim_stats.biggest_slide_in_a_streak = max(
-                game_stat.biggest_slide_in_a_streak,
-                self.sim_stats.biggest_slide_in_a_streak,
-            )
-
-            self.sim_stats.min_unlucky_rolls = min(
-                game_stat.game_total_unlucky_rolls, self.sim_stats.min_unlucky_rolls
-            )
-            self.sim_stats.max_unlucky_rolls = max(
-                game_stat.game_total_unlucky_rolls, self.sim_stats.max_unlucky_rolls
-            )
-            sum_unlucky_rolls += game_stat.game_total_unlucky_rolls
-
-            self.sim_stats.min_lucky_rolls = min(
-                game_stat.game_total_lucky_rolls, self.sim_stats.min_lucky_rolls
-            )
-            self.sim_stats.max_lucky_rolls = max(
-                game_stat.game_total_lucky_rolls, self.sim_stats.max_lucky_rolls
-            )
-            sum_lucky_rolls += game_stat.game_total_lucky_rolls
-
-            if sum(game_stat.game_max_streak) > sum(self.sim_stats.max_streak):
-                self.sim_stats.max_streak = game_stat.game_max_streak
-
-        self.sim_stats.avg_number_of_win_rolls = round(
-            sum_number_of_win_rolls / self.sim_stats.number_of_simulations, 2
-        )
-        self.sim_stats.avg_distance_climbed = round(
-            sum_distance_climbed / self.sim_stats.number_of_simulations, 2
-        )
-        self.sim_stats.avg_distance_slid = round(
-            sum_distance_slid / self.sim_stats.number_of_simulations, 2
-        )
-        self.sim_stats.avg_unlucky_rolls = round(
-            sum_unlucky_rolls / self.sim_stats.number_of_simulations, 2
-        )
-        self.sim_stats.avg_lucky_rolls = round(
-            sum_lucky_rolls / self.sim_stats.number_of_simulations, 2
-        )
+        # Reduced column by column; see GameStatsColumns
+        self.sim_stats = self.game_stats.to_simulation_stats()
@@ -0,0 +1,149 @@
+import sys
+from typing import Dict, List
+import pprint
+
+from .game_stats import GameStats
+from .simulation_stats import SimulationStats
+
+
+class StatsAccumulator:
+    """
+    Mergeable summary of any number of games: counts, sums, extrema,
+    histograms and the longest streak. Summaries built over different
+    slices of the simulations merge into the same SimulationStats as one
+    run over all of them. Games cut short at the roll cap are only counted.
+    """
+
+    # Per game integer stats, as named in GameStats
+    FIELDS = (
+        "game_number_of_rolls_to_win",
+        "game_total_lucky_rolls",
+        "game_total_unlucky_rolls",
+        "game_min_distance_slide",
+        "game_max_distance_slide",
+        "game_total_distance_slid",
+        "biggest_slide_in_a_streak",
+        "game_min_distance_climbed",
+        "game_max_distance_climbed",
+        "game_total_distance_climbed",
+        "biggest_climb_in_a_streak",
+    )
+
+    def __init__(self):
+        # Games played to a win; those cut short are counted aside
+        self.number_of_games: int = 0
+        self.number_of_truncated_games: int = 0
+        self.sums: Dict[str, int] = {field: 0 for field in self.FIELDS}
+        self.mins: Dict[str, int] = {field: sys.maxsize for field in self.FIELDS}
+        self.maxs: Dict[str, int] = {field: 0 for field in self.FIELDS}
+        self.histograms: Dict[str, Dict[int, int]] = {
+            field: {} for field in self.FIELDS
+        }
+        self.max_streak: List[int] = []
+
+    def add(self, game_stat: GameStats) -> None:
+        if game_stat.truncated:
+            self.number_of_truncated_games += 1
+            return
+        self.number_of_games += 1
+        for field in self.FIELDS:
+            value = getattr(game_stat, field)
+            self.sums[field] += value
+            if value < self.mins[field]:
+                self.mins[field] = value
+            if value > self.maxs[field]:
+                self.maxs[field] = value
+            histogram = self.histograms[field]
+            histogram[value] = histogram.get(value, 0) + 1
+
+        if sum(game_stat.game_max_streak) > sum(self.max_streak):
+            self.max_streak = game_stat.game_max_streak
+
+    def merge(self, other: "StatsAccumulator") -> None:
+        self.number_of_games += other.number_of_games
+        self.number_of_truncated_games += other.number_of_truncated_games
+        for field in self.FIELDS:
+            self.sums[field] += other.sums[field]
+            self.mins[field] = min(self.mins[field], other.mins[field])
+            self.maxs[field] = max(self.maxs[field], other.maxs[field])
+            histogram = self.histograms[field]
+            for value, count in other.histograms[field].items():
+                histogram[value] = histogram.get(value, 0) + count
+
+        if sum(other.max_streak) > sum(self.max_streak):
+            self.max_streak = other.max_streak
+
+    def to_simulation_stats(self) -> SimulationStats:
+        sim_stats = SimulationStats()
+        sim_stats.number_of_simulations = (
+            self.number_of_games + self.number_of_truncated_games
+        )
+        sim_stats.number_of_truncated_games = self.number_of_truncated_games
+        if self.number_of_games == 0:
+            return sim_stats
+
+        def avg(field):
+            return round(self.sums[field] / self.number_of_games, 2)
+
+        # rolls
+        sim_stats.min_number_of_win_rolls = self.mins["game_number_of_rolls_to_win"]
+        sim_stats.avg_number_of_win_rolls = avg("game_number_of_rolls_to_win")
+        sim_stats.max_number_of_win_rolls = self.maxs["game_number_of_rolls_to_win"]
+        sim_stats.min_unlucky_rolls = self.mins["game_total_unlucky_rolls"]
+        sim_stats.avg_unlucky_rolls = avg("game_total_unlucky_rolls")
+        sim_stats.max_unlucky_rolls = self.maxs["game_total_unlucky_rolls"]
+        sim_stats.min_lucky_rolls = self.mins["game_total_lucky_rolls"]
+        sim_stats.avg_lucky_rolls = avg("game_total_lucky_rolls")
+        sim_stats.max_lucky_rolls = self.maxs["game_total_lucky_rolls"]
+
+        # distance climbed
+        sim_stats.min_distance_climbed = self.mins["game_min_distance_climbed"]
+        sim_stats.avg_distance_climbed = avg("game_total_distance_climbed")
+        sim_stats.max_distance_climbed = self.maxs["game_max_distance_climbed"]
+        sim_stats.biggest_climb_in_a_streak = self.maxs["biggest_climb_in_a_streak"]
+
+        # distance slid
+        sim_stats.min_distance_slid = self.mins["game_min_distance_slide"]
+        sim_stats.avg_distance_slid = avg("game_total_distance_slid")
+        sim_stats.max_distance_slid = self.maxs["game_max_distance_slide"]
+        sim_stats.biggest_slide_in_a_streak = self.maxs["biggest_slide_in_a_streak"]
+
+        # streak
+        if sum(self.max_streak) > sum(sim_stats.max_streak):
+            sim_stats.max_streak = self.max_streak
+
+        return sim_stats
+
+    def to_dict(self) -> dict:
+        return {
+            "number_of_games": self.number_of_games,
+            "number_of_truncated_games": self.number_of_truncated_games,
+            "sums": self.sums,
+            "mins": self.mins,
+            "maxs": self.maxs,
+            # JSON object keys are strings; keep the histograms as value/count pairs
+            "histograms": {
+                field: sorted(histogram.items())
+                for field, histogram in self.histograms.items()
+            },
+            "max_streak": self.max_streak,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "StatsAccumulator":
+        accumulator = cls()
+        accumulator.number_of_games = data["number_of_games"]
+        # Not in partial results of older versions
+        accumulator.number_of_truncated_games = data.get("number_of_truncated_games", 0)
+        for field in cls.FIELDS:
+            accumulator.sums[field] = data["sums"][field]
+            accumulator.mins[field] = data["mins"][field]
+            accumulator.maxs[field] = data["maxs"][field]
+            accumulator.histograms[field] = {
+                value: count for value, count in data["histograms"][field]
+            }
+        accumulator.max_streak = list(data["max_streak"])
+        return accumulator
+
+    def __repr__(self):  # pragma: no coverage
+        return pprint.pformat(self.to_dict())
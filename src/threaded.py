@@ -0,0 +1,78 @@
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Union
+
+from .board import CompiledBoard
+from .die import SeededDie
+from .constants import Constants as Const
+from .engines import make_engine
+from .metrics import RunMetrics, moves_played
+from .shard import Shard
+from .snake_ladder_simulation import Game
+from .stats_accumulator import StatsAccumulator
+
+
+def gil_enabled() -> bool:
+    # Free-threaded CPython builds (3.13t and later) can run without the GIL
+    is_gil_enabled = getattr(sys, "_is_gil_enabled", None)
+    return is_gil_enabled() if is_gil_enabled else True
+
+
+def run_threaded(
+    game: Game,
+    seed: int,
+    number_of_threads: int,
+    engine_name: str = "fast",
+    metrics: Union[RunMetrics, None] = None,
+) -> StatsAccumulator:
+    """
+    Play the game's simulations on a pool of threads within this process.
+    Every thread plays a contiguous slice of the simulations on an engine
+    of its own, all of them off one shared, read-only compiled board, with
+    a die of its own and into a StatsAccumulator of its own; these merge at
+    the end. Each game's rolls depend only on the seed and its simulation
+    number, so the result is that of a single-threaded run with the seed,
+    however many threads play it.
+
+    The engines are pure Python: under the GIL the threads take turns, and
+    the run only scales across cores on a free-threaded build.
+
+    Given metrics, every thread records its games to them a batch at a
+    time, as the worker of its shard.
+    """
+    board = CompiledBoard.from_game(game)
+
+    def play(shard: Shard) -> StatsAccumulator:
+        # Only the metrics read the moves played
+        counted = metrics is not None
+        playing = game.clone(SeededDie(seed))
+        engine = make_engine(engine_name, playing, board, count_moves=counted)
+        accumulator = StatsAccumulator()
+        simulation_numbers = shard.simulation_numbers(game.number_of_simulations)
+        if metrics is None:
+            for game_stat in engine.iter_games(simulation_numbers):
+                accumulator.add(game_stat)
+            return accumulator
+        for first in range(0, len(simulation_numbers), Const.METRICS_BATCH_GAMES):
+            start = time.perf_counter()
+            batch = list(
+                engine.iter_games(
+                    simulation_numbers[first : first + Const.METRICS_BATCH_GAMES]
+                )
+            )
+            for game_stat in batch:
+                accumulator.add(game_stat)
+            metrics.record(
+                batch, time.perf_counter() - start, shard.index - 1, moves_played(engine)
+            )
+        return accumulator
+
+    shards = [Shard(index, number_of_threads) for index in range(1, number_of_threads + 1)]
+    with ThreadPoolExecutor(max_workers=number_of_threads) as executor:
+        accumulators: List[StatsAccumulator] = list(executor.map(play, shards))
+
+    accumulator = StatsAccumulator()
+    for other in accumulators:
+        accumulator.merge(other)
+    return accumulator
@@ -0,0 +1,303 @@
+import sys
+from array import array
+from random import Random
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple, Union
+
+from .constants import Constants as Const
+from .board import CompiledBoard
+from .die import Die
+from .fast_engine import FastGame
+from .game_stats import GameStats
+from .snake_ladder_simulation import Game
+from .stats_accumulator import StatsAccumulator
+
+
+class TrajectoryPool:
+    """
+    Single-player games (trajectories), each recorded turn by turn: after
+    every turn, the player's running stats as a Game player would hold
+    them. Players do not interact, so a game of P players is P
+    trajectories interleaved by turn, and any prefix of a trajectory is
+    the stats of a player who has played that many turns.
+
+    Trajectory n (1-based) is played with the die started for game n, so a
+    seeded die plays the same trajectory whatever the pool's size. A
+    trajectory is cut short after the turn on which its own rolls reach the
+    roll cap, unfinished.
+    """
+
+    # Per turn running stats; the minimum slide and climb are kept as 0
+    # until there is one (no slide or climb is 0 long), as GameStatsColumns
+    # does
+    FIELDS = (
+        "number_of_rolls",
+        "number_of_lucky_rolls",
+        "number_of_unlucky_rolls",
+        "min_distance_slid",
+        "max_distance_slid",
+        "total_distance_slid",
+        "biggest_slide_in_a_streak",
+        "min_distance_climbed",
+        "max_distance_climbed",
+        "total_distance_climbed",
+        "biggest_climb_in_a_streak",
+        "max_streak_sum",
+    )
+    NO_MINIMUM = 0
+    # A single slide or climb is shorter than the board
+    BYTE_FIELDS = (
+        "min_distance_slid",
+        "max_distance_slid",
+        "min_distance_climbed",
+        "max_distance_climbed",
+    )
+
+    def __init__(
+        self,
+        board: CompiledBoard,
+        die: Die,
+        number_of_trajectories: int,
+        roll_cap: int = Const.GAME_ROLL_CAP,
+    ):
+        self.board: CompiledBoard = board
+        self.roll_cap: int = roll_cap
+        self.repeat_roll: int = board.rules.repeat_roll or 0
+        self.columns: Dict[str, array] = {
+            field: array("B" if field in self.BYTE_FIELDS else "i")
+            for field in self.FIELDS
+        }
+        # The longest streak so far: so many repeat rolls, then the last roll
+        self.max_streak_repeats = array("H")
+        self.max_streak_last = array("B")
+        # Trajectory n's turns are rows offsets[n - 1] to offsets[n] - 1
+        self.offsets = array("q", [0])
+        # 1 for the trajectories that reach the goal, 0 for those cut short
+        self.finished = array("B")
+
+        # Trajectory n is game n of a single player, every turn recorded
+        record_turn = self._turn_recorder()
+        engine = FastGame(
+            board, die, 1, number_of_trajectories, roll_cap=roll_cap, count_moves=False
+        )
+        engine.turn_recorder = record_turn
+        for trajectory in range(1, number_of_trajectories + 1):
+            game_stat = engine.play_game(trajectory)
+            if game_stat.truncated:
+                self.finished.append(0)
+            else:
+                # The winning turn, as Game leaves the winner's stats (a
+                # streak cut short by the win does not count)
+                record_turn(
+                    game_stat.game_number_of_rolls_to_win,
+                    game_stat.game_total_lucky_rolls,
+                    game_stat.game_total_unlucky_rolls,
+                    game_stat.game_min_distance_slide,
+                    game_stat.game_max_distance_slide,
+                    game_stat.game_total_distance_slid,
+                    game_stat.biggest_slide_in_a_streak,
+                    game_stat.game_min_distance_climbed,
+                    game_stat.game_max_distance_climbed,
+                    game_stat.game_total_distance_climbed,
+                    game_stat.biggest_climb_in_a_streak,
+                    engine.max_streak_sum[0],
+                    engine.max_streak_repeats[0],
+                    engine.max_streak_last[0],
+                )
+                self.finished.append(1)
+            self.offsets.append(len(self.max_streak_last))
+
+    def _turn_recorder(self) -> Callable[..., None]:
+        # FastGame's turn recorder, for its single player: a row of the
+        # columns per turn
+        (
+            record_rolls,
+            record_lucky,
+            record_unlucky,
+            record_min_slid,
+            record_max_slid,
+            record_total_slid,
+            record_biggest_slide,
+            record_min_climbed,
+            record_max_climbed,
+            record_total_climbed,
+            record_biggest_climb,
+            record_streak_sum,
+        ) = [column.append for column in self.columns.values()]
+        record_streak_repeats = self.max_streak_repeats.append
+        record_streak_last = self.max_streak_last.append
+        NONE = sys.maxsize
+        NO_MINIMUM = self.NO_MINIMUM
+
+        def record_turn(
+            rolls: int,
+            lucky: int,
+            unlucky: int,
+            min_slid: int,
+            max_slid: int,
+            total_slid: int,
+            biggest_slide: int,
+            min_climbed: int,
+            max_climbed: int,
+            total_climbed: int,
+            biggest_climb: int,
+            max_streak_sum: int,
+            max_streak_repeats: int,
+            max_streak_last: int,
+        ) -> None:
+            record_rolls(rolls)
+            record_lucky(lucky)
+            record_unlucky(unlucky)
+            record_min_slid(NO_MINIMUM if min_slid == NONE else min_slid)
+            record_max_slid(max_slid)
+            record_total_slid(total_slid)
+            record_biggest_slide(biggest_slide)
+            record_min_climbed(NO_MINIMUM if min_climbed == NONE else min_climbed)
+            record_max_climbed(max_climbed)
+            record_total_climbed(total_climbed)
+            record_biggest_climb(biggest_climb)
+            record_streak_sum(max_streak_sum)
+            record_streak_repeats(max_streak_repeats)
+            record_streak_last(max_streak_last)
+
+        return record_turn
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def turns(self, trajectory: int) -> int:
+        return self.offsets[trajectory] - self.offsets[trajectory - 1]
+
+    def nbytes(self) -> int:
+        columns = [
+            *self.columns.values(),
+            self.max_streak_repeats,
+            self.max_streak_last,
+            self.offsets,
+            self.finished,
+        ]
+        return sum(column.itemsize * len(column) for column in columns)
+
+
+def compose_game(seats: Sequence[Tuple[TrajectoryPool, int]]) -> GameStats:
+    """
+    The stats of the game whose seats (in turn order) play the given
+    trajectories: the first seat to finish in the fewest turns wins; the
+    seats before it have played as many turns, the seats after it one less.
+    The game is cut short if no seat finishes, or a seat's trajectory was
+    cut short before the game is won.
+    """
+    turns = [pool.turns(trajectory) for pool, trajectory in seats]
+    finishing_turns = [
+        turns[seat] if pool.finished[trajectory - 1] else sys.maxsize
+        for seat, (pool, trajectory) in enumerate(seats)
+    ]
+    winning_turns = min(finishing_turns)
+    winner = finishing_turns.index(winning_turns)
+
+    game_stat = GameStats()
+    if winning_turns == sys.maxsize:
+        game_stat.truncated = True
+        return game_stat
+    best_streak = (0, 0, 0)
+    for seat, (pool, trajectory) in enumerate(seats):
+        turns_played = winning_turns if seat <= winner else winning_turns - 1
+        if turns_played > turns[seat]:
+            truncated = GameStats()
+            truncated.truncated = True
+            return truncated
+        if turns_played == 0:
+            continue
+        row = pool.offsets[trajectory - 1] + turns_played - 1
+        columns = pool.columns
+
+        if seat == winner:
+            game_stat.game_number_of_rolls_to_win = columns["number_of_rolls"][row]
+        game_stat.game_total_lucky_rolls += columns["number_of_lucky_rolls"][row]
+        game_stat.game_total_unlucky_rolls += columns["number_of_unlucky_rolls"][row]
+
+        min_slid = columns["min_distance_slid"][row]
+        if min_slid != TrajectoryPool.NO_MINIMUM:
+            game_stat.game_min_distance_slide = min(
+                min_slid, game_stat.game_min_distance_slide
+            )
+        game_stat.game_max_distance_slide = max(
+            columns["max_distance_slid"][row], game_stat.game_max_distance_slide
+        )
+        game_stat.game_total_distance_slid += columns["total_distance_slid"][row]
+        game_stat.biggest_slide_in_a_streak = max(
+            columns["biggest_slide_in_a_streak"][row],
+            game_stat.biggest_slide_in_a_streak,
+        )
+
+        min_climbed = columns["min_distance_climbed"][row]
+        if min_climbed != TrajectoryPool.NO_MINIMUM:
+            game_stat.game_min_distance_climbed = min(
+                min_climbed, game_stat.game_min_distance_climbed
+            )
+        game_stat.game_max_distance_climbed = max(
+            columns["max_distance_climbed"][row], game_stat.game_max_distance_climbed
+        )
+        game_stat.game_total_distance_climbed += columns["total_distance_climbed"][row]
+        game_stat.biggest_climb_in_a_streak = max(
+            columns["biggest_climb_in_a_streak"][row],
+            game_stat.biggest_climb_in_a_streak,
+        )
+
+        # The first seat (in turn order) holding the longest streak
+        streak_sum = columns["max_streak_sum"][row]
+        if streak_sum > best_streak[0]:
+            best_streak = (
+                streak_sum,
+                pool.max_streak_repeats[row],
+                pool.max_streak_last[row],
+            )
+            game_stat.game_max_streak = [pool.repeat_roll] * best_streak[1] + [
+                best_streak[2]
+            ]
+    return game_stat
+
+
+def run_player_counts(
+    game: Game,
+    player_counts: Iterable[int],
+    number_of_trajectories: Union[int, None] = None,
+    seed: int = 0,
+) -> Dict[int, StatsAccumulator]:
+    """
+    The game's simulations for each number of players, all composed from
+    one pool of single-player trajectories per die (the shared die, and
+    each seat's own die) instead of a run per number of players. Every
+    game seats distinct trajectories drawn at random (seeded) from the
+    pool, of Const.TRAJECTORY_POOL_MAX trajectories at most by default;
+    a trajectory plays in many games, so the games of a pool smaller than
+    their number of seats are not all independent. The game's roll cap
+    applies to each trajectory's own rolls, not to the composed games'.
+    """
+    player_counts = sorted(set(player_counts))
+    number_of_trajectories = number_of_trajectories or max(
+        min(game.number_of_simulations, Const.TRAJECTORY_POOL_MAX), player_counts[-1]
+    )
+    board = CompiledBoard.from_game(game)
+    shared_pool = TrajectoryPool(
+        board, game.die, number_of_trajectories, game.roll_cap
+    )
+    pools: List[TrajectoryPool] = [
+        TrajectoryPool(
+            board, game.seat_dice[seat], number_of_trajectories, game.roll_cap
+        )
+        if seat in game.seat_dice
+        else shared_pool
+        for seat in range(player_counts[-1])
+    ]
+
+    accumulators: Dict[int, StatsAccumulator] = {}
+    for number_of_players in player_counts:
+        rng = Random(f"{seed}:{number_of_players}")
+        accumulator = StatsAccumulator()
+        for _ in range(game.number_of_simulations):
+            trajectories = rng.sample(
+                range(1, number_of_trajectories + 1), number_of_players
+            )
+            accumulator.add(compose_game(list(zip(pools, trajectories))))
+        accumulators[number_of_players] = accumulator
+    return accumulators
@@ -0,0 +1,65 @@
+from typing import Dict, List, Tuple, Union
+
+from src.constants import Constants as Const
+from src.artefact import Snake, Ladder
+from src.die import AliasDie, Die, SeededDie
+from src.game_stats import GameStats
+from src.game_stats_columns import GameStatsColumns
+from src.player import Player
+from src.rules import RuleSet
+from src.snake_ladder_simulation import Game
+
+# The board the tests play on unless they need another: snakes and ladders
+# that chain (the ladder up to 25 and the snake down from 27)
+BOARD = [
+    Snake(head=27, tail=5),
+    Snake(head=40, tail=3),
+    Snake(head=89, tail=53),
+    Ladder(bottom=4, top=25),
+    Ladder(bottom=33, top=49),
+    Ladder(bottom=74, top=92),
+]
+# And a snake from the last position before the winning one, taken on a
+# bounce back: longer games, for the engines to agree on
+BOUNCE_BOARD = BOARD + [Snake(head=99, tail=41)]
+
+
+def make_game(
+    die: Union[Die, None] = None,
+    number_of_players: int = 2,
+    number_of_simulations: int = 1,
+    artefacts=BOARD,
+    rule_names=(),
+    roll_cap: int = Const.GAME_ROLL_CAP,
+    retain_game_stats: bool = True,
+    seat_dice: Union[Dict[int, Dict[int, float]], None] = None,
+) -> Game:
+    """
+    A game of players P1, P2, ... on the board (BOARD unless given), rolling
+    the die (SeededDie(0) unless given), and the seats given their own die:
+    an AliasDie of the distribution, seeded alike
+    """
+    die = die or SeededDie(0)
+    game = Game(
+        die,
+        number_of_simulations,
+        retain_game_stats=retain_game_stats,
+        rules=RuleSet(rule_names),
+        roll_cap=roll_cap,
+    )
+    game.add_players([Player(f"P{n}") for n in range(1, number_of_players + 1)])
+    game.add_artefacts(artefacts)
+    for seat, distribution in (seat_dice or {}).items():
+        game.set_seat_die(
+            seat, AliasDie(distribution, getattr(die, "seed", None), seat + 1)
+        )
+    return game
+
+
+def played(game: Game) -> Tuple[List[GameStats], GameStatsColumns]:
+    # Every game of the run, as records and as columns
+    game_stats = list(game.iter_games())
+    columns = GameStatsColumns()
+    for game_stat in game_stats:
+        columns.append(game_stat)
+    return game_stats, columns
@@ -7,3 +7,6 @@ class Mock_Die:
         n = self.rolls[self.ndx]
         self.ndx = (self.ndx + 1) % len(self.rolls)
         return n
+
+    def start_game(self, simulation_number):
+        pass
@@ -0,0 +1,66 @@
+import pytest
+from src.die import SeededDie
+from src.rules import RuleSet
+from src.board import CompiledBoard
+from src.analytic import FirstPassage, MultiPlayerAnalysis, analyse_game
+from .conftest import make_game
+
+
+class Test_Analytic:
+    def test_single_face_die(self):
+        # Always rolling 5 on a bare board takes exactly 20 rolls, 20 turns
+        board = CompiledBoard({}, set())
+        first_passage = FirstPassage(board, {5: 1.0})
+        assert first_passage.expected_turns() == 20
+        assert first_passage.expected_rolls() == 20
+
+        analysis = MultiPlayerAnalysis([first_passage] * 3)
+        assert analysis.win_by_seat == [1.0, 0.0, 0.0]
+        assert analysis.rolls_to_win == {20: 1.0}
+        assert analysis.first_mover_advantage() == pytest.approx(2 / 3)
+
+    def test_repeat_rolls_within_a_turn(self):
+        # Every 6 rolls again in the same turn
+        board = CompiledBoard({}, set())
+        first_passage = FirstPassage(board, {4: 0.5, 6: 0.5})
+        first_passage.joint(len(first_passage.by_turn))
+        for turn, p in enumerate(first_passage.by_turn):
+            assert sum(first_passage.by_turn_and_rolls[turn].values()) == pytest.approx(p)
+        assert first_passage.expected_rolls() == pytest.approx(
+            sum(
+                rolls * p
+                for by_rolls in first_passage.by_turn_and_rolls
+                for rolls, p in by_rolls.items()
+            )
+        )
+
+    @pytest.mark.parametrize("number_of_players", [1, 2, 4])
+    def test_distributions_add_up(self, number_of_players):
+        analysis = analyse_game(make_game(number_of_players=number_of_players))
+        assert sum(analysis.win_by_seat) == pytest.approx(1, abs=1e-9)
+        assert sum(analysis.rolls_to_win.values()) == pytest.approx(1, abs=1e-9)
+        # Moving first is an advantage, and so on down the seats
+        assert analysis.win_by_seat == sorted(analysis.win_by_seat, reverse=True)
+        assert analysis.rolls_to_win_quantile(0.5) <= analysis.rolls_to_win_quantile(0.9)
+
+    @pytest.mark.parametrize(
+        "rule_names",
+        [[], [RuleSet.THREE_SIXES_FORFEIT, RuleSet.EXACT_ROLL_TO_WIN]],
+    )
+    def test_matches_simulation(self, rule_names):
+        number_of_simulations = 4000
+        game = make_game(SeededDie(7), 3, number_of_simulations, rule_names=rule_names)
+        wins = [0, 0, 0]
+        total_rolls = 0
+        for simulation_number in range(1, number_of_simulations + 1):
+            _, winner = game.play(simulation_number)
+            wins[game.players.index(winner)] += 1
+            total_rolls += winner.number_of_rolls
+            game.reset_player_state()
+
+        analysis = analyse_game(game)
+        for seat, p in enumerate(analysis.win_by_seat):
+            assert wins[seat] / number_of_simulations == pytest.approx(p, abs=0.025)
+        assert total_rolls / number_of_simulations == pytest.approx(
+            analysis.expected_rolls_to_win(), rel=0.03
+        )
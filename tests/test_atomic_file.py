@@ -0,0 +1,31 @@
+import pytest
+from src.atomic_file import AtomicFile
+
+
+class Test_AtomicFile:
+    def test_moved_into_place(self, tmp_path):
+        path = tmp_path / "result.json"
+        path.write_text("old")
+        with AtomicFile(str(path)) as atomic:
+            atomic.write("new")
+            # Until committed, readers see the old file
+            assert path.read_text() == "old"
+        assert path.read_text() == "new"
+        assert [p.name for p in tmp_path.iterdir()] == ["result.json"]
+
+    def test_nothing_left_on_error(self, tmp_path):
+        path = tmp_path / "result.json"
+        with pytest.raises(ValueError):
+            with AtomicFile(str(path), "wb") as atomic:
+                atomic.write(b"half")
+                raise ValueError("failed")
+        assert list(tmp_path.iterdir()) == []
+
+    def test_discard(self, tmp_path):
+        path = tmp_path / "result.json"
+        path.write_text("old")
+        atomic = AtomicFile(str(path))
+        atomic.file.write("new")
+        atomic.discard()
+        assert path.read_text() == "old"
+        assert [p.name for p in tmp_path.iterdir()] == ["result.json"]
@@ -0,0 +1,84 @@
+import pytest
+from src.artefact import Snake, Ladder
+from src.rules import RuleSet
+from src.board import CompiledBoard
+from src.board_generator import BoardGenerator
+from src.analytic import FirstPassage, MultiPlayerAnalysis
+from src.batch_analytic import BATCH_QUANTILES, evaluate_boards
+from .conftest import BOARD, make_game
+
+
+def make_board(rule_names=(), artefacts=BOARD):
+    game = make_game(number_of_players=1, artefacts=artefacts, rule_names=rule_names)
+    return CompiledBoard.from_game(game)
+
+
+def random_boards(number_of_boards, seed=1):
+    boards = []
+    for snakes, ladders in BoardGenerator(8, 8, seed=seed).boards(number_of_boards):
+        artefacts = [Snake(head=head, tail=tail) for head, tail in snakes]
+        artefacts += [Ladder(bottom=bottom, top=top) for bottom, top in ladders]
+        boards.append(make_board(artefacts=artefacts))
+    return boards
+
+
+def assert_matches_analysis(evaluation, board, face_probabilities=None):
+    analysis = MultiPlayerAnalysis([FirstPassage(board, face_probabilities)])
+    assert evaluation.expected_rolls == pytest.approx(
+        analysis.expected_rolls_to_win(), rel=1e-9
+    )
+    assert evaluation.quantiles == {
+        q: analysis.rolls_to_win_quantile(q) for q in BATCH_QUANTILES
+    }
+    assert evaluation.residual == 0
+
+
+class Test_BatchAnalytic:
+    def test_single_face_die(self):
+        # Always rolling 5 on a bare board takes exactly 20 rolls
+        (evaluation,) = evaluate_boards([CompiledBoard({}, set())], {5: 1.0})
+        assert evaluation.expected_rolls == 20
+        assert evaluation.quantiles == {0.5: 20, 0.9: 20, 0.99: 20}
+        assert evaluation.rolls == 20
+
+    @pytest.mark.parametrize(
+        "rule_names",
+        [
+            [],
+            [RuleSet.EXACT_ROLL_TO_WIN],
+            [RuleSet.THREE_SIXES_FORFEIT],
+            [RuleSet.THREE_SIXES_FORFEIT, RuleSet.EXACT_ROLL_TO_WIN],
+        ],
+    )
+    def test_matches_first_passage(self, rule_names):
+        board = make_board(rule_names)
+        (evaluation,) = evaluate_boards([board])
+        assert_matches_analysis(evaluation, board)
+
+    def test_loaded_die(self):
+        face_probabilities = {1: 0.1, 2: 0.1, 3: 0.1, 4: 0.1, 5: 0.1, 6: 0.5}
+        board = make_board([RuleSet.THREE_SIXES_FORFEIT])
+        (evaluation,) = evaluate_boards([board], face_probabilities)
+        assert_matches_analysis(evaluation, board, face_probabilities)
+
+    def test_many_boards_in_one_call(self):
+        boards = random_boards(12) + [make_board([RuleSet.THREE_SIXES_FORFEIT])]
+        evaluations = evaluate_boards(boards)
+        assert len(evaluations) == len(boards)
+        for evaluation, board in zip(evaluations, boards):
+            # Whatever the boards stacked with it
+            (alone,) = evaluate_boards([board])
+            assert evaluation.to_dict() == alone.to_dict()
+        for evaluation, board in list(zip(evaluations, boards))[:4]:
+            assert_matches_analysis(evaluation, board)
+
+    def test_horizon(self):
+        board = make_board()
+        (evaluation,) = evaluate_boards([board], max_rolls=40)
+        assert evaluation.rolls == 40
+        assert evaluation.quantiles[0.99] is None
+        assert 0 < evaluation.residual < 1
+        assert evaluation.quantiles[0.5] == evaluate_boards([board])[0].quantiles[0.5]
+
+    def test_no_boards(self):
+        assert evaluate_boards([]) == []
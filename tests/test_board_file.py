@@ -0,0 +1,112 @@
+import pytest
+from src.board import CompiledBoard
+from src.board_file import (
+    BOARD_FILE_HEADER,
+    BOARD_FILE_TABLES,
+    BoardFile,
+    open_board_file,
+    write_board_file,
+)
+from src.die import SeededDie
+from src.fast_engine import FastGame
+from src.preflight import preflight
+from src.simulator import SimulationConfig, Simulator
+from src.game_exceptions import EXCEPTION_BOARD_INVALID, EXCEPTION_CONFIG_SYNTAX
+
+CONF_TEXT = """
+NUMBER_OF_SIMULATIONS=200
+NUMBER_OF_PLAYERS=3
+SNAKE=27,5
+SNAKE=40,3
+SNAKE=89,53
+LADDER=4,25
+LADDER=33,49
+LADDER=74,92
+RULE=three_sixes_forfeit
+RULE=exact_roll_to_win
+DIE_PLAYER_2=1:1,6:2
+"""
+
+
+@pytest.fixture
+def board_path(tmp_path):
+    game = SimulationConfig.from_string(CONF_TEXT).make_game()
+    path = str(tmp_path / "game.board")
+    write_board_file(path, CompiledBoard.from_game(game))
+    return path
+
+
+def config_with_board_file(path):
+    config = SimulationConfig.from_string(CONF_TEXT)
+    config.snakes, config.ladders, config.rules = [], [], []
+    config.board_file = path
+    return config
+
+
+class Test_BoardFile:
+    def test_round_trip(self, board_path):
+        game = SimulationConfig.from_string(CONF_TEXT).make_game()
+        compiled = CompiledBoard.from_game(game)
+        with BoardFile(board_path) as board_file:
+            board = board_file.board
+            assert board.rules.names == game.rules.names
+            assert board.max_roll == compiled.max_roll
+            assert board.lucky_positions == game.lucky_positions
+            assert board_file.snakes == [(27, 5), (40, 3), (89, 53)]
+            assert board_file.ladders == [(4, 25), (33, 49), (74, 92)]
+            for tables, mapped in (
+                (compiled.tables, board.tables),
+                (compiled.forfeit_tables, board.forfeit_tables),
+            ):
+                for name in BOARD_FILE_TABLES:
+                    assert list(getattr(mapped, name)) == getattr(tables, name)
+
+    def test_same_games(self, board_path):
+        from_conf = Simulator(SimulationConfig.from_string(CONF_TEXT)).run(seed=4)
+        from_file = Simulator(config_with_board_file(board_path)).run(seed=4)
+        assert from_file.to_dict() == from_conf.to_dict()
+        simulator = Simulator(config_with_board_file(board_path))
+        # Played off the mapped tables, shared by the clones
+        assert simulator.board is open_board_file(board_path).board
+        assert simulator.game.clone(SeededDie(1)).compiled_board is simulator.board
+        assert preflight(simulator.game).expected_rolls > 0
+
+    def test_other_dice_recompile(self, board_path):
+        config = config_with_board_file(board_path)
+        config.dice = {0: "1d8"}
+        game = config.make_game()
+        board = CompiledBoard.from_game(game)
+        assert board.max_roll == 8 and board is not game.compiled_board
+        FastGame.from_game(game).play_game(1)
+
+    def test_compiled_again(self, board_path):
+        board_file = open_board_file(board_path)
+        tables = list(board_file.board.tables.next_position)
+        # A board of other dice and rules, compiled over the same path
+        write_board_file(board_path, CompiledBoard({}, set(), max_roll=4))
+        assert list(board_file.board.tables.next_position) == tables
+        board = open_board_file(board_path).board
+        assert board.max_roll == 4 and not board.activation_points_map
+        assert open_board_file(board_path).board is board
+
+    def test_damaged(self, board_path, tmp_path):
+        with open(board_path, "rb") as board_file:
+            data = bytearray(board_file.read())
+        damaged = str(tmp_path / "damaged.board")
+        data[BOARD_FILE_HEADER.size + 10] ^= 1
+        with open(damaged, "wb") as board_file:
+            board_file.write(data)
+        empty = tmp_path / "empty.board"
+        empty.touch()
+        for path in (damaged, str(empty)):
+            with pytest.raises(ValueError):
+                BoardFile(path)
+        with pytest.raises(EXCEPTION_BOARD_INVALID):
+            config_with_board_file(damaged).make_game()
+
+    def test_config(self, board_path):
+        config = SimulationConfig.from_string(CONF_TEXT + f"BOARD_FILE={board_path}\n")
+        assert config.to_dict()["board_file"] == board_path
+        with pytest.raises(EXCEPTION_CONFIG_SYNTAX):
+            config.check()
+        assert config_with_board_file(board_path).to_dict()["board_file"] == board_path
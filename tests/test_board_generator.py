@@ -0,0 +1,68 @@
+import pytest
+from src import board_generator
+from src.artefact import Snake, Ladder
+from src.die import Die
+from src.player import Player
+from src.snake_ladder_simulation import Game
+from src.game_exceptions import EXCEPTION_SNAKE_LADDER_SIMULATOR
+from src.board_generator import (
+    BoardGenerator,
+    generate_boards,
+    valid_snakes,
+    valid_ladders,
+)
+
+
+def accepted(kind, start, end):
+    try:
+        if kind is Snake:
+            Snake(head=start, tail=end)
+        else:
+            Ladder(bottom=start, top=end)
+    except EXCEPTION_SNAKE_LADDER_SIMULATOR:
+        return False
+    return True
+
+
+class Test_BoardGenerator:
+    @pytest.mark.parametrize(
+        "kind, valid", [(Snake, valid_snakes), (Ladder, valid_ladders)]
+    )
+    def test_candidates_are_every_valid_artefact(self, kind, valid):
+        assert set(valid()) == {
+            (start, end)
+            for start in range(1, 101)
+            for end in range(1, 101)
+            if accepted(kind, start, end)
+        }
+
+    @pytest.mark.parametrize(
+        "number_of_snakes, number_of_ladders", [(7, 7), (0, 12), (25, 5)]
+    )
+    def test_boards_are_valid(self, number_of_snakes, number_of_ladders):
+        generator = BoardGenerator(number_of_snakes, number_of_ladders, seed=1)
+        for snakes, ladders in generator.boards(200):
+            assert len(snakes) == number_of_snakes
+            assert len(ladders) == number_of_ladders
+            game = Game(Die(), 1)
+            game.add_players([Player("P1")])
+            artefacts = [Snake(head=head, tail=tail) for head, tail in snakes] + [
+                Ladder(bottom=bottom, top=top) for bottom, top in ladders
+            ]
+            assert game.add_artefacts(artefacts) == (True, "")
+
+    def test_seeded(self):
+        boards = list(BoardGenerator(5, 5, seed=3).boards(20))
+        assert list(BoardGenerator(5, 5, seed=3).boards(20)) == boards
+        assert list(BoardGenerator(5, 5, seed=3, stream=1).boards(20)) != boards
+
+    def test_too_many_artefacts(self):
+        with pytest.raises(ValueError, match="do not fit"):
+            BoardGenerator(50, 50, seed=1).board()
+
+    def test_same_boards_whatever_the_workers(self, monkeypatch):
+        monkeypatch.setattr(board_generator, "BOARD_GENERATOR_BLOCK", 30)
+        boards = list(generate_boards(100, 6, 4, seed=9))
+        assert len(boards) == 100
+        assert boards[:30] == list(BoardGenerator(6, 4, seed=9).boards(30))
+        assert list(generate_boards(100, 6, 4, seed=9, number_of_workers=2)) == boards
@@ -0,0 +1,166 @@
+import sys
+from random import Random
+from statistics import mean, variance
+
+import pytest
+from src.die import SeededDie
+from src.bootstrap import (
+    BOOTSTRAP_STATISTICS,
+    STREAK_SUM,
+    _poisson_sampler,
+    bootstrap_histograms,
+    bootstrap_intervals,
+    joint_histogram,
+    streak_sum_histogram,
+)
+from .conftest import make_game, played
+
+
+def by_statistic(intervals):
+    return {interval.statistic: interval for interval in intervals}
+
+
+class Test_PoissonSampler:
+    @pytest.mark.parametrize("mean_count", [0.3, 4, 10, 250, 10**6])
+    def test_mean_and_variance(self, mean_count):
+        counts = _poisson_sampler(mean_count)(Random(5).random, 20000)
+        assert min(counts) >= 0
+        # Within 5 standard errors
+        assert abs(mean(counts) - mean_count) < 5 * (mean_count / 20000) ** 0.5
+        assert variance(counts) == pytest.approx(mean_count, rel=0.1)
+
+
+class Test_Histograms:
+    def test_streak_sums_of_columns_match_games(self):
+        game_stats, columns = played(make_game(SeededDie(7), 2, 500))
+        expected = streak_sum_histogram(game_stats)
+        assert streak_sum_histogram(columns) == expected
+        assert sum(expected.values()) == len(game_stats)
+        assert max(expected) == sum(columns.to_simulation_stats().max_streak)
+
+    def test_joint_histogram_of_columns_matches_games(self):
+        game_stats, columns = played(make_game(SeededDie(7), 2, 500))
+        fields = ("game_total_lucky_rolls", "game_total_unlucky_rolls")
+        assert joint_histogram(columns, *fields) == joint_histogram(game_stats, *fields)
+
+    def test_streak_sums_only_where_games_are_kept(self):
+        _, columns = played(make_game(SeededDie(7), 2, 500))
+        accumulator = columns.to_accumulator()
+        assert STREAK_SUM not in bootstrap_histograms(accumulator)
+        assert STREAK_SUM in bootstrap_histograms(accumulator, columns)
+
+
+class Test_BootstrapIntervals:
+    def test_estimates_are_the_statistics(self):
+        _, columns = played(make_game(SeededDie(7), 2, 500))
+        sim_stats = columns.to_simulation_stats()
+        histograms = bootstrap_histograms(columns.to_accumulator(), columns)
+        intervals = bootstrap_intervals(histograms, 200, seed=1)
+        assert [interval.statistic for interval in intervals] == list(
+            BOOTSTRAP_STATISTICS
+        )
+        for statistic, interval in by_statistic(intervals).items():
+            if statistic == "max_streak":
+                assert interval.estimate == sum(sim_stats.max_streak)
+            elif statistic.startswith("avg_"):
+                assert round(interval.estimate, 2) == getattr(sim_stats, statistic)
+            else:
+                assert interval.estimate == getattr(sim_stats, statistic)
+            assert interval.low <= interval.high
+            assert interval.replicates == 200
+
+    def test_extremes_stay_within_the_games(self):
+        _, columns = played(make_game(SeededDie(7), 2, 500))
+        histograms = bootstrap_histograms(columns.to_accumulator(), columns)
+        intervals = by_statistic(bootstrap_intervals(histograms, 300, seed=2))
+        for statistic, (name, kind) in BOOTSTRAP_STATISTICS.items():
+            interval = intervals[statistic]
+            if kind == "max":
+                assert interval.high == interval.estimate == max(histograms[name])
+            elif kind == "min":
+                assert interval.low == interval.estimate == min(histograms[name])
+            else:
+                assert interval.low < interval.estimate < interval.high
+            assert interval.low in histograms[name] or kind == "avg"
+
+    def test_average_interval_matches_its_standard_error(self):
+        game_stats, columns = played(make_game(SeededDie(7), 2, 2000))
+        rolls = [game_stat.game_number_of_rolls_to_win for game_stat in game_stats]
+        standard_error = (variance(rolls) / len(rolls)) ** 0.5
+        histograms = bootstrap_histograms(columns.to_accumulator())
+        interval = by_statistic(bootstrap_intervals(histograms, 1000, seed=3))[
+            "avg_number_of_win_rolls"
+        ]
+        assert interval.standard_error == pytest.approx(standard_error, rel=0.15)
+        assert interval.high - interval.low == pytest.approx(
+            2 * 1.96 * standard_error, rel=0.2
+        )
+
+    def test_work_does_not_grow_with_the_games(self):
+        # The histograms of ten million games like these: as many values,
+        # the standard errors a hundred times (root of 10^4) smaller
+        _, columns = played(make_game(SeededDie(7), 2, 1000))
+        histograms = bootstrap_histograms(columns.to_accumulator(), columns)
+        scaled = {
+            name: {value: 10**4 * count for value, count in histogram.items()}
+            for name, histogram in histograms.items()
+        }
+        small = by_statistic(bootstrap_intervals(histograms, 300, seed=4))
+        large = by_statistic(bootstrap_intervals(scaled, 300, seed=4))
+        for statistic in ("avg_number_of_win_rolls", "avg_distance_slid"):
+            assert large[statistic].estimate == pytest.approx(small[statistic].estimate)
+            assert large[statistic].standard_error == pytest.approx(
+                small[statistic].standard_error / 100, rel=0.25
+            )
+        assert large["max_number_of_win_rolls"].low == max(
+            histograms["game_number_of_rolls_to_win"]
+        )
+
+    def test_ratio(self):
+        game_stats, columns = played(make_game(SeededDie(7), 2, 500))
+        histograms = {
+            "lucky_per_unlucky": joint_histogram(
+                columns, "game_total_lucky_rolls", "game_total_unlucky_rolls"
+            )
+        }
+        (interval,) = bootstrap_intervals(
+            histograms,
+            200,
+            seed=5,
+            statistics={"lucky_per_unlucky": ("lucky_per_unlucky", "ratio")},
+        )
+        lucky = sum(game_stat.game_total_lucky_rolls for game_stat in game_stats)
+        unlucky = sum(game_stat.game_total_unlucky_rolls for game_stat in game_stats)
+        assert interval.estimate == pytest.approx(lucky / unlucky)
+        assert interval.low < interval.estimate < interval.high
+
+    def test_games_without_a_climb(self):
+        # Their minimum climb is sys.maxsize, as in the statistics
+        histograms = {"game_min_distance_climbed": {sys.maxsize: 5, 12: 1}}
+        (interval,) = bootstrap_intervals(histograms, 200, seed=6)
+        assert interval.statistic == "min_distance_climbed"
+        assert interval.estimate == 12
+        assert interval.high == sys.maxsize
+
+    def test_seeded_whatever_the_workers(self):
+        _, columns = played(make_game(SeededDie(7), 2, 500))
+        histograms = bootstrap_histograms(columns.to_accumulator(), columns)
+        intervals = [
+            interval.to_dict()
+            for interval in bootstrap_intervals(histograms, 250, seed=7)
+        ]
+        assert [
+            interval.to_dict()
+            for interval in bootstrap_intervals(
+                histograms, 250, seed=7, number_of_workers=2
+            )
+        ] == intervals
+        assert [
+            interval.to_dict()
+            for interval in bootstrap_intervals(histograms, 250, seed=8)
+        ] != intervals
+
+    @pytest.mark.parametrize("replicates, confidence", [(0, 0.95), (100, 1.0)])
+    def test_invalid(self, replicates, confidence):
+        with pytest.raises(ValueError, match="Invalid bootstrap"):
+            bootstrap_intervals({}, replicates, confidence)
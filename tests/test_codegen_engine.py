@@ -0,0 +1,163 @@
+import pytest
+from random import Random
+from src.artefact import Snake, Ladder
+from src.board import CompiledBoard
+from src.die import SeededDie
+from src.rules import RuleSet
+from src.fast_engine import FastGame
+from src.game_stats import GameStats
+from src.codegen_engine import (
+    CODEGEN_FEATURE_STATISTICS,
+    CODEGEN_STATISTICS,
+    CodegenGame,
+    board_hash,
+    generate_source,
+)
+from .conftest import BOARD, BOUNCE_BOARD, make_game
+from .mock_die import Mock_Die
+
+
+RULE_SETS = [
+    (),
+    (RuleSet.THREE_SIXES_FORFEIT,),
+    (RuleSet.NO_EXTRA_TURN,),
+    (RuleSet.EXACT_ROLL_TO_WIN, RuleSet.LADDERS_ON_EXACT_LANDING),
+]
+
+
+def random_rolls(seed, number_of_rolls):
+    rng = Random(seed)
+    return [rng.randint(1, 6) for _ in range(number_of_rolls)]
+
+
+class Test_CodegenGame:
+    @pytest.mark.parametrize(
+        "mock_rolls, artefacts, number_of_players",
+        [
+            ([5], [], 1),
+            ([5, 5, 5, 6, 3] + [4, 6] * 9, [Snake(head=15, tail=1)], 1),
+            ([6, 4, 6, 6, 4, 4, 6, 6, 6, 4, 4, 4], [], 1),
+            ([1, 5], [], 2),
+            ([6, 6, 2, 6, 1, 3], [Ladder(bottom=6, top=100)], 3),
+            (random_rolls(1, 997), BOUNCE_BOARD, 1),
+            (random_rolls(2, 1009), BOUNCE_BOARD, 2),
+        ],
+    )
+    @pytest.mark.parametrize("rule_names", RULE_SETS)
+    def test_same_stats_as_the_reference(
+        self, mock_rolls, artefacts, number_of_players, rule_names
+    ):
+        def game():
+            return make_game(
+                Mock_Die(mock_rolls), number_of_players, 3, artefacts, rule_names
+            )
+
+        reference = game()
+        reference.run_simulations()
+        codegen = CodegenGame.from_game(game())
+
+        for simulation_number, game_stat in enumerate(reference.game_stats, 1):
+            assert codegen.play_game(simulation_number).__dict__ == game_stat.__dict__
+
+    @pytest.mark.parametrize("number_of_players", [1, 2, 5])
+    @pytest.mark.parametrize("rule_names", RULE_SETS)
+    def test_same_games_and_moves_as_the_fast_engine(
+        self, number_of_players, rule_names
+    ):
+        fast = FastGame.from_game(
+            make_game(SeededDie(11), number_of_players, 200, rule_names=rule_names)
+        )
+        codegen = CodegenGame.from_game(
+            make_game(SeededDie(11), number_of_players, 200, rule_names=rule_names)
+        )
+        assert [g.__dict__ for g in codegen.iter_games()] == [
+            g.__dict__ for g in fast.iter_games()
+        ]
+        assert codegen.move_counts == fast.move_counts
+        assert codegen.forfeit_move_counts == fast.forfeit_move_counts
+
+    @pytest.mark.parametrize("number_of_players", [1, 3])
+    def test_same_games_cut_short(self, number_of_players):
+        def capped_game():
+            game = make_game(SeededDie(5), number_of_players, 200)
+            game.roll_cap = 25 * number_of_players
+            return game
+
+        game = capped_game()
+        game.run_simulations()
+        other = capped_game()
+        CodegenGame.from_game(other).run_simulations(other.game_stats)
+        assert [g.__dict__ for g in other.game_stats] == [
+            g.__dict__ for g in game.game_stats
+        ]
+        assert 0 < len(game.game_stats.truncated) < 200
+
+    @pytest.mark.parametrize("feature", list(CODEGEN_FEATURE_STATISTICS))
+    @pytest.mark.parametrize("rule_names", RULE_SETS)
+    def test_statistics_left_out(self, feature, rule_names):
+        # Only the statistics asked for are worked out, the others keep
+        # their defaults
+        statistics = CODEGEN_FEATURE_STATISTICS[feature]
+        fast = FastGame.from_game(
+            make_game(SeededDie(3), 2, 100, rule_names=rule_names)
+        )
+        codegen = CodegenGame.from_game(
+            make_game(SeededDie(3), 2, 100, rule_names=rule_names),
+            statistics=statistics,
+            count_moves=False,
+        )
+        defaults = GameStats().__dict__
+        kept = set(statistics) | {"game_number_of_rolls_to_win"}
+        for expected, game_stat in zip(fast.iter_games(), codegen.iter_games()):
+            for name, value in game_stat.__dict__.items():
+                if name in kept:
+                    assert value == getattr(expected, name)
+                else:
+                    assert value == defaults[name]
+        assert codegen.move_counts is None
+
+    def test_code_left_out(self):
+        game = make_game(SeededDie(1), 2, 10, [Ladder(bottom=4, top=25)])
+        source = CodegenGame.from_game(game).source
+        # No snake on the board: no slide, nor forfeit under the default rules
+        assert "min_climbed" in source and "slid" not in source
+        assert "forfeit" not in source
+        source = CodegenGame.from_game(game, statistics=(), count_moves=False).source
+        assert "effect" not in source and "lucky" not in source
+        assert "move_counts" not in source and "streak_sum" not in source
+
+    def test_generated_once_per_board(self):
+        codegen = CodegenGame.from_game(make_game(SeededDie(1), 2, 10))
+        other = CodegenGame.from_game(make_game(SeededDie(2), 2, 10))
+        assert other.play is codegen.play
+        elsewhere = CodegenGame.from_game(make_game(SeededDie(1), 2, 10, BOARD[1:]))
+        assert elsewhere.play is not codegen.play
+        rolls_only = CodegenGame.from_game(
+            make_game(SeededDie(1), 2, 10), statistics=()
+        )
+        assert rolls_only.play is not codegen.play
+
+    def test_board_hash(self):
+        board = CompiledBoard.from_game(make_game(SeededDie(1), 1, 1))
+        assert board_hash(board) == board_hash(
+            CompiledBoard.from_game(make_game(SeededDie(2), 3, 5))
+        )
+        assert board_hash(board) != board_hash(
+            CompiledBoard.from_game(
+                make_game(SeededDie(1), 1, 1, rule_names=[RuleSet.EXACT_ROLL_TO_WIN])
+            )
+        )
+
+    def test_every_statistic_by_default(self):
+        board = CompiledBoard.from_game(make_game(SeededDie(1), 1, 1))
+        source = generate_source(
+            board, CodegenGame.from_game(make_game(SeededDie(1), 1, 1)).features
+        )
+        for statistic in CODEGEN_STATISTICS:
+            assert f"game_stat.{statistic}" in source
+
+    def test_invalid_play(self):
+        codegen = CodegenGame.from_game(make_game(Mock_Die([5]), 0, 1))
+        assert codegen.play_game(1) is None
+        codegen = CodegenGame.from_game(make_game(Mock_Die([5]), 1, 1))
+        assert codegen.play_game(2) is None
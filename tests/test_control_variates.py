@@ -0,0 +1,69 @@
+import pytest
+from src.die import SeededDie
+from src.control_variates import (
+    CONTROL_VARIATE_FIELDS,
+    ControlVariateMoments,
+    control_variate_estimates,
+    known_rolls_to_win,
+)
+from .conftest import make_game, played
+
+
+class Test_ControlVariateMoments:
+    def test_columns_match_games(self):
+        game_stats, columns = played(make_game(SeededDie(7), 2, 400))
+        by_game, by_column = ControlVariateMoments(), ControlVariateMoments()
+        for game_stat in game_stats:
+            by_game.add(game_stat)
+        by_column.add_games(columns)
+        assert by_column.__dict__ == by_game.__dict__
+        assert by_game.number_of_games == 400
+
+    def test_merge(self):
+        game_stats, _ = played(make_game(SeededDie(7), 2, 400))
+        whole, first, second = (ControlVariateMoments() for _ in range(3))
+        whole.add_games(game_stats)
+        first.add_games(game_stats[:150])
+        second.add_games(game_stats[150:])
+        first.merge(second)
+        assert first.__dict__ == whole.__dict__
+
+    def test_truncated_games_left_out(self):
+        game = make_game(SeededDie(7), 2, 400, roll_cap=40)
+        game_stats, _ = played(game)
+        moments = ControlVariateMoments()
+        moments.add_games(game_stats)
+        won = [game_stat for game_stat in game_stats if not game_stat.truncated]
+        assert 0 < moments.number_of_games == len(won) < len(game_stats)
+
+
+class Test_ControlVariateEstimates:
+    def test_estimates(self):
+        game = make_game(SeededDie(7), 2, 400)
+        known_mean = known_rolls_to_win(game)
+        game_stats, _ = played(game)
+        moments = ControlVariateMoments()
+        moments.add_games(game_stats)
+        estimates = {
+            estimate.statistic: estimate
+            for estimate in control_variate_estimates(moments, known_mean)
+        }
+        assert list(estimates) == list(CONTROL_VARIATE_FIELDS)
+        win_rolls = estimates["avg_number_of_win_rolls"]
+        # The control's own average is adjusted to its known mean
+        assert win_rolls.beta == pytest.approx(1)
+        assert win_rolls.adjusted == pytest.approx(known_mean)
+        assert win_rolls.variance_reduction == float("inf")
+        lucky_rolls = estimates["avg_lucky_rolls"]
+        assert lucky_rolls.average == pytest.approx(
+            sum(game_stat.game_total_lucky_rolls for game_stat in game_stats) / 400
+        )
+        assert lucky_rolls.variance_reduction > 1
+        assert lucky_rolls.to_dict()["adjusted"] == lucky_rolls.adjusted
+
+    def test_too_few_games(self):
+        assert control_variate_estimates(ControlVariateMoments(), 20.0) == []
+
+    def test_roll_cap(self):
+        assert known_rolls_to_win(make_game(SeededDie(7), 2, 400, roll_cap=40)) is None
+        assert known_rolls_to_win(make_game(SeededDie(7), 2, 400)) > 0
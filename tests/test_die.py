@@ -0,0 +1,106 @@
+import pytest
+from collections import Counter
+from random import Random
+from src.die import (
+    SeededDie,
+    AliasTable,
+    AliasDie,
+    parse_distribution,
+    uniform_distribution,
+)
+from src.fast_engine import FastGame
+from src.analytic import analyse_game
+from src.shard import Shard, run_shard
+from src.equivalence import compare_exact
+from .conftest import make_game
+
+
+LOADED_ON_SIX = {1: 1, 2: 1, 3: 1, 4: 1, 5: 1, 6: 2}
+
+
+class Test_Die:
+    def test_parse_sum_of_dice(self):
+        distribution = parse_distribution("2d6")
+        assert sorted(distribution) == list(range(2, 13))
+        assert distribution[7] == pytest.approx(6 / 36)
+        assert parse_distribution("1d6") == pytest.approx(uniform_distribution())
+
+    def test_parse_weights(self):
+        assert parse_distribution("1:1, 6:3") == {1: 1.0, 6: 3.0}
+
+    @pytest.mark.parametrize(
+        "spec", ["", "2d", "d6", "0:1", "101:1", "1:-1", "1:0", "1:x", "20d6"]
+    )
+    def test_parse_errors(self, spec):
+        with pytest.raises(ValueError):
+            parse_distribution(spec)
+
+    def test_alias_table_frequencies(self):
+        table = AliasTable(LOADED_ON_SIX)
+        rng = Random(1)
+        counts = Counter(table.sample_many(rng.random() for _ in range(70000)))
+        for face, weight in LOADED_ON_SIX.items():
+            assert counts[face] / 70000 == pytest.approx(weight / 7, abs=0.01)
+
+    def test_alias_table_edges(self):
+        table = AliasTable({3: 1.0, 5: 0.0})
+        assert table.faces == [3]
+        assert {table.sample(u / 10) for u in range(10)} == {3}
+        assert table.sample(0.999999) in AliasTable(LOADED_ON_SIX).faces
+
+    def test_alias_die_reproducible(self):
+        die = AliasDie(LOADED_ON_SIX, seed=3, stream=1)
+        die.start_game(7)
+        rolls = [die.roll() for _ in range(100)]
+        other = die.clone(3)
+        other.start_game(7)
+        assert [other.roll() for _ in range(100)] == rolls
+        other.start_game(8)
+        assert [other.roll() for _ in range(100)] != rolls
+
+    @pytest.mark.parametrize("number_of_rolls", [0, 1, 5, 64, 333])
+    def test_roll_ahead(self, number_of_rolls):
+        # Rolls as roll() does, and leaves the die where roll() would
+        die, other = SeededDie(4), SeededDie(4)
+        die.start_game(9)
+        other.start_game(9)
+        rolls = die.roll_ahead(number_of_rolls)
+        assert len(rolls) >= number_of_rolls * 0.5
+        assert [other.roll() for _ in rolls] == rolls
+        assert [die.roll() for _ in range(20)] == [other.roll() for _ in range(20)]
+
+    def test_engines_match_with_seat_dice(self):
+        seat_dice = {0: parse_distribution("2d6"), 1: LOADED_ON_SIX}
+        reference = make_game(SeededDie(5), 2, 20, seat_dice=seat_dice)
+        other = make_game(SeededDie(5), 2, 20, seat_dice=seat_dice)
+        fast = FastGame.from_game(other)
+        for n in range(1, 21):
+            assert repr(fast.play_game(n).__dict__) == repr(
+                reference.play_game(n).__dict__
+            )
+
+    def test_compare_exact_with_seat_dice(self):
+        assert (
+            compare_exact(
+                lambda die: make_game(die, 2, 10, seat_dice={1: LOADED_ON_SIX}),
+                lambda: SeededDie(5),
+                range(1, 11),
+            )
+            == []
+        )
+
+    def test_analysis_honours_seat_dice(self):
+        fair = analyse_game(make_game(SeededDie(5), 2, 20))
+        game = make_game(SeededDie(5), 2, 20, seat_dice={0: LOADED_ON_SIX})
+        loaded = analyse_game(game)
+        assert loaded.win_by_seat[0] > fair.win_by_seat[0]
+        assert sum(loaded.win_by_seat) == pytest.approx(1, abs=1e-9)
+
+    def test_shard_needs_seat_dice_of_the_seed(self):
+        game = make_game(SeededDie(5), 2, 20, seat_dice={0: LOADED_ON_SIX})
+        # Another die is another board to merge with
+        fair_board = run_shard(make_game(SeededDie(5), 2, 20), Shard(1, 1))["board"]
+        assert run_shard(game, Shard(1, 1))["board"] != fair_board
+        game.set_seat_die(1, AliasDie(LOADED_ON_SIX, seed=6))
+        with pytest.raises(ValueError):
+            run_shard(game, Shard(1, 1))
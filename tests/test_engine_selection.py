@@ -0,0 +1,98 @@
+import pytest
+from src.analytic import analyse_game
+from src.die import SeededDie
+from src.stats_accumulator import StatsAccumulator
+from src.engine_selection import (
+    ANALYTIC_ENGINE,
+    STATISTICS_ROLLS,
+    RollsToWin,
+    choose_engine,
+    estimated_seconds,
+)
+from src.preflight import preflight
+from .conftest import make_game
+
+
+class Test_ChooseEngine:
+    def test_every_statistic_is_played(self):
+        choice = choose_engine(make_game(number_of_players=1), 10**7)
+        assert choice.name == "codegen"
+        assert "needs the games played" in choice.reason
+        assert "on the codegen engine" in choice.reason
+        assert choice.estimates["codegen"] < choice.estimates["fast"]
+        assert choice.estimates["fast"] < choice.estimates["reference"]
+
+    def test_cheapest_engine_plays(self):
+        # Compiling its code costs the codegen engine more than a handful of
+        # games save
+        game = make_game(number_of_players=2)
+        assert choose_engine(game, 10).name == "fast"
+        choice = choose_engine(game, 20000)
+        assert choice.name == "codegen"
+        assert choice.estimates["codegen"] == min(
+            choice.estimates[name] for name in ("reference", "fast", "codegen")
+        )
+
+    def test_rolls_only(self):
+        game = make_game(number_of_players=1)
+        # A handful of games are played faster than they are worked out
+        assert choose_engine(game, 10, STATISTICS_ROLLS).name == "fast"
+        choice = choose_engine(game, 10**6, STATISTICS_ROLLS)
+        assert choice.name == ANALYTIC_ENGINE
+        assert "only the rolls to win" in choice.reason
+        assert choice.estimates[ANALYTIC_ENGINE] < choice.estimates["fast"]
+
+    def test_games_needed(self):
+        choice = choose_engine(
+            make_game(number_of_players=1),
+            10**6,
+            STATISTICS_ROLLS,
+            games_needed_for="--heatmap",
+        )
+        assert choice.name == "codegen"
+        assert choice.reason == "--heatmap needs the games played"
+
+    def test_roll_cap(self):
+        game = make_game(number_of_players=3, roll_cap=60)
+        choice = choose_engine(game, 10**6, STATISTICS_ROLLS)
+        assert choice.name == "codegen"
+        assert "roll cap" in choice.reason
+
+    def test_cost_model(self):
+        report = preflight(make_game(number_of_players=1))
+        # More players play longer games, and shorten the joint passages
+        assert estimated_seconds("fast", report, 6, 1000) > estimated_seconds(
+            "fast", report, 2, 1000
+        )
+        assert estimated_seconds(ANALYTIC_ENGINE, report, 6, 1) < estimated_seconds(
+            ANALYTIC_ENGINE, report, 2, 1
+        )
+        assert estimated_seconds(ANALYTIC_ENGINE, report, 2, 1, 2) == pytest.approx(
+            2 * estimated_seconds(ANALYTIC_ENGINE, report, 2, 1)
+        )
+
+
+class Test_RollsToWin:
+    def test_from_accumulator(self):
+        game = make_game(SeededDie(3), 2, 300)
+        accumulator = StatsAccumulator()
+        for game_stat in game.iter_games():
+            accumulator.add(game_stat)
+        rolls_to_win = RollsToWin.from_accumulator(accumulator)
+        sim_stats = accumulator.to_simulation_stats()
+        assert not rolls_to_win.exact
+        assert rolls_to_win.number_of_games == 300
+        assert rolls_to_win.minimum == sim_stats.min_number_of_win_rolls
+        assert rolls_to_win.maximum == sim_stats.max_number_of_win_rolls
+        assert rolls_to_win.average == pytest.approx(sim_stats.avg_number_of_win_rolls)
+        quantiles = list(rolls_to_win.quantiles().values())
+        assert quantiles == sorted(quantiles)
+        assert quantiles[-1] <= rolls_to_win.maximum
+
+    def test_from_analysis(self):
+        analysis = analyse_game(make_game(number_of_players=1))
+        rolls_to_win = RollsToWin.from_analysis(analysis)
+        assert rolls_to_win.exact and rolls_to_win.maximum is None
+        assert rolls_to_win.average == pytest.approx(analysis.expected_rolls_to_win())
+        assert rolls_to_win.quantile(0.9) == analysis.rolls_to_win_quantile(0.9)
+        assert rolls_to_win.to_dict()["quantiles"]["99%"] > 0
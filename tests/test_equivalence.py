@@ -0,0 +1,87 @@
+import pytest
+from src.artefact import Snake, Ladder
+from src.board import CompiledBoard, board_can_finish
+from src.rules import RuleSet
+from src.fast_engine import FastGame
+from src.engines import ENGINES
+from src.equivalence import (
+    ScriptedDie,
+    compare_exact,
+    compare_statistically,
+    fuzz,
+)
+from .conftest import make_game
+
+
+def game_maker(artefacts, number_of_players=1, rule_names=(), number_of_simulations=5):
+    return lambda die: make_game(
+        die, number_of_players, number_of_simulations, artefacts, rule_names
+    )
+
+
+class OffByOneEngine(FastGame):
+    def play_game(self, simulation_number):
+        game_stat = super().play_game(simulation_number)
+        game_stat.game_number_of_rolls_to_win += simulation_number % 2
+        return game_stat
+
+
+class Test_Equivalence:
+    def test_scripted_die(self):
+        die = ScriptedDie([6, 6, 2], seed=1)
+        die.start_game(1)
+        first_game = [die.roll() for _ in range(10)]
+        die.start_game(1)
+        assert [die.roll() for _ in range(10)] == first_game
+        assert first_game[:3] == [6, 6, 2]
+
+    @pytest.mark.parametrize(
+        "script, artefacts, number_of_players, rule_names",
+        [
+            # Lucky twice: arriving at 100 from the lucky zone past a snake at 99
+            ([5] * 20, [Snake(head=99, tail=41)], 1, []),
+            ([4] * 25, [Snake(head=98, tail=41)], 1, []),
+            # Lucky twice: a ladder's bottom right below a snake's head
+            ([5] * 7 + [3], [Ladder(bottom=38, top=59), Snake(head=40, tail=3)], 1, []),
+            # Bounce back from 97 to 98
+            ([5] * 19 + [2, 5], [], 1, []),
+            # Streaks, a snake and a ladder within one
+            ([6, 6, 2, 6, 6, 6, 1], [Ladder(bottom=12, top=33), Snake(head=19, tail=2)], 2, []),
+            ([6, 6, 6, 4] * 8, [], 1, [RuleSet.THREE_SIXES_FORFEIT]),
+            ([6, 4] * 10, [Ladder(bottom=84, top=99)], 3, [RuleSet.NO_EXTRA_TURN]),
+            ([5] * 19 + [6, 1], [], 1, [RuleSet.EXACT_ROLL_TO_WIN]),
+            ([], [Ladder(bottom=89, top=95)], 2, [RuleSet.LADDERS_ON_EXACT_LANDING]),
+        ],
+    )
+    def test_scripted_games_match(self, script, artefacts, number_of_players, rule_names):
+        game_of = game_maker(artefacts, number_of_players, rule_names)
+        assert compare_exact(game_of, lambda: ScriptedDie(script), range(1, 6)) == []
+
+    def test_mismatch_is_reported(self, monkeypatch):
+        monkeypatch.setitem(ENGINES, "off-by-one", OffByOneEngine.from_game)
+        mismatches = compare_exact(
+            game_maker([]), lambda: ScriptedDie([5] * 20), range(1, 5), ["off-by-one"]
+        )
+        assert mismatches == [
+            "off-by-one game 1: game_number_of_rolls_to_win = 21, reference 20",
+            "off-by-one game 3: game_number_of_rolls_to_win = 21, reference 20",
+        ]
+
+    def test_statistically(self, monkeypatch):
+        monkeypatch.setitem(ENGINES, "off-by-one", OffByOneEngine.from_game)
+        game_of = game_maker([Snake(head=40, tail=3)], 2, number_of_simulations=2000)
+        # The engines' seeds go by their order
+        mismatches = compare_statistically(
+            game_of, seed=3, engines=["reference", "fast", "off-by-one"]
+        )
+        assert mismatches[0].startswith("off-by-one: mean game_number_of_rolls_to_win")
+        assert len(mismatches) == 1
+
+    def test_board_can_finish(self):
+        # Past 89, every roll is a snake
+        trap = {head: Snake(head=head, tail=head - 80) for head in range(90, 96)}
+        assert not board_can_finish(CompiledBoard(trap, set()))
+        assert board_can_finish(CompiledBoard({}, set()))
+
+    def test_fuzz(self):
+        assert fuzz(number_of_boards=10, seed=1) == []
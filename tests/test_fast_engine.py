@@ -0,0 +1,96 @@
+import pytest
+from random import Random
+from src.artefact import Snake, Ladder
+from src.die import SeededDie
+from src.fast_engine import FastGame
+from src.rules import RuleSet
+from .conftest import BOUNCE_BOARD, make_game
+from .mock_die import Mock_Die
+
+
+def random_rolls(seed, number_of_rolls):
+    rng = Random(seed)
+    return [rng.randint(1, 6) for _ in range(number_of_rolls)]
+
+
+class Test_FastGame:
+    @pytest.mark.parametrize(
+        "mock_rolls, artefacts, number_of_players",
+        [
+            ([5], [], 1),
+            ([5, 5, 5, 6, 3] + [4, 6] * 9, [Snake(head=15, tail=1)], 1),
+            ([6, 4, 6, 6, 4, 4, 6, 6, 6, 4, 4, 4], [], 1),
+            ([1, 5], [], 2),
+            ([6, 6, 6, 6, 6, 5, 6, 6, 6, 6, 6, 4] + [1, 2] * 33, [], 2),
+            ([6, 6, 2, 6, 1, 3], [Ladder(bottom=6, top=100)], 3),
+            (random_rolls(1, 997), BOUNCE_BOARD, 1),
+            (random_rolls(2, 1009), BOUNCE_BOARD, 2),
+            (random_rolls(3, 1013), BOUNCE_BOARD, 3),
+        ],
+    )
+    def test_same_stats_for_fixed_rolls(self, mock_rolls, artefacts, number_of_players):
+        game = make_game(Mock_Die(mock_rolls), number_of_players, 3, artefacts)
+        game.run_simulations()
+        fast = FastGame.from_game(
+            make_game(Mock_Die(mock_rolls), number_of_players, 3, artefacts)
+        )
+
+        for simulation_number, game_stat in enumerate(game.game_stats, 1):
+            assert fast.play_game(simulation_number).__dict__ == game_stat.__dict__
+
+    @pytest.mark.parametrize("number_of_players", [1, 2, 5])
+    def test_same_simulation_stats(self, number_of_players):
+        game = make_game(SeededDie(11), number_of_players, 300)
+        game.run_simulations()
+        game.calculate_simultation_statistics()
+
+        other = make_game(SeededDie(11), number_of_players, 300)
+        FastGame.from_game(other).run_simulations(other.game_stats)
+        other.calculate_simultation_statistics()
+
+        assert [g.__dict__ for g in other.game_stats] == [
+            g.__dict__ for g in game.game_stats
+        ]
+        assert repr(other.sim_stats.__dict__) == repr(game.sim_stats.__dict__)
+
+    def test_invalid_play(self):
+        fast = FastGame.from_game(make_game(Mock_Die([5]), 0, 1))
+        assert fast.play_game(1) is None
+        fast = FastGame.from_game(make_game(Mock_Die([5]), 1, 1))
+        assert fast.play_game(2) is None
+
+    @pytest.mark.parametrize("number_of_players", [1, 3])
+    @pytest.mark.parametrize(
+        "rule_names", [(), (RuleSet.THREE_SIXES_FORFEIT,), (RuleSet.NO_EXTRA_TURN,)]
+    )
+    def test_same_games_cut_short(self, number_of_players, rule_names):
+        def capped_game():
+            game = make_game(SeededDie(5), number_of_players, 200)
+            game.rules = RuleSet(rule_names)
+            game.roll_cap = 25 * number_of_players
+            return game
+
+        game = capped_game()
+        game.run_simulations()
+        game.calculate_simultation_statistics()
+        other = capped_game()
+        FastGame.from_game(other).run_simulations(other.game_stats)
+        other.calculate_simultation_statistics()
+
+        assert [g.__dict__ for g in other.game_stats] == [
+            g.__dict__ for g in game.game_stats
+        ]
+        assert 0 < game.sim_stats.number_of_truncated_games < 200
+        assert repr(other.sim_stats.__dict__) == repr(game.sim_stats.__dict__)
+
+    def test_moves_not_counted(self):
+        counted = FastGame.from_game(make_game(SeededDie(4), 2, 50, BOUNCE_BOARD))
+        fast = FastGame.from_game(
+            make_game(SeededDie(4), 2, 50, BOUNCE_BOARD), count_moves=False
+        )
+        assert [repr(g.__dict__) for g in fast.iter_games()] == [
+            repr(g.__dict__) for g in counted.iter_games()
+        ]
+        assert fast.move_counts is None and fast.forfeit_move_counts is None
+        with pytest.raises(ValueError):
+            fast.hit_counters()
@@ -1,5 +1,6 @@
+from itertools import islice
 from src.constants import Constants as Const
-from src.die import Die
+from src.die import Die, SeededDie
 from src.player import Player
 from src.snake_ladder_simulation import Game
 from .mock_die import Mock_Die
@@ -47,3 +48,28 @@ class Test_Game:
         for i in range(10):
             roll = die.roll()
             assert roll >= Const.DIE_ROLL_MIN and roll <= Const.DIE_ROLL_MAX
+
+    def test_iter_games_matches_run_simulations(self):
+        game = Game(SeededDie(3), number_of_simulations=5)
+        game.add_players([Player("P1"), Player("P2")])
+        game.run_simulations()
+
+        streamed = Game(SeededDie(3), number_of_simulations=5, retain_game_stats=False)
+        streamed.add_players([Player("P1"), Player("P2")])
+        game_stats = list(streamed.iter_games())
+
+        assert [g.__dict__ for g in game_stats] == [g.__dict__ for g in game.game_stats]
+        assert len(streamed.game_stats) == 0
+
+    def test_iter_games_is_lazy(self):
+        game = Game(
+            Mock_Die([5, 1]), number_of_simulations=10**12, retain_game_stats=False
+        )
+        player1: Player = Player("P1")
+        game.add_players([player1, Player("P2")])
+
+        game_stats = list(islice(game.iter_games(), 3))
+
+        assert [g.game_number_of_rolls_to_win for g in game_stats] == [20] * 3
+        assert player1.token_position == Const.PLAYER_START_POSITION
+        assert game.curr_player_ndx == 0
@@ -0,0 +1,128 @@
+import sys
+import pytest
+from src.die import SeededDie
+from src.rules import RuleSet
+from src.game_stats import GameStats
+from src.game_stats_columns import GameStatsColumns
+from src.stats_accumulator import StatsAccumulator
+from .conftest import make_game
+
+
+def make_game_stat(rolls, max_streak):
+    game_stat = GameStats()
+    game_stat.game_number_of_rolls_to_win = rolls
+    game_stat.game_total_distance_climbed = rolls * 2
+    game_stat.game_max_streak = max_streak
+    return game_stat
+
+
+class Test_GameStatsColumns:
+    def test_rows(self):
+        columns = GameStatsColumns(3)
+        assert len(columns) == 3
+        assert columns[0].game_min_distance_slide == sys.maxsize
+        assert columns[0].game_max_streak == []
+
+        columns[1] = make_game_stat(40, [6, 6, 2])
+        columns[-1].game_total_lucky_rolls = 7
+        columns[-1].game_max_streak = [1, 2, 3]
+
+        assert columns[1].game_number_of_rolls_to_win == 40
+        assert columns[1].game_max_streak == [6, 6, 2]
+        assert columns[2].game_total_lucky_rolls == 7
+        assert columns[2].game_max_streak == [1, 2, 3]
+        assert [g.__dict__ for g in columns] == [
+            GameStats().__dict__,
+            make_game_stat(40, [6, 6, 2]).__dict__,
+            columns.game_stat(2).__dict__,
+        ]
+        with pytest.raises(IndexError):
+            columns[3]
+        with pytest.raises(AttributeError):
+            columns[0].winner = 1
+
+    def test_compact(self):
+        columns = GameStatsColumns(1000)
+        columns.append(make_game_stat(12, [6, 6, 6, 6, 6, 5]))
+        assert len(columns) == 1001
+        assert columns.nbytes < 64 * len(columns)
+
+    def test_streak_sums(self):
+        columns = GameStatsColumns()
+        # The last streak is irregular: held as it is, beside the columns
+        for rolls, max_streak in [(10, []), (11, [6, 6, 5]), (12, [5, 6])]:
+            columns.append(make_game_stat(rolls, max_streak))
+        assert columns.streak_sums() == [0, 17, 11]
+
+    def test_longest_streak_is_the_first(self):
+        columns = GameStatsColumns()
+        for rolls, max_streak in [(10, [3]), (11, [6, 5]), (12, [5, 6]), (13, [6, 4])]:
+            columns.append(make_game_stat(rolls, max_streak))
+
+        sim_stats = columns.to_simulation_stats()
+        assert sim_stats.max_streak == [6, 5]
+        assert sim_stats.min_number_of_win_rolls == 10
+        assert sim_stats.max_number_of_win_rolls == 13
+        assert sim_stats.avg_distance_climbed == 23.0
+        assert GameStatsColumns().to_simulation_stats().number_of_simulations == 0
+
+    @pytest.mark.parametrize(
+        "rule_names", [[], [RuleSet.NO_EXTRA_TURN], [RuleSet.THREE_SIXES_FORFEIT]]
+    )
+    def test_same_stats_as_folding_the_games(self, rule_names):
+        game = make_game(SeededDie(2), 2, 300, rule_names=rule_names)
+        game.run_simulations()
+        game.calculate_simultation_statistics()
+
+        accumulator = StatsAccumulator()
+        for game_stat in game.game_stats:
+            accumulator.add(game_stat)
+
+        assert not game.game_stats.irregular_streaks
+        assert repr(game.sim_stats.__dict__) == repr(
+            accumulator.to_simulation_stats().__dict__
+        )
+        assert game.game_stats.to_accumulator().to_dict() == accumulator.to_dict()
+
+    def test_to_accumulator(self):
+        columns = GameStatsColumns()
+        for game_stat in [make_game_stat(9, [6, 1]), make_game_stat(4, [2, 3, 4])]:
+            columns.append(game_stat)
+        accumulator = columns.to_accumulator()
+        assert accumulator.mins["game_min_distance_slide"] == sys.maxsize
+        assert accumulator.max_streak == [2, 3, 4]
+        empty = GameStatsColumns().to_accumulator()
+        assert empty.to_dict() == StatsAccumulator().to_dict()
+
+    def test_games_cut_short(self):
+        truncated = GameStats()
+        truncated.truncated = True
+        columns = GameStatsColumns()
+        accumulator = StatsAccumulator()
+        for game_stat in [
+            make_game_stat(9, [6, 1]),
+            truncated,
+            make_game_stat(4, [2, 3, 4]),
+            truncated,
+            make_game_stat(7, [1, 1]),
+        ]:
+            columns.append(game_stat)
+            accumulator.add(game_stat)
+        assert [g.truncated for g in columns] == [False, True, False, True, False]
+        assert columns[3].truncated
+        columns[3].truncated = False
+        columns[3].truncated = True
+
+        won = columns.won_games()
+        assert [g.game_number_of_rolls_to_win for g in won] == [9, 4, 7]
+        assert won.irregular_streaks == {1: [2, 3, 4], 2: [1, 1]}
+
+        sim_stats = columns.to_simulation_stats()
+        assert sim_stats.number_of_simulations == 5
+        assert sim_stats.number_of_truncated_games == 2
+        assert sim_stats.min_number_of_win_rolls == 4
+        assert sim_stats.avg_number_of_win_rolls == 6.67
+        assert repr(sim_stats.__dict__) == repr(
+            accumulator.to_simulation_stats().__dict__
+        )
+        assert columns.to_accumulator().to_dict() == accumulator.to_dict()
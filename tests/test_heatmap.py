@@ -0,0 +1,53 @@
+from src.constants import Constants as Const
+from src.die import SeededDie
+from src.fast_engine import FastGame
+from src.heatmap import HitCounters, format_heatmap
+from .mock_die import Mock_Die
+from .conftest import make_game
+
+
+class Test_Heatmap:
+    def test_reference_counters(self):
+        # P1 lands on 4 (ladder to 25), P2 on 5, then P1 on 27 (snake to 5)
+        game = make_game(Mock_Die([1]))
+        game.hit_counters = HitCounters()
+        game.move_token(game.players[0], 4)
+        game.move_token(game.players[1], 5)
+        game.move_token(game.players[0], 2)
+
+        assert game.hit_counters.landings[4] == 1
+        assert game.hit_counters.landings[5] == 1
+        assert game.hit_counters.landings[27] == 1
+        assert game.hit_counters.landings[25] == 0  # Arrived by the ladder
+        assert game.hit_counters.artefact_hits(game.activation_points_map) == [
+            (game.activation_points_map[4], 1),
+            (game.activation_points_map[27], 1),
+            (game.activation_points_map[33], 0),
+            (game.activation_points_map[40], 0),
+            (game.activation_points_map[74], 0),
+            (game.activation_points_map[89], 0),
+        ]
+        lucky_hits = dict(game.hit_counters.lucky_position_hits(game.lucky_positions))
+        assert lucky_hits[25] == 0 and lucky_hits[26] == 0
+
+    def test_fast_engine_counts_the_same(self):
+        game = make_game(SeededDie(8), 2, 100)
+        game.hit_counters = HitCounters()
+        game.run_simulations()
+
+        other = make_game(SeededDie(8), 2, 100)
+        fast = FastGame.from_game(other)
+        fast.run_simulations(other.game_stats)
+        hit_counters = fast.hit_counters()
+
+        assert hit_counters.landings == game.hit_counters.landings
+        assert hit_counters.triggers == game.hit_counters.triggers
+
+    def test_format_heatmap(self):
+        hit_counters = HitCounters()
+        hit_counters.record_landing(Const.BOARD_POSITION_MAX)
+        lines = format_heatmap(hit_counters)
+        assert len(lines) == Const.BOARD_POSITION_MAX // Const.BOARD_ROW_SIZE
+        assert lines[0].startswith(" 100@@")
+        assert lines[-1].startswith("   1  ")
+        assert lines[-2].startswith("  20  ")
@@ -0,0 +1,107 @@
+import pytest
+from src.die import SeededDie
+from src.game_stats import GameStats
+from src.game_stats_columns import GameStatsColumns
+from src.rules import RuleSet
+from src.fast_engine import FastGame
+from src.memory_budget import (
+    MemoryMonitor,
+    MemoryPlan,
+    SpillingGameStats,
+    parse_memory_size,
+)
+from .conftest import make_game
+
+
+MB = 2**20
+
+
+class Test_MemoryBudget:
+    @pytest.mark.parametrize(
+        "spec, size",
+        [("512M", 512 * MB), ("2g", 2 * 2**30), ("1.5KB", 1536), ("100", 100)],
+    )
+    def test_parse_memory_size(self, spec, size):
+        assert parse_memory_size(spec) == size
+
+    @pytest.mark.parametrize("spec", ["", "M", "-1G", "0", "12X"])
+    def test_parse_memory_size_errors(self, spec):
+        with pytest.raises(ValueError):
+            parse_memory_size(spec)
+
+    def test_plan(self):
+        records = 100000 * GameStatsColumns.bytes_per_game()
+        plan = MemoryPlan(40 * MB + records, 100000, baseline=30 * MB)
+        assert not plan.spill and plan.chunk_size == 100000
+
+        plan = MemoryPlan(40 * MB, 10**7, baseline=30 * MB)
+        assert plan.spill
+        assert 2 * plan.chunk_size * GameStatsColumns.bytes_per_game() <= plan.available
+
+        plan = MemoryPlan(40 * MB, 10**7, number_of_threads=64, baseline=30 * MB)
+        assert 1 < plan.number_of_threads < 64 and not plan.spill
+
+        with pytest.raises(ValueError):
+            MemoryPlan(30 * MB, 100, baseline=30 * MB)
+
+    @pytest.mark.parametrize("chunk_size", [1, 7, 1000])
+    @pytest.mark.parametrize("roll_cap", [0, 40])
+    def test_spilling_game_stats(self, chunk_size, roll_cap, tmp_path):
+        game = make_game(
+            SeededDie(5),
+            2,
+            200,
+            rule_names=[RuleSet.THREE_SIXES_FORFEIT],
+            roll_cap=roll_cap,
+            retain_game_stats=False,
+        )
+        game.game_stats = SpillingGameStats(chunk_size, spill_dir=str(tmp_path))
+        game.run_simulations()
+        game.calculate_simultation_statistics()
+
+        retained = make_game(
+            SeededDie(5),
+            2,
+            200,
+            rule_names=[RuleSet.THREE_SIXES_FORFEIT],
+            roll_cap=roll_cap,
+            retain_game_stats=False,
+        )
+        retained.game_stats = GameStatsColumns(200)
+        FastGame.from_game(retained).run_simulations(retained.game_stats)
+        retained.calculate_simultation_statistics()
+
+        assert len(game.game_stats) == 200
+        assert [g.__dict__ for g in game.game_stats] == [
+            g.__dict__ for g in retained.game_stats
+        ]
+        assert repr(game.sim_stats.__dict__) == repr(retained.sim_stats.__dict__)
+        assert bool(game.sim_stats.number_of_truncated_games) == bool(roll_cap)
+        assert game.game_stats.spilled_bytes + game.game_stats.nbytes == (
+            retained.game_stats.nbytes
+        )
+        game.game_stats.close()
+
+    def test_spilled_irregular_streaks(self):
+        game_stats = SpillingGameStats(2)
+        for streak in [[6, 2], [1, 2, 3], [6, 6, 1], [4, 4]]:
+            game_stat = GameStats()
+            game_stat.game_max_streak = streak
+            game_stats.append(game_stat)
+        assert [g.game_max_streak for g in game_stats] == [
+            [6, 2],
+            [1, 2, 3],
+            [6, 6, 1],
+            [4, 4],
+        ]
+        assert game_stats.to_simulation_stats().max_streak == [6, 6, 1]
+        with pytest.raises(IndexError):
+            game_stats[2] = GameStats()
+
+    def test_monitor(self):
+        monitor = MemoryMonitor()
+        monitor.start_phase("setup")
+        monitor.start_phase("simulation")
+        report = monitor.report()
+        assert report[0].startswith("Peak in setup = ")
+        assert report[1].startswith("Peak in simulation = ")
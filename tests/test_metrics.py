@@ -0,0 +1,105 @@
+import urllib.request
+from src.die import SeededDie
+from src.fast_engine import FastGame
+from src.game_stats import GameStats
+from src.metrics import (
+    OPENMETRICS_CONTENT_TYPE,
+    MetricsExporter,
+    RunMetrics,
+    moves_played,
+    run_simulations,
+)
+from src.threaded import run_threaded
+from .conftest import make_game
+
+
+def samples(text):
+    # Metric samples by name (labels included), comments left out
+    return {
+        line.rsplit(" ", 1)[0]: float(line.rsplit(" ", 1)[1])
+        for line in text.splitlines()
+        if not line.startswith("#")
+    }
+
+
+class Test_RunMetrics:
+    def test_record(self):
+        metrics = RunMetrics(10, number_of_workers=2)
+        won = GameStats()
+        won.game_number_of_rolls_to_win = 30
+        won.game_total_lucky_rolls = 4
+        truncated = GameStats()
+        truncated.truncated = True
+        metrics.record([won, truncated], 0.5, worker=1, moves=120)
+        snapshot = metrics.snapshot()
+        assert snapshot["games_completed"] == 2
+        assert snapshot["games_truncated"] == 1
+        assert snapshot["moves"] == 120
+        assert snapshot["worker_utilization"][0] == 0
+        assert snapshot["estimates"]["avg_number_of_win_rolls"] == 30
+        assert snapshot["estimates"]["avg_lucky_rolls"] == 4
+
+    def test_openmetrics(self):
+        metrics = RunMetrics(10)
+        text = metrics.to_openmetrics()
+        assert text.endswith("# EOF\n")
+        values = samples(text)
+        assert values["snakes_ladders_games_planned"] == 10
+        assert values["snakes_ladders_games_completed_total"] == 0
+        # No moves counted, and no games to estimate from
+        assert "snakes_ladders_moves_total" not in values
+        assert not any("estimate" in name for name in values)
+        assert 'snakes_ladders_worker_utilization{worker="1"}' in values
+
+
+class Test_RunSimulations:
+    def test_same_games(self):
+        plain = make_game(SeededDie(5), 2, 250)
+        FastGame.from_game(plain).run_simulations(plain.game_stats)
+        monitored = make_game(SeededDie(5), 2, 250)
+        metrics = RunMetrics(250)
+        engine = FastGame.from_game(monitored)
+        run_simulations(engine, monitored.game_stats, metrics, batch_games=100)
+        assert (
+            monitored.game_stats.to_accumulator().to_dict()
+            == plain.game_stats.to_accumulator().to_dict()
+        )
+        snapshot = metrics.snapshot()
+        assert snapshot["games_completed"] == 250
+        assert snapshot["moves"] == moves_played(engine) > 250
+        sim_stats = plain.game_stats.to_simulation_stats()
+        assert round(snapshot["estimates"]["avg_lucky_rolls"], 2) == (
+            sim_stats.avg_lucky_rolls
+        )
+
+    def test_reference_engine(self):
+        game = make_game(SeededDie(5), 2, 20)
+        metrics = RunMetrics(20)
+        run_simulations(game, game.game_stats, metrics)
+        assert metrics.snapshot()["moves"] is None
+        assert metrics.number_of_games == 20
+
+    def test_threaded(self):
+        game = make_game(SeededDie(2), 2, 300)
+        metrics = RunMetrics(300, number_of_workers=3)
+        accumulator = run_threaded(game, 2, 3, metrics=metrics)
+        assert accumulator.to_dict() == run_threaded(game, 2, 3).to_dict()
+        snapshot = metrics.snapshot()
+        assert snapshot["games_completed"] == 300
+        assert all(utilization > 0 for utilization in snapshot["worker_utilization"])
+
+
+class Test_MetricsExporter:
+    def test_textfile_and_http(self, tmp_path):
+        path = str(tmp_path / "run.prom")
+        metrics = RunMetrics(5)
+        with MetricsExporter(metrics, path, port=0, interval=60) as exporter:
+            url = f"http://127.0.0.1:{exporter.port}/metrics"
+            with urllib.request.urlopen(url) as response:
+                assert response.headers["Content-Type"] == OPENMETRICS_CONTENT_TYPE
+                assert b"snakes_ladders_games_planned 5" in response.read()
+            metrics.record([GameStats()], 0.1)
+        # Written once more on stopping
+        with open(path) as textfile:
+            assert samples(textfile.read())["snakes_ladders_games_completed_total"] == 1
+        assert not list(tmp_path.glob("*.tmp"))
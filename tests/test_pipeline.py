@@ -0,0 +1,89 @@
+import json
+import pytest
+from src.pipeline import game_from_config, run_pipeline
+
+BOARD = {
+    "number_of_simulations": 40,
+    "number_of_players": 2,
+    "snakes": [[27, 5], [89, 53]],
+    "ladders": [[4, 25]],
+    "seed": 3,
+}
+
+
+def board(**changes):
+    return json.dumps(dict(BOARD, **changes))
+
+
+class Test_Pipeline:
+    def test_game_from_config(self):
+        game = game_from_config(
+            dict(BOARD, rules=["no_extra_turn"], die="2d6", dice={"2": "1:1,6:2"})
+        )
+        assert len(game.players) == 2
+        assert game.rules.names == ("NO_EXTRA_TURN",)
+        assert sorted(game.distribution_for_seat(0)) == list(range(2, 13))
+        assert sorted(game.distribution_for_seat(1)) == [1, 6]
+
+    @pytest.mark.parametrize(
+        "changes",
+        [
+            {"number_of_players": 0},
+            {"number_of_simulations": None},
+            {"snakes": [[5, 27]]},
+            {"snakes": [[27]]},
+            {"ladders": [[27, 45]]},
+            {"rules": ["NO_SUCH_RULE"]},
+            {"die": "3"},
+            {"roll_cap": -1},
+            # Past 89, every roll is a snake
+            {"snakes": [[head, head - 80] for head in range(90, 96)]},
+        ],
+    )
+    def test_invalid_configs(self, changes):
+        with pytest.raises(ValueError):
+            game_from_config(dict(BOARD, **changes))
+
+    def test_results_in_input_order(self):
+        lines = [board(id="a"), "", "[1, 2]", board(id="c", number_of_players=4), "{"]
+        results = []
+        assert run_pipeline(lines, results.append, number_of_workers=0) == 4
+        records = [json.loads(result) for result in results]
+        assert [record["line"] for record in records] == [1, 3, 4, 5]
+        assert [record.get("id") for record in records] == ["a", None, "c", None]
+        assert records[0]["statistics"]["number_of_simulations"] == 40
+        assert records[1]["error"].startswith("Not a JSON object")
+        assert "error" in records[3]
+
+    def test_roll_cap_and_warnings(self):
+        results = []
+        run_pipeline([board(), board(roll_cap=20)], results.append, 0)
+        fair, capped = [json.loads(result) for result in results]
+        assert "warnings" not in fair
+        assert fair["statistics"]["number_of_truncated_games"] == 0
+        assert "roll cap of 20 rolls" in capped["warnings"][0]
+        assert capped["statistics"]["number_of_truncated_games"] > 0
+
+    def test_worker_processes_match(self):
+        lines = [board(id=n, seed=n) for n in range(6)] + [board(die="7")]
+        inline, ordered, unordered = [], [], []
+        run_pipeline(lines, inline.append, 0)
+        run_pipeline(lines, ordered.append, 2)
+        run_pipeline(lines, unordered.append, 2, ordered=False)
+        assert ordered == inline
+        assert sorted(unordered) == sorted(inline)
+
+    def test_reads_ahead_boundedly(self):
+        read = []
+
+        def lines():
+            for n in range(10):
+                read.append(n)
+                yield board(id=n)
+
+        def write(result):
+            # No more than the window is read ahead of the results
+            assert len(read) <= json.loads(result)["id"] + 2
+
+        run_pipeline(lines(), write, number_of_workers=0)
+        assert len(read) == 10
@@ -0,0 +1,57 @@
+import pytest
+from src.die import SeededDie, parse_distribution
+from src.rules import RuleSet
+from src.threaded import run_threaded
+from src import pipelined
+from src.pipelined import PIPELINED_STAGES, run_pipelined
+from .conftest import make_game
+
+RULES = [RuleSet.THREE_SIXES_FORFEIT]
+
+
+class Test_Pipelined:
+    @pytest.mark.parametrize("engine_name", ["reference", "fast"])
+    @pytest.mark.parametrize("seat_dice", [None, {1: "1:1,6:2", 2: "2d6"}])
+    def test_same_stats_as_one_thread(self, engine_name, seat_dice):
+        game = make_game(
+            SeededDie(8),
+            3,
+            120,
+            rule_names=RULES,
+            seat_dice={
+                seat: parse_distribution(spec)
+                for seat, spec in (seat_dice or {}).items()
+            },
+        )
+        expected = run_threaded(game, 3, 1, engine_name)
+
+        # Small batches and queues, for the stages to wait on one another
+        accumulator, busy = run_pipelined(
+            game, 3, engine_name, batch_games=7, queue_batches=1
+        )
+
+        assert accumulator.to_dict() == expected.to_dict()
+        assert set(busy) == set(PIPELINED_STAGES) | {"wall"}
+        assert all(seconds >= 0 for seconds in busy.values())
+
+    def test_fewer_games_than_a_batch(self):
+        accumulator, _ = run_pipelined(
+            make_game(SeededDie(8), 3, 3, rule_names=RULES), 1
+        )
+        assert accumulator.number_of_games == 3
+
+    def test_stage_error(self, monkeypatch):
+        class FailingEngine:
+            def iter_games(self, simulation_numbers):
+                raise ValueError("engine failed")
+
+        monkeypatch.setattr(
+            pipelined, "make_engine", lambda *args, **kwargs: FailingEngine()
+        )
+        with pytest.raises(ValueError, match="engine failed"):
+            run_pipelined(
+                make_game(SeededDie(8), 3, 2000, rule_names=RULES),
+                1,
+                batch_games=5,
+                queue_batches=1,
+            )
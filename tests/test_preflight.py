@@ -0,0 +1,59 @@
+import pytest
+from src.analytic import FirstPassage
+from src.artefact import Snake
+from src.board import CompiledBoard
+from src.die import Die, AliasDie
+from src.rules import RuleSet
+from src.preflight import RollSurvival, preflight
+from .conftest import BOUNCE_BOARD, make_game
+
+
+# Past 89, almost every roll is a snake
+LONG_BOARD = [Snake(head=head, tail=head - 80) for head in range(90, 99) if head != 94]
+
+
+class Test_Preflight:
+    @pytest.mark.parametrize(
+        "rule_names",
+        [(), (RuleSet.THREE_SIXES_FORFEIT,), (RuleSet.EXACT_ROLL_TO_WIN,)],
+    )
+    def test_expected_rolls_are_exact(self, rule_names):
+        game = make_game(artefacts=BOUNCE_BOARD, rule_names=rule_names)
+        board = CompiledBoard.from_game(game)
+        survival = RollSurvival(board, Die().distribution())
+        assert survival.expected_rolls() == pytest.approx(
+            FirstPassage(board).expected_rolls(), rel=1e-6
+        )
+        assert 0 < survival.decay < 1
+        assert survival.unfinished_after(0) == 1.0
+        assert survival.unfinished_after(10**4) < 1e-50
+
+    def test_fair_board(self):
+        report = preflight(make_game(artefacts=BOUNCE_BOARD))
+        assert report.ok and report.can_finish
+        assert 50 < report.expected_rolls < 90
+        assert report.tail_rolls < 1000
+        assert report.truncated_fraction < 1e-50
+
+    def test_long_board(self):
+        report = preflight(make_game(artefacts=LONG_BOARD))
+        assert report.can_finish
+        assert report.expected_rolls > 1000
+        assert report.tail_rolls > 10000
+        assert len(report.problems) == 3
+
+    def test_roll_cap(self):
+        game = make_game(number_of_players=3, artefacts=BOUNCE_BOARD, roll_cap=60)
+        report = preflight(game)
+        assert report.truncated_fraction > 0.5
+        assert "roll cap of 60 rolls" in report.problems[0]
+        uncapped = make_game(artefacts=BOUNCE_BOARD, roll_cap=0)
+        assert preflight(uncapped).truncated_fraction == 0
+
+    def test_goal_out_of_reach(self):
+        game = make_game(artefacts=BOUNCE_BOARD)
+        # The second player only ever rolls 6s: past 94, none of them can win
+        game.set_seat_die(1, AliasDie({6: 1}))
+        report = preflight(game)
+        assert not report.can_finish
+        assert "(player 2)" in report.problems[0]
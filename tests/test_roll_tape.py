@@ -0,0 +1,114 @@
+import os
+import subprocess
+import sys
+import pytest
+from random import Random
+from src.die import SeededDie, AliasDie
+from src.fast_engine import FastGame
+from src.roll_tape import RollTapeWriter, RecordingDie, RollTape, TapeDie
+from .conftest import make_game
+
+
+MAIN = os.path.join(os.path.dirname(os.path.dirname(__file__)), "main.py")
+
+
+class Test_RollTape:
+    def test_games_round_trip(self, tmp_path):
+        path = str(tmp_path / "games.tape")
+        rng = Random(2)
+        # Games of every length around the 8 rolls to 3 bytes packing
+        games = [[rng.randint(1, 6) for _ in range(length)] for length in range(20)]
+        with RollTapeWriter(path) as writer:
+            for simulation_number, rolls in enumerate(games, 1):
+                writer.start_game(simulation_number)
+                for die_roll in rolls:
+                    writer.roll(die_roll)
+
+        with RollTape(path) as tape:
+            assert len(tape) == 20
+            assert tape.number_of_rolls == sum(map(len, games))
+            for simulation_number, rolls in enumerate(games, 1):
+                assert tape.rolls(simulation_number) == rolls
+        # 3 bits a roll, and the index
+        assert os.path.getsize(path) < 32 + 190 * 3 / 8 + 3 + 8 + 8 * 21
+
+    def test_record_and_replay(self, tmp_path):
+        path = str(tmp_path / "run.tape")
+        with RollTapeWriter(path) as writer:
+            game = make_game(RecordingDie(SeededDie(4), writer), 3, 30)
+            game.set_seat_die(1, RecordingDie(AliasDie({1: 1, 6: 3}, 4, 2), writer))
+            recorded = [repr(game_stat.__dict__) for game_stat in game.iter_games()]
+
+        with RollTape(path) as tape:
+            assert len(tape) == 30
+            replayed = [
+                repr(game_stat.__dict__)
+                for game_stat in make_game(TapeDie(tape), 3, 30).iter_games()
+            ]
+            fast_game = FastGame.from_game(make_game(TapeDie(tape), 3, 30))
+            fast = [repr(game_stat.__dict__) for game_stat in fast_game.iter_games()]
+        assert replayed == recorded
+        assert fast == recorded
+
+    def test_empty_tape(self, tmp_path):
+        path = str(tmp_path / "empty.tape")
+        RollTapeWriter(path).close()
+        with RollTape(path) as tape:
+            assert len(tape) == 0
+
+    def test_recording_errors(self, tmp_path):
+        writer = RollTapeWriter(str(tmp_path / "bad.tape"))
+        with pytest.raises(ValueError):
+            writer.start_game(2)
+        writer.start_game(1)
+        writer.start_game(1)
+        with pytest.raises(ValueError):
+            writer.roll(7)
+        writer.close()
+
+    def test_no_partial_tape(self, tmp_path):
+        path = tmp_path / "failed.tape"
+        with pytest.raises(ValueError):
+            with RollTapeWriter(str(path)) as writer:
+                writer.start_game(1)
+                writer.roll(7)
+        assert os.listdir(tmp_path) == []
+
+    def test_recording_dice_rolling_above_six(self, tmp_path):
+        with open(tmp_path / "game.conf", "w") as conf_file:
+            conf_file.write(
+                "NUMBER_OF_SIMULATIONS=5\nNUMBER_OF_PLAYERS=2\n"
+                "SNAKE=27,5\nLADDER=4,25\nDIE=2d6\n"
+            )
+        result = subprocess.run(
+            [sys.executable, MAIN, "--seed", "1", "--record-tape", "x.tape"],
+            cwd=tmp_path,
+            capture_output=True,
+            text=True,
+        )
+        assert "Error: A roll tape only holds rolls of 1 to 6" in result.stdout
+        assert "Traceback" not in result.stderr
+        assert sorted(os.listdir(tmp_path)) == ["game.conf"]
+
+    def test_replay_errors(self, tmp_path):
+        path = str(tmp_path / "short.tape")
+        with RollTapeWriter(path) as writer:
+            writer.start_game(1)
+            writer.roll(6)
+
+        not_a_tape = tmp_path / "not.tape"
+        not_a_tape.write_bytes(b"SNAKE=27,5\n")
+        empty = tmp_path / "empty"
+        empty.write_bytes(b"")
+        for bad_path in [not_a_tape, empty]:
+            with pytest.raises(ValueError):
+                RollTape(str(bad_path))
+
+        with RollTape(path) as tape:
+            die = TapeDie(tape)
+            with pytest.raises(ValueError):
+                die.start_game(2)
+            die.start_game(1)
+            assert die.roll() == 6
+            with pytest.raises(ValueError):
+                die.roll()
@@ -0,0 +1,107 @@
+import pytest
+from src.constants import Constants as Const
+from src.artefact import Ladder
+from src.die import SeededDie
+from src.rules import RuleSet
+from src.board import CompiledBoard
+from src.heatmap import HitCounters
+from src.fast_engine import FastGame
+from .conftest import BOUNCE_BOARD, make_game
+from .mock_die import Mock_Die
+
+
+class Test_Rules:
+    def test_unknown_rule(self):
+        with pytest.raises(ValueError):
+            RuleSet(["BOUNCE_TWICE"])
+
+    def test_exact_roll_to_win(self):
+        game = make_game(
+            Mock_Die([1]), 1, artefacts=[], rule_names=[RuleSet.EXACT_ROLL_TO_WIN]
+        )
+        player1 = game.players[0]
+        player1.token_position = Const.BOARD_POSITION_MAX - 2
+        game.move_token(player1, 5)
+        assert player1.token_position == Const.BOARD_POSITION_MAX - 2
+        game.move_token(player1, 2)
+        assert player1.token_position == Const.BOARD_POSITION_MAX
+
+    def test_three_sixes_forfeit(self):
+        # Each turn: 6, 6, (void 6), 4
+        game = make_game(
+            Mock_Die([6, 6, 6, 4]),
+            1,
+            artefacts=[],
+            rule_names=[RuleSet.THREE_SIXES_FORFEIT],
+        )
+        player1 = game.players[0]
+
+        game.play(simulation_number=1)
+
+        # 96 after 6 turns; then bounce back to 98, to 96, a void 6 and a 4
+        assert player1.token_position == Const.BOARD_POSITION_MAX
+        assert player1.number_of_rolls == 28
+        assert player1.max_streak == [6, 6, 6]
+        assert player1.number_of_lucky_rolls == 1
+
+    def test_no_extra_turn(self):
+        game = make_game(
+            Mock_Die([6, 1]), artefacts=[], rule_names=[RuleSet.NO_EXTRA_TURN]
+        )
+        player1, player2 = game.players
+
+        _, winner = game.play(simulation_number=1)
+
+        # P1 only ever bounces between 96 and 98; P2 walks home
+        assert winner == player2
+        assert player2.number_of_rolls == Const.BOARD_POSITION_MAX
+        assert player1.max_streak == [6]
+
+    @pytest.mark.parametrize(
+        "rule_names, expected_position",
+        [([], 95), ([RuleSet.LADDERS_ON_EXACT_LANDING], 89)],
+    )
+    def test_ladders_on_exact_landing(self, rule_names, expected_position):
+        # Only a roll bigger than a d6 can bounce back below the last row
+        ladder = Ladder(bottom=89, top=95)
+        game = make_game(Mock_Die([1]), 1, artefacts=[ladder], rule_names=rule_names)
+        player1 = game.players[0]
+        player1.token_position = 99
+        game.move_token(player1, 12)
+        assert player1.token_position == expected_position
+
+        board = CompiledBoard.from_game(game, max_roll=12)
+        assert board.next_position[99 * board.stride + 12] == expected_position
+        assert board.next_position[79 * board.stride + 10] == 95
+
+    @pytest.mark.parametrize(
+        "rule_names",
+        [
+            [],
+            [RuleSet.EXACT_ROLL_TO_WIN],
+            [RuleSet.THREE_SIXES_FORFEIT],
+            [RuleSet.NO_EXTRA_TURN],
+            [RuleSet.LADDERS_ON_EXACT_LANDING],
+            list(RuleSet.RULE_NAMES),
+            [RuleSet.EXACT_ROLL_TO_WIN, RuleSet.THREE_SIXES_FORFEIT],
+        ],
+    )
+    @pytest.mark.parametrize("number_of_players", [1, 3])
+    def test_fast_engine_matches_reference(self, rule_names, number_of_players):
+        game = make_game(
+            SeededDie(5), number_of_players, 200, BOUNCE_BOARD, rule_names
+        )
+        game.hit_counters = HitCounters()
+        game.run_simulations()
+
+        other = make_game(
+            SeededDie(5), number_of_players, 200, BOUNCE_BOARD, rule_names
+        )
+        fast = FastGame.from_game(other)
+        fast.run_simulations(other.game_stats)
+
+        assert [g.__dict__ for g in other.game_stats] == [
+            g.__dict__ for g in game.game_stats
+        ]
+        assert fast.hit_counters().landings[1:] == game.hit_counters.landings[1:]
+        assert fast.hit_counters().triggers == game.hit_counters.triggers
@@ -0,0 +1,138 @@
+import os
+import sys
+import subprocess
+import pytest
+from src.die import SeededDie
+from src.stats_accumulator import StatsAccumulator
+from src.shard import (
+    Shard,
+    board_fingerprint,
+    run_shard,
+    write_partial_result,
+    merge_partial_results,
+)
+from src.game_exceptions import (
+    ERROR_MESSAGE_SHARD_DUPLICATED,
+    ERROR_MESSAGE_SHARDS_MISSING,
+)
+from .conftest import make_game
+
+
+NUMBER_OF_SIMULATIONS = 50
+SEED = 1234
+MAIN = os.path.join(os.path.dirname(os.path.dirname(__file__)), "main.py")
+
+
+def shard_game(seed=SEED, retain_game_stats=False):
+    return make_game(
+        SeededDie(seed),
+        3,
+        NUMBER_OF_SIMULATIONS,
+        retain_game_stats=retain_game_stats,
+    )
+
+
+class Test_Shard:
+    @pytest.mark.parametrize("count", [1, 3, 7, NUMBER_OF_SIMULATIONS + 3])
+    def test_shards_cover_every_simulation_once(self, count):
+        simulation_numbers = []
+        for index in range(1, count + 1):
+            simulation_numbers += list(
+                Shard(index, count).simulation_numbers(NUMBER_OF_SIMULATIONS)
+            )
+        assert simulation_numbers == list(range(1, NUMBER_OF_SIMULATIONS + 1))
+
+    @pytest.mark.parametrize("spec", ["0/3", "4/3", "1/0", "a/b", "3"])
+    def test_invalid_shard(self, spec):
+        with pytest.raises(ValueError):
+            Shard.parse(spec)
+
+    def test_accumulator_round_trip(self):
+        game = shard_game()
+        accumulator = StatsAccumulator()
+        for simulation_number in range(1, NUMBER_OF_SIMULATIONS + 1):
+            accumulator.add(game.play_game(simulation_number))
+        restored = StatsAccumulator.from_dict(accumulator.to_dict())
+        assert restored.to_dict() == accumulator.to_dict()
+        # Partial results of older versions count no games cut short
+        data = accumulator.to_dict()
+        del data["number_of_truncated_games"]
+        assert StatsAccumulator.from_dict(data).number_of_truncated_games == 0
+
+    def test_roll_cap_is_part_of_the_board(self):
+        game = shard_game()
+        other = shard_game()
+        other.roll_cap = 100
+        assert board_fingerprint(game) != board_fingerprint(other)
+
+    def test_merged_shards_match_single_run(self, tmp_path):
+        reference = shard_game(retain_game_stats=True)
+        reference.run_simulations()
+        reference.calculate_simultation_statistics()
+
+        paths = []
+        for index in (3, 1, 2):  # Merge order does not matter
+            path = str(tmp_path / f"shard-{index}.json")
+            write_partial_result(path, run_shard(shard_game(), Shard(index, 3)))
+            paths.append(path)
+        isSuccess, _, run, accumulator = merge_partial_results(paths)
+
+        assert isSuccess == True
+        assert run["number_of_players"] == 3
+        assert accumulator.to_simulation_stats().__dict__ == reference.sim_stats.__dict__
+
+    def test_merge_missing_and_duplicated_shards(self, tmp_path):
+        paths = []
+        for index in (1, 3):
+            path = str(tmp_path / f"shard-{index}.json")
+            write_partial_result(path, run_shard(shard_game(), Shard(index, 3)))
+            paths.append(path)
+
+        isSuccess, err_message, _, _ = merge_partial_results(paths)
+        assert isSuccess == False
+        assert err_message == ERROR_MESSAGE_SHARDS_MISSING.format(missing="2", count=3)
+
+        isSuccess, err_message, _, _ = merge_partial_results(paths + paths[:1])
+        assert isSuccess == False
+        assert err_message == ERROR_MESSAGE_SHARD_DUPLICATED.format(index=1, count=3)
+
+    def test_merge_different_runs(self, tmp_path):
+        path1 = str(tmp_path / "shard-1.json")
+        path2 = str(tmp_path / "shard-2.json")
+        write_partial_result(path1, run_shard(shard_game(seed=1), Shard(1, 2)))
+        write_partial_result(path2, run_shard(shard_game(seed=2), Shard(2, 2)))
+        isSuccess, err_message, _, _ = merge_partial_results([path1, path2])
+        assert isSuccess == False
+        assert "seed" in err_message
+
+    def test_shards_in_separate_processes(self, tmp_path):
+        with open(tmp_path / "game.conf", "w") as conf_file:
+            conf_file.write(
+                "NUMBER_OF_SIMULATIONS=40\nNUMBER_OF_PLAYERS=2\n"
+                "SNAKE=27,5\nLADDER=4,25\n"
+            )
+
+        def main(*args):
+            return subprocess.run(
+                [sys.executable, MAIN, *args],
+                cwd=tmp_path,
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout
+
+        shards = [
+            subprocess.Popen(
+                [sys.executable, MAIN, "--shard", f"{index}/4", "--seed", "5"],
+                cwd=tmp_path,
+                stdout=subprocess.DEVNULL,
+            )
+            for index in range(1, 5)
+        ]
+        assert [shard.wait() for shard in shards] == [0] * 4
+        main("--shard", "1/1", "--seed", "5", "--output", "whole.json")
+
+        sharded = main("merge", *[f"shard-{index}-of-4.json" for index in range(1, 5)])
+        whole = main("merge", "whole.json")
+        assert "OVER 40 SIMULATION RUN(S)" in sharded
+        assert sharded == whole
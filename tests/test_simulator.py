@@ -0,0 +1,147 @@
+import os
+import pytest
+from src.rules import RuleSet
+from src.simulator import SimulationConfig, Simulator
+from src.game_exceptions import (
+    EXCEPTION_SIMULATION_CONFIG,
+    EXCEPTION_CONFIG_FILE,
+    EXCEPTION_CONFIG_SYNTAX,
+    EXCEPTION_BOARD_INVALID,
+    EXCEPTION_BOARD_UNFINISHABLE,
+)
+
+GAME_CONF = os.path.join(os.path.dirname(os.path.dirname(__file__)), "game.conf")
+CONF_TEXT = """
+NUMBER_OF_SIMULATIONS=20 # games
+NUMBER_OF_PLAYERS=3
+SNAKE=27,5
+SNAKE=89,53
+LADDER=4,25
+RULE=three_sixes_forfeit
+DIE_PLAYER_2=1:1,6:2
+"""
+
+
+def make_config(**changes):
+    config = SimulationConfig.from_string(CONF_TEXT)
+    for name, value in changes.items():
+        setattr(config, name, value)
+    return config
+
+
+class Test_SimulationConfig:
+    def test_from_string(self):
+        config = SimulationConfig.from_string(CONF_TEXT)
+        assert config.number_of_simulations == 20
+        assert config.number_of_players == 3
+        assert config.snakes == [[27, 5], [89, 53]]
+        assert config.ladders == [[4, 25]]
+        assert config.rules == [RuleSet.THREE_SIXES_FORFEIT]
+        assert config.dice == {2: "1:1,6:2"}
+
+    def test_from_file(self):
+        config = SimulationConfig.from_file(GAME_CONF)
+        assert config.number_of_players > 0 and config.snakes
+        with pytest.raises(EXCEPTION_CONFIG_FILE):
+            SimulationConfig.from_file(GAME_CONF + ".missing")
+
+    @pytest.mark.parametrize(
+        "line",
+        ["SNAKE=27", "SNAKE=a,5", "NUMBER_OF_PLAYERS=-1", "RULE=NO_SUCH_RULE", "DIE=3"],
+    )
+    def test_invalid_lines(self, line):
+        with pytest.raises(EXCEPTION_CONFIG_SYNTAX) as error:
+            SimulationConfig.from_string(CONF_TEXT + line)
+        assert line in error.value.message
+        assert isinstance(error.value, ValueError)
+
+    def test_dict_round_trip(self):
+        config = make_config(seed=4, roll_cap=500, dice={0: "2d6", 2: "1:1,6:2"})
+        again = SimulationConfig.from_dict(config.to_dict())
+        assert again.__dict__ == config.__dict__
+        with pytest.raises(EXCEPTION_CONFIG_SYNTAX):
+            SimulationConfig.from_dict(dict(config.to_dict(), number_of_players=0))
+
+    @pytest.mark.parametrize(
+        "changes, exception",
+        [
+            ({"snakes": [[5, 27]]}, EXCEPTION_BOARD_INVALID),
+            ({"ladders": [[27, 45]]}, EXCEPTION_BOARD_INVALID),
+            # Past 89, every roll is a snake
+            (
+                {"snakes": [[head, head - 80] for head in range(90, 96)]},
+                EXCEPTION_BOARD_UNFINISHABLE,
+            ),
+            ({"roll_cap": -1}, EXCEPTION_CONFIG_SYNTAX),
+        ],
+    )
+    def test_invalid_games(self, changes, exception):
+        with pytest.raises(exception):
+            make_config(**changes).make_game()
+
+
+class Test_Simulator:
+    def test_runs_without_printing(self, capsys):
+        simulator = Simulator(make_config(seed=9))
+        result = simulator.run()
+        assert result.statistics.number_of_simulations == 20
+        assert result.seed == 9
+        assert result.warnings == []
+        assert capsys.readouterr().out == ""
+
+    def test_runs_are_reproducible(self):
+        simulator = Simulator(make_config())
+        first = simulator.run(seed=5)
+        assert simulator.run(seed=5).accumulator.to_dict() == first.accumulator.to_dict()
+        # The reference engine plays the same games
+        reference = Simulator(make_config(), engine="reference").run(seed=5)
+        assert reference.to_dict() == first.to_dict()
+        assert simulator.run(50, seed=6).statistics.number_of_simulations == 50
+
+    def test_warnings(self):
+        result = Simulator(make_config(roll_cap=30)).run(seed=1)
+        assert "roll cap of 30 rolls" in result.to_dict()["warnings"][0]
+        assert result.statistics.number_of_truncated_games > 0
+
+    def test_every_game_cut_short(self):
+        result = Simulator(make_config(roll_cap=3)).run(seed=1)
+        statistics = result.to_dict()["statistics"]
+        assert statistics["number_of_truncated_games"] == 20
+        assert statistics["number_of_simulations"] == 20
+        assert statistics["min_number_of_win_rolls"] is None
+        assert statistics["avg_number_of_win_rolls"] is None
+        assert statistics["max_streak"] is None
+
+    def test_invalid_engine(self):
+        with pytest.raises(EXCEPTION_SIMULATION_CONFIG):
+            Simulator(make_config(), engine="warp")
+        with pytest.raises(EXCEPTION_SIMULATION_CONFIG):
+            Simulator(make_config(), statistics="most")
+
+    def test_auto_engine(self):
+        simulator = Simulator(make_config(number_of_players=1), "auto", "rolls")
+        played = simulator.run(seed=2)
+        assert played.engine_choice.name == "fast"
+        assert played.rolls_to_win.number_of_games == 20
+        assert played.to_dict()["rolls_to_win"]["maximum"] is not None
+        # So many games are worked out exactly instead
+        worked_out = simulator.run(10**6)
+        assert worked_out.engine_choice.name == "analytic"
+        assert worked_out.statistics is None
+        assert worked_out.rolls_to_win.exact
+        assert "statistics" not in worked_out.to_dict()
+        every_statistic = Simulator(make_config(), "auto").run(seed=1)
+        assert every_statistic.engine_choice.name == "fast"
+
+    def test_control_variates(self):
+        simulator = Simulator(make_config(seed=4), control_variates=True)
+        result = simulator.run(300)
+        estimates = {e.statistic: e for e in result.control_variates}
+        assert estimates["avg_number_of_win_rolls"].adjusted == pytest.approx(
+            simulator.analysis.expected_rolls_to_win()
+        )
+        assert estimates["avg_lucky_rolls"].variance_reduction > 1
+        assert len(result.to_dict()["control_variates"]) == len(estimates)
+        capped = Simulator(make_config(roll_cap=30), control_variates=True).run(seed=1)
+        assert capped.control_variates == []
+        assert "roll cap" in capped.warnings[-1]
@@ -111,5 +111,5 @@ class Test_Stats:
         assert game.sim_stats.max_distance_climbed == DISTANCE_CLIMBED * 10
         assert game.sim_stats.biggest_climb_in_a_streak == TOTAL_DISTANCE_CLIMBED * 10
         assert game.sim_stats.avg_distance_climbed == expected_avg_distance_climbed
-        # Assert max streak
-        assert game.sim_stats.max_streak == MAX_STREAK
+        # Assert max streak (stored by value: Player 0's, before the pops)
+        assert game.sim_stats.max_streak == [6, 6, 6] + MAX_STREAK[-1:]
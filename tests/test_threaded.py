@@ -0,0 +1,39 @@
+import sys
+import pytest
+from src.die import SeededDie
+from src.rules import RuleSet
+from src.threaded import gil_enabled, run_threaded
+from .conftest import make_game
+
+
+class Test_Threaded:
+    @pytest.mark.parametrize("engine_name", ["reference", "fast"])
+    @pytest.mark.parametrize("number_of_threads", [1, 3, 8])
+    def test_same_stats_as_one_thread(self, engine_name, number_of_threads):
+        rule_names = [RuleSet.THREE_SIXES_FORFEIT]
+        game = make_game(SeededDie(8), 3, 50, rule_names=rule_names)
+        game.run_simulations()
+        game.calculate_simultation_statistics()
+
+        accumulator = run_threaded(
+            make_game(SeededDie(8), 3, 50, rule_names=rule_names),
+            8,
+            number_of_threads,
+            engine_name,
+        )
+
+        assert accumulator.number_of_games == 50
+        assert repr(accumulator.to_simulation_stats().__dict__) == repr(
+            game.sim_stats.__dict__
+        )
+
+    def test_more_threads_than_games(self):
+        accumulator = run_threaded(make_game(SeededDie(8), 3, 2), 8, 4)
+        assert accumulator.number_of_games == 2
+
+    def test_gil_enabled(self, monkeypatch):
+        # Builds without sys._is_gil_enabled always have the GIL
+        monkeypatch.delattr(sys, "_is_gil_enabled", raising=False)
+        assert gil_enabled() is True
+        monkeypatch.setattr(sys, "_is_gil_enabled", lambda: False, raising=False)
+        assert gil_enabled() is False
@@ -0,0 +1,115 @@
+import pytest
+from src.board import CompiledBoard
+from src.die import SeededDie, AliasDie
+from src.rules import RuleSet
+from src.trajectories import TrajectoryPool, compose_game, run_player_counts
+from .conftest import BOUNCE_BOARD, make_game
+
+
+class TrajectoryDie(SeededDie):
+    # Rolls, in game n, the rolls of the trajectory the seat plays in it
+    def __init__(self, seed, number_of_players, seat):
+        super().__init__(seed)
+        self.number_of_players = number_of_players
+        self.seat = seat
+
+    def start_game(self, simulation_number):
+        super().start_game(
+            (simulation_number - 1) * self.number_of_players + self.seat + 1
+        )
+
+
+class Test_Trajectories:
+    @pytest.mark.parametrize("number_of_players", [1, 2, 4])
+    @pytest.mark.parametrize(
+        "rule_names",
+        [
+            (),
+            (RuleSet.THREE_SIXES_FORFEIT,),
+            (RuleSet.NO_EXTRA_TURN,),
+            (RuleSet.EXACT_ROLL_TO_WIN,),
+        ],
+    )
+    def test_composed_games_match(self, number_of_players, rule_names):
+        game = make_game(
+            SeededDie(7), number_of_players, 50, BOUNCE_BOARD, rule_names
+        )
+        for seat in range(number_of_players):
+            game.set_seat_die(seat, TrajectoryDie(7, number_of_players, seat))
+        pool = TrajectoryPool(
+            CompiledBoard.from_game(game), SeededDie(7), 50 * number_of_players
+        )
+
+        for n in range(1, 51):
+            composed = compose_game(
+                [
+                    (pool, (n - 1) * number_of_players + seat + 1)
+                    for seat in range(number_of_players)
+                ]
+            )
+            assert repr(composed.__dict__) == repr(game.play_game(n).__dict__)
+
+    @pytest.mark.parametrize("number_of_players", [1, 3])
+    def test_trajectories_cut_short(self, number_of_players):
+        game = make_game(SeededDie(7), number_of_players, 50, BOUNCE_BOARD)
+        game.roll_cap = 20
+        for seat in range(number_of_players):
+            game.set_seat_die(seat, TrajectoryDie(7, number_of_players, seat))
+        pool = TrajectoryPool(
+            CompiledBoard.from_game(game), SeededDie(7), 50 * number_of_players, 20
+        )
+        assert 0 < pool.finished.count(0) < len(pool)
+
+        composed = [
+            compose_game(
+                [
+                    (pool, (n - 1) * number_of_players + seat + 1)
+                    for seat in range(number_of_players)
+                ]
+            )
+            for n in range(1, 51)
+        ]
+        if number_of_players == 1:
+            # The cap on the game is the cap on its one trajectory
+            assert [repr(g.__dict__) for g in composed] == [
+                repr(game.play_game(n).__dict__) for n in range(1, 51)
+            ]
+        # No game is won by a player past the cap
+        assert all(
+            g.truncated or g.game_number_of_rolls_to_win < 20 + 6 for g in composed
+        )
+
+    def test_pool(self):
+        game = make_game(SeededDie(7), 1, 50, BOUNCE_BOARD)
+        pool = TrajectoryPool(CompiledBoard.from_game(game), SeededDie(7), 10)
+        assert len(pool) == 10
+        assert sum(pool.turns(n) for n in range(1, 11)) == len(pool.max_streak_last)
+        assert pool.nbytes() > 0
+
+    def test_player_counts(self):
+        game = make_game(SeededDie(7), 1, 200, BOUNCE_BOARD)
+        accumulators = run_player_counts(game, range(2, 6), seed=1)
+        assert list(accumulators) == [2, 3, 4, 5]
+        assert all(a.number_of_games == 200 for a in accumulators.values())
+        averages = [
+            a.to_simulation_stats().avg_number_of_win_rolls for a in accumulators.values()
+        ]
+        # More players, sooner a winner
+        assert averages == sorted(averages, reverse=True)
+
+        game = make_game(SeededDie(7), 1, 200, BOUNCE_BOARD)
+        again = run_player_counts(game, [3], seed=1)
+        assert again[3].to_dict() == accumulators[3].to_dict()
+
+    def test_player_counts_with_seat_dice(self):
+        game = make_game(SeededDie(7), 1, 200, BOUNCE_BOARD)
+        fair = run_player_counts(game, [2], number_of_trajectories=100)
+        game = make_game(SeededDie(7), 1, 200, BOUNCE_BOARD)
+        game.set_seat_die(1, AliasDie({1: 1, 2: 1}, seed=7))
+        handicapped = run_player_counts(game, [2], number_of_trajectories=100)
+        # The second seat crawls a square or two a roll: the first seat
+        # wins, in its own time
+        assert (
+            handicapped[2].to_simulation_stats().avg_number_of_win_rolls
+            > fair[2].to_simulation_stats().avg_number_of_win_rolls
+        )